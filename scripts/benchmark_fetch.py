@@ -0,0 +1,373 @@
+"""
+Fetch Throughput Benchmark
+
+Runs the real fetch pipelines end to end against the offline mock API
+(src/mock_server.py) and reports records/sec, so fetch-path changes can be
+measured without spending API quota:
+- historical: fetch_historical_batches.fetch_batch (archive API, thread pool,
+  FlatBuffers -> CSV/Parquet/Arrow, bounded response cache)
+- forecast:   fetch_forecast.fetch_forecast_group for every group, like
+  fetch_all_forecasts (forecast API, FlatBuffers -> CSV + snapshots)
+- client:     OpenMeteoClient.fetch_forecast per location (JSON)
+
+Each pipeline runs at 15, 150 and 1,500 locations (beyond the 15 real ones,
+locations are copies with shifted coordinates). Model metadata also comes
+from the mock, so nothing reaches the real API. Output, caches and run state
+go to a temp directory, the rate limiter is switched off (we measure our
+side, not the API quota) and results are written to data/benchmarks/.
+
+Usage:
+    python scripts/benchmark_fetch.py                         # All pipelines, 15/150/1500
+    python scripts/benchmark_fetch.py --sizes 15 150 --pipelines historical
+    python scripts/benchmark_fetch.py --latency 0.2 --throttle-rate 0.02 --error-rate 0.01
+"""
+
+import sys
+import io
+import json
+import time
+import shutil
+import tempfile
+import argparse
+import contextlib
+from pathlib import Path
+from datetime import datetime, timedelta
+from concurrent.futures import ThreadPoolExecutor
+
+import openmeteo_requests
+import requests
+import requests_cache
+
+# ============================================================================
+# SETUP
+# ============================================================================
+
+# Project paths
+project_root = Path(__file__).parent.parent
+sys.path.insert(0, str(project_root / "src"))
+sys.path.insert(0, str(project_root / "scripts"))
+sys.path.insert(0, str(project_root))
+
+from config import (
+    LOCATIONS, API_CONCURRENCY_MAX, API_LOCATIONS_PER_REQUEST, FORECAST_DAYS,
+    BENCHMARK_DIR, HISTORICAL_PROFILE, FORECAST_PROFILE, CLIENT_PROFILE, profile_names,
+)
+from mock_server import MockOpenMeteoServer
+from rate_limiter import RateLimiter
+from metrics import FetchMetrics, InstrumentedSession
+from api_controller import ApiController, ControlledAdapter, ControlledSession
+from http_cache import BoundedCacheSession
+from forecast_snapshots import ForecastSnapshotStore
+from model_runs import ForecastState, fetch_latest_run
+import model_runs
+
+import fetch_historical_batches as historical
+import fetch_forecast as forecast
+
+PIPELINES = ("historical", "forecast", "client")
+DEFAULT_SIZES = (15, 150, 1500)
+
+# Archive period fetched by the historical pipeline
+HISTORICAL_START = "2024-01-01"
+
+# Effectively no rate limit: the mock has no quota to protect
+UNLIMITED = {"minute": 10**9}
+
+# ============================================================================
+# HELPERS
+# ============================================================================
+
+def synthetic_locations(n):
+    """
+    n locations: the 15 real ones first, then copies with shifted coordinates.
+    
+    Copies keep the original's timezone and name (plus a number), so they
+    behave like real locations in every pipeline.
+    """
+    base = list(LOCATIONS.items())
+    locations = {}
+    for i in range(n):
+        code, location = base[i % len(base)]
+        copy_number = i // len(base)
+        if copy_number == 0:
+            locations[code] = location
+            continue
+        # Spread copies over a ~1 degree box around the original
+        shift_lat = ((copy_number * 37) % 100 - 50) / 100
+        shift_lon = ((copy_number * 61) % 100 - 50) / 100
+        locations[f"{code}_{copy_number:04d}"] = {
+            **location,
+            "name": f"{location['name']} #{copy_number}",
+            "latitude": round(location["latitude"] + shift_lat, 4),
+            "longitude": round(location["longitude"] + shift_lon, 4),
+        }
+    return locations
+
+
+def make_controller(metrics, source, backoff_base):
+    """ApiController like the scripts', with a shorter backoff for benchmarking."""
+    return ApiController(
+        backoff_base=backoff_base,
+        retry_exceptions=(requests.ConnectionError, requests.Timeout),
+        metrics=metrics,
+        source=source,
+    )
+
+
+def records_parsed(metrics):
+    """Total records_parsed_total over all sources."""
+    return sum(metrics.summary()["metrics"].get("records_parsed_total", {}).values())
+
+
+# ============================================================================
+# PIPELINES
+# ============================================================================
+
+def run_historical(server, locations, work_dir, args):
+    """fetch_batch() for all locations, output in work_dir."""
+    metrics = FetchMetrics(f"benchmark_historical_{len(locations)}", out_dir=work_dir)
+    controller = make_controller(metrics, "archive", args.backoff)
+    cache_session = BoundedCacheSession(
+        ControlledSession(requests.Session(), controller),
+        work_dir / "historical.sqlite",
+        max_bytes=1024**3,
+    )
+    
+    # Point the script's module state at the mock server and the temp directory
+    historical.LOCATIONS = locations
+    historical.ARCHIVE_API_URL = server.archive_url
+    historical.OUTPUT_FORMAT = args.format
+    historical.apply_profile(args.historical_profile)
+    historical.data_dir = work_dir / "historical"
+    historical.hourly_dir = historical.data_dir / "hourly"
+    historical.daily_dir = historical.data_dir / "daily"
+    historical.hourly_dir.mkdir(parents=True, exist_ok=True)
+    historical.daily_dir.mkdir(parents=True, exist_ok=True)
+    historical.metrics = metrics
+    historical.controller = controller
+    historical.cache_session = cache_session
+    historical.openmeteo = openmeteo_requests.Client(
+        session=InstrumentedSession(cache_session, metrics, source="archive")
+    )
+    historical.rate_limiter = RateLimiter(UNLIMITED)
+    
+    end_date = (datetime.fromisoformat(HISTORICAL_START) + timedelta(days=args.days - 1)).strftime("%Y-%m-%d")
+    start = time.perf_counter()
+    with contextlib.redirect_stdout(io.StringIO()):
+        _, failed = historical.fetch_batch(
+            HISTORICAL_START, end_date, "benchmark",
+            max_workers=args.workers, group_size=args.group_size
+        )
+    elapsed = time.perf_counter() - start
+    cache_session.close()
+    
+    return elapsed, records_parsed(metrics), len(failed), controller.stats()
+
+
+def run_forecast(server, locations, work_dir, args):
+    """fetch_forecast_group() for every group (full fetch), output in work_dir."""
+    metrics = FetchMetrics(f"benchmark_forecast_{len(locations)}", out_dir=work_dir)
+    controller = make_controller(metrics, "forecast", args.backoff)
+    cache_session = requests_cache.CachedSession(str(work_dir / "forecast_cache"), expire_after=3600)
+    
+    forecast.LOCATIONS = locations
+    forecast.API_BASE_URL = server.forecast_url
+    model_runs.MODEL_META_URL = server.meta_url
+    forecast.apply_profile(args.forecast_profile)
+    forecast.data_dir = work_dir / "forecast"
+    forecast.current_dir = forecast.data_dir / "current"
+    forecast.hourly_dir = forecast.data_dir / "hourly"
+    forecast.daily_dir = forecast.data_dir / "daily"
+    for directory in (forecast.current_dir, forecast.hourly_dir, forecast.daily_dir):
+        directory.mkdir(parents=True, exist_ok=True)
+    forecast.metrics = metrics
+    forecast.controller = controller
+    # Controller under the cache, as in fetch_forecast.setup()
+    adapter = ControlledAdapter(controller)
+    cache_session.mount("https://", adapter)
+    cache_session.mount("http://", adapter)
+    forecast.cache_session = cache_session
+    forecast.openmeteo = openmeteo_requests.Client(
+        session=InstrumentedSession(cache_session, metrics, source="forecast")
+    )
+    forecast.rate_limiter = RateLimiter(UNLIMITED)
+    forecast.forecast_state = ForecastState(work_dir / "forecast_state.json")
+    forecast.snapshot_store = ForecastSnapshotStore(forecast.data_dir / "snapshots")
+    
+    codes = list(locations)
+    groups = [codes[i:i + args.group_size] for i in range(0, len(codes), args.group_size)]
+    model_run = fetch_latest_run()
+    failed = 0
+    
+    start = time.perf_counter()
+    with contextlib.redirect_stdout(io.StringIO()):
+        # Same order as fetch_all_forecasts: one group after the other
+        for group in groups:
+            results = forecast.fetch_forecast_group(group, model_run)
+            failed += sum(1 for ok in results.values() if not ok)
+    elapsed = time.perf_counter() - start
+    cache_session.close()
+    
+    return elapsed, records_parsed(metrics), failed, controller.stats()
+
+
+def run_client(server, locations, work_dir, args):
+    """OpenMeteoClient.fetch_forecast() for every location from a thread pool."""
+    import src.api_client as api_client
+    
+    metrics = FetchMetrics(f"benchmark_client_{len(locations)}", out_dir=work_dir)
+    api_client.LOCATIONS = locations
+    client = api_client.OpenMeteoClient(
+        pool_size=args.workers,
+        rate_limiter=RateLimiter(UNLIMITED),
+        use_cache=False,
+        metrics=metrics,
+        controller=ApiController(
+            backoff_base=args.backoff,
+            retry_exceptions=(api_client.httpx.TransportError,),
+            metrics=metrics,
+        ),
+    )
+    client.base_url = server.forecast_url
+    
+    def fetch(location_code):
+        return client.fetch_forecast(location_code, forecast_days=FORECAST_DAYS,
+                                     profile=args.client_profile)
+    
+    start = time.perf_counter()
+    with contextlib.redirect_stdout(io.StringIO()):
+        with ThreadPoolExecutor(max_workers=args.workers) as executor:
+            results = list(executor.map(fetch, locations))
+    elapsed = time.perf_counter() - start
+    stats = client.controller.stats()
+    with contextlib.redirect_stdout(io.StringIO()):
+        client.close()
+    
+    return elapsed, records_parsed(metrics), sum(1 for data in results if data is None), stats
+
+
+RUNNERS = {
+    "historical": run_historical,
+    "forecast": run_forecast,
+    "client": run_client,
+}
+
+
+# ============================================================================
+# MAIN
+# ============================================================================
+
+def main():
+    """Main entry point for the fetch benchmark."""
+    
+    parser = argparse.ArgumentParser(description="Benchmark the fetch pipelines against the mock API")
+    parser.add_argument('--pipelines', nargs='+', choices=PIPELINES, default=list(PIPELINES),
+                        help='Pipelines to run (default: all)')
+    parser.add_argument('--sizes', nargs='+', type=int, default=list(DEFAULT_SIZES),
+                        help='Numbers of locations (default: 15 150 1500)')
+    parser.add_argument('--days', type=int, default=7,
+                        help=f'Archive days per location for the historical pipeline '
+                             f'(from {HISTORICAL_START}, default: 7)')
+    parser.add_argument('--format', choices=['csv', 'parquet', 'arrow'], default='csv',
+                        help='Historical output format (default: csv)')
+    parser.add_argument('--historical-profile', choices=profile_names("archive"), default=HISTORICAL_PROFILE)
+    parser.add_argument('--forecast-profile', choices=profile_names("forecast"), default=FORECAST_PROFILE)
+    parser.add_argument('--client-profile', choices=profile_names("forecast"), default=CLIENT_PROFILE)
+    parser.add_argument('--workers', type=int, default=API_CONCURRENCY_MAX,
+                        help=f'Worker threads (default: {API_CONCURRENCY_MAX})')
+    parser.add_argument('--group-size', type=int, default=API_LOCATIONS_PER_REQUEST,
+                        help=f'Locations per request (default: {API_LOCATIONS_PER_REQUEST})')
+    parser.add_argument('--backoff', type=float, default=0.5,
+                        help='Retry backoff base in seconds (default: 0.5)')
+    parser.add_argument('--latency', type=float, default=0.0, help='Mock latency per request (s)')
+    parser.add_argument('--latency-jitter', type=float, default=0.0, help='Mock random extra latency (s)')
+    parser.add_argument('--error-rate', type=float, default=0.0, help='Fraction of 503 responses')
+    parser.add_argument('--throttle-rate', type=float, default=0.0, help='Fraction of 429 responses')
+    parser.add_argument('--retry-after', type=int, default=1, help='Retry-After seconds on 429s')
+    parser.add_argument('--max-concurrent', type=int, default=None,
+                        help='Mock answers 429 above this many requests in flight')
+    parser.add_argument('--keep', action='store_true',
+                        help='Keep the output files (default: delete after each run)')
+    args = parser.parse_args()
+    
+    print("\n" + "="*70)
+    print("⏱️  SA TOURISM WEATHER PROJECT - FETCH BENCHMARK (mock API)")
+    print("="*70)
+    print(f"Pipelines: {', '.join(args.pipelines)} | Locations: {', '.join(map(str, args.sizes))}")
+    print(f"Mock: latency {args.latency}s (+{args.latency_jitter}s), "
+          f"{args.error_rate:.1%} errors, {args.throttle_rate:.1%} throttled")
+    print("="*70)
+    
+    started = datetime.now()
+    results = []
+    server = MockOpenMeteoServer(
+        latency=args.latency, latency_jitter=args.latency_jitter,
+        error_rate=args.error_rate, throttle_rate=args.throttle_rate,
+        retry_after=args.retry_after, max_concurrent=args.max_concurrent, seed=0,
+    ).start()
+    
+    try:
+        for pipeline in args.pipelines:
+            for size in args.sizes:
+                work_dir = Path(tempfile.mkdtemp(prefix=f"benchmark_{pipeline}_{size}_"))
+                locations = synthetic_locations(size)
+                before = server.stats()
+                
+                print(f"\n▶️  {pipeline}: {size} locations...")
+                elapsed, records, failed, controller_stats = RUNNERS[pipeline](server, locations, work_dir, args)
+                after = server.stats()
+                
+                result = {
+                    "pipeline": pipeline,
+                    "locations": size,
+                    "seconds": round(elapsed, 3),
+                    "records": int(records),
+                    "records_per_second": round(records / elapsed, 1) if elapsed > 0 else 0.0,
+                    "failed_locations": failed,
+                    "requests": after["requests"] - before["requests"],
+                    "response_mb": round((after["bytes_sent"] - before["bytes_sent"]) / 1024**2, 2),
+                    "retries": controller_stats["retries"],
+                    "throttled": controller_stats["throttled"],
+                }
+                results.append(result)
+                print(f"   ✅ {result['records']:,} records in {elapsed:.1f}s = "
+                      f"{result['records_per_second']:,.0f} records/s "
+                      f"({result['requests']} requests, {result['response_mb']} MB, "
+                      f"{result['retries']} retries, {failed} failed)")
+                
+                if args.keep:
+                    print(f"   Output kept in {work_dir}")
+                else:
+                    shutil.rmtree(work_dir, ignore_errors=True)
+    
+    except KeyboardInterrupt:
+        print("\n\n⚠️  Interrupted by user.")
+    
+    finally:
+        server.stop()
+    
+    if not results:
+        return
+    
+    # Summary table + results file
+    print("\n" + "="*70)
+    print(f"{'pipeline':<12}{'locations':>10}{'records':>12}{'seconds':>10}{'records/s':>12}{'failed':>8}")
+    for r in results:
+        print(f"{r['pipeline']:<12}{r['locations']:>10,}{r['records']:>12,}{r['seconds']:>10.1f}"
+              f"{r['records_per_second']:>12,.0f}{r['failed_locations']:>8}")
+    print("="*70)
+    
+    BENCHMARK_DIR.mkdir(parents=True, exist_ok=True)
+    out_file = BENCHMARK_DIR / f"fetch_{started.strftime('%Y%m%d_%H%M%S')}.json"
+    with open(out_file, "w", encoding="utf-8") as f:
+        json.dump({
+            "started": started.isoformat(timespec="seconds"),
+            "settings": vars(args),
+            "results": results,
+            "server": server.stats(),
+        }, f, indent=2)
+    print(f"📊 Results written to {out_file}\n")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,240 @@
+"""
+Small-File Compaction - Merge the processed datasets' small Parquet files
+
+Every incremental run of process_to_parquet.py adds (at least) one file to
+each partition it touches, so after a few months of daily runs a
+location/year partition holds hundreds of small files: every scan then
+opens hundreds of footers and reads tiny row groups.
+
+This script merges the files of each such partition into files of about
+COMPACTION_TARGET_MB (see PartitionedStore.compact_partition):
+- rows stay sorted by date, written with the usual layout (row groups per
+  month for hourly / per year for daily, statistics, page indexes)
+- the new files are written next to the partition and swapped in with
+  one directory rename, so readers see either the old or the new files
+- before/after file counts, sizes and full-scan times are reported
+
+Run it when process_to_parquet.py is not running.
+
+Usage:
+    python scripts/compact_parquet.py               # Compact both datasets
+    python scripts/compact_parquet.py --dry-run     # Only show what would be merged
+    python scripts/compact_parquet.py --frequency hourly --target-mb 64
+"""
+
+import sys
+import time
+from pathlib import Path
+from datetime import datetime
+import argparse
+
+# ============================================================================
+# SETUP
+# ============================================================================
+
+project_root = Path(__file__).parent.parent
+sys.path.insert(0, str(project_root / "src"))
+
+from config import PROCESSED_HOURLY_DATASET, PROCESSED_DAILY_DATASET, PROCESSED_PARTITION_BY, COMPACTION_TARGET_MB
+from partitioned_store import PartitionedStore
+from parquet_layout import ParquetLayout, COMPRESSIONS
+
+DATASETS = {
+    "hourly": PROCESSED_HOURLY_DATASET,
+    "daily": PROCESSED_DAILY_DATASET,
+}
+
+
+# ============================================================================
+# HELPER FUNCTIONS
+# ============================================================================
+
+def time_full_scan(store, runs=3):
+    """
+    Time reading the whole dataset (listing, footers and all column data).
+    
+    Returns:
+        (best time in seconds over the runs, rows read)
+    """
+    best = None
+    rows = 0
+    for _ in range(runs):
+        start = time.perf_counter()
+        dataset = store.dataset()
+        rows = dataset.to_table().num_rows if dataset is not None else 0
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+    return best, rows
+
+
+def format_mb(n_bytes):
+    return f"{n_bytes / (1024 * 1024):.2f} MB"
+
+
+# ============================================================================
+# MAIN PROCESSING FUNCTIONS
+# ============================================================================
+
+def compact_dataset(frequency, target_mb, dry_run=False, scan_runs=3, layout=None):
+    """
+    Compact the partitions of one dataset that hold more files than they need.
+    
+    Args:
+        frequency: "hourly" or "daily"
+        target_mb: Size to aim for per file
+        dry_run: Only print what would be merged
+        scan_runs: Full scans timed before and after (best one counts)
+        layout: ParquetLayout for the merged files (default from config.py)
+    
+    Returns:
+        Dict with before/after files, bytes and scan times (None if the
+        dataset is empty), False if a partition failed
+    """
+    print("\n" + "="*80)
+    print(f"🗜️  Compacting {frequency.upper()} Data")
+    print("="*80)
+    
+    store = PartitionedStore(DATASETS[frequency], partition_by=PROCESSED_PARTITION_BY, layout=layout)
+    if store.is_empty():
+        print(f"   ⚠️  No data in {store.root}")
+        return None
+    
+    target_bytes = target_mb * 1024 * 1024
+    plans = [
+        plan for plan in (store.compaction_plan(partition, target_bytes) for partition in store.partitions())
+        if plan is not None
+    ]
+    
+    before = store.summary()
+    print(f"   Dataset: {store.root}")
+    print(f"   {before['files']:,} files in {len(store.partitions()):,} partitions ({format_mb(before['bytes'])})")
+    
+    if not plans:
+        print(f"   ✅ Nothing to compact (no partition fits in fewer {target_mb} MB files)")
+        return {"before": before, "after": before, "partitions": 0}
+    
+    files_in = sum(len(plan["files"]) for plan in plans)
+    files_out = sum(plan["files_after"] for plan in plans)
+    print(f"   {len(plans):,} partitions to compact: {files_in:,} files -> {files_out:,}")
+    
+    if dry_run:
+        for plan in plans:
+            partition = plan["partition"].relative_to(store.root)
+            print(f"      {str(partition):<45} {len(plan['files']):>5} files -> {plan['files_after']} "
+                  f"({format_mb(plan['bytes'])}, {plan['rows']:,} rows)")
+        print("\n   🔎 Dry run: nothing changed")
+        return {"before": before, "after": before, "partitions": 0}
+    
+    before_scan, before_rows = time_full_scan(store, scan_runs)
+    
+    compacted = 0
+    skipped = 0
+    atomic = True
+    for i, plan in enumerate(plans, 1):
+        partition = plan["partition"].relative_to(store.root)
+        try:
+            result = store.compact_partition(plan["partition"], target_bytes)
+        except Exception as e:
+            print(f"   ❌ {partition}: {e}")
+            return False
+        if result is None:
+            # Files changed under us (a process_to_parquet.py run?)
+            print(f"   ⚠️  {partition}: changed while compacting, left as it was")
+            skipped += 1
+            continue
+        compacted += 1
+        atomic = atomic and result["atomic"]
+        if i % 50 == 0 or i == len(plans):
+            print(f"   [{i}/{len(plans)}] {partition}: {len(result['files'])} files -> {result['files_written']}")
+    
+    if not atomic:
+        print("   ⚠️  Directory exchange not supported here: partitions were swapped with two renames")
+    
+    after = store.summary()
+    after_scan, after_rows = time_full_scan(store, scan_runs)
+    
+    print(f"\n   📈 Compaction Results ({compacted} partitions compacted, {skipped} skipped):")
+    print(f"      {'':<12} {'Before':>14} {'After':>14}")
+    print(f"      {'Files':<12} {before['files']:>14,} {after['files']:>14,}")
+    print(f"      {'Size':<12} {format_mb(before['bytes']):>14} {format_mb(after['bytes']):>14}")
+    print(f"      {'Full scan':<12} {before_scan:>13.3f}s {after_scan:>13.3f}s")
+    if after_scan > 0:
+        print(f"      Scan speedup: {before_scan / after_scan:.1f}x")
+    if after_rows != before_rows:
+        # Only duplicate dates across files are dropped
+        print(f"      ⚠️  Rows: {before_rows:,} -> {after_rows:,} (duplicate dates removed)")
+    else:
+        print(f"      Rows: {after_rows:,} (unchanged)")
+    
+    return {"before": before, "after": after, "partitions": compacted,
+            "scan_before": before_scan, "scan_after": after_scan}
+
+
+# ============================================================================
+# MAIN
+# ============================================================================
+
+def main():
+    """Main entry point."""
+    
+    parser = argparse.ArgumentParser(description="Merge small Parquet files in the processed datasets")
+    parser.add_argument('--frequency', choices=['hourly', 'daily', 'all'], default='all',
+                       help='Dataset to compact (default: both)')
+    parser.add_argument('--target-mb', type=float, default=COMPACTION_TARGET_MB,
+                       help=f'Size per merged file (default: {COMPACTION_TARGET_MB})')
+    parser.add_argument('--dry-run', action='store_true',
+                       help='Only show which partitions would be merged')
+    parser.add_argument('--scan-runs', type=int, default=3,
+                       help='Full scans timed before and after (best one is reported)')
+    parser.add_argument('--compression', choices=COMPRESSIONS, default=None,
+                       help='Compression for the merged files (default from config.py)')
+    parser.add_argument('--compression-level', type=int, default=None,
+                       help='Compression level, e.g. zstd 1 (fast) .. 22 (small)')
+    args = parser.parse_args()
+    
+    layout_options = {}
+    if args.compression:
+        layout_options['compression'] = args.compression
+    if args.compression_level is not None:
+        layout_options['compression_level'] = args.compression_level
+    layouts = {
+        frequency: ParquetLayout.for_frequency(frequency, **layout_options)
+        for frequency in ('hourly', 'daily')
+    }
+    
+    print("\n" + "🌍 SA TOURISM WEATHER PROJECT - PARQUET COMPACTION")
+    print("="*80)
+    print(f"   Target file size: {args.target_mb:g} MB")
+    for frequency, layout in layouts.items():
+        print(f"   {frequency.capitalize()}: {layout}")
+    print("="*80)
+    
+    start_time = datetime.now()
+    frequencies = ['hourly', 'daily'] if args.frequency == 'all' else [args.frequency]
+    results = {
+        frequency: compact_dataset(frequency, args.target_mb, dry_run=args.dry_run,
+                                   scan_runs=args.scan_runs, layout=layouts[frequency])
+        for frequency in frequencies
+    }
+    
+    elapsed = (datetime.now() - start_time).total_seconds()
+    
+    print("\n" + "="*80)
+    print("✅ COMPACTION COMPLETE!" if not args.dry_run else "🔎 DRY RUN COMPLETE")
+    print(f"   Total time: {elapsed:.1f}s")
+    for frequency, result in results.items():
+        if result is False:
+            print(f"   ⚠️  {frequency.capitalize()} data: Issues encountered")
+        elif result is None:
+            print(f"   ⚠️  {frequency.capitalize()} data: No data")
+        else:
+            print(f"   ✅ {frequency.capitalize()} data: {result['before']['files']:,} -> "
+                  f"{result['after']['files']:,} files")
+    print("="*80 + "\n")
+    
+    if any(result is False for result in results.values()):
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
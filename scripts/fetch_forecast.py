@@ -4,18 +4,23 @@ Forecast Data Fetching Script
 Fetches ALL available forecast weather data for SA locations and saves as CSV files.
 Forecast API provides: current conditions + 16 days forecast
 
+Only locations with a newer model run than the one already saved are
+fetched, and only the part of the horizon the new run changed.
+
 Usage:
-    python scripts/fetch_forecast.py
+    python scripts/fetch_forecast.py          # Fetch what changed since the last model run
+    python scripts/fetch_forecast.py --full   # Full refresh for every location
 """
 
 import sys
-from pathlib import Path
-from datetime import datetime
 import time
+from pathlib import Path
+from datetime import datetime, timezone
+import argparse
 import pandas as pd
 import openmeteo_requests
+import requests
 import requests_cache
-from retry_requests import retry
 
 # ============================================================================
 # SETUP
@@ -26,240 +31,393 @@ project_root = Path(__file__).parent.parent
 sys.path.insert(0, str(project_root / "src"))
 
 # Import locations from config
-from config import LOCATIONS
+from config import (
+    LOCATIONS, API_BASE_URL, API_LOCATIONS_PER_REQUEST, FORECAST_DAYS, FORECAST_PAST_DAYS,
+    FORECAST_PROFILE, get_variable_profile, profile_names,
+)
+from rate_limiter import RateLimitLedger, estimate_call_weight
+from model_runs import ForecastState, fetch_latest_run, next_expected_run
+from forecast_snapshots import ForecastSnapshotStore
+from metrics import FetchMetrics, InstrumentedSession
+from api_controller import ApiController, ControlledAdapter
+from weather_schema import conform_frame
+from csv_ingest import read_csv_frame
 
-# Data directories - Forecast data goes to data/raw/forecast
+# Data directories - Forecast data goes to data/raw/forecast (created by setup())
 data_dir = project_root / "data" / "raw" / "forecast"
 current_dir = data_dir / "current"
 hourly_dir = data_dir / "hourly"
 daily_dir = data_dir / "daily"
-current_dir.mkdir(parents=True, exist_ok=True)
-hourly_dir.mkdir(parents=True, exist_ok=True)
-daily_dir.mkdir(parents=True, exist_ok=True)
-
-# ALL CURRENT VARIABLES from Forecast API
-CURRENT_VARIABLES = [
-    "temperature_2m", "relative_humidity_2m", "apparent_temperature", "is_day",
-    "precipitation", "rain", "showers", "snowfall", "weather_code",
-    "cloud_cover", "pressure_msl", "surface_pressure", "wind_speed_10m",
-    "wind_direction_10m", "wind_gusts_10m"
-]
-
-# ALL HOURLY VARIABLES from Forecast API (ALL 156 variables!)
-HOURLY_VARIABLES = [
-    "temperature_2m", "relative_humidity_2m", "dew_point_2m", "apparent_temperature",
-    "precipitation_probability", "precipitation", "rain", "showers", "snowfall",
-    "snow_depth", "weather_code", "pressure_msl", "surface_pressure", "cloud_cover",
-    "cloud_cover_low", "cloud_cover_mid", "cloud_cover_high", "visibility",
-    "evapotranspiration", "et0_fao_evapotranspiration", "vapour_pressure_deficit",
-    "wind_speed_10m", "wind_speed_80m", "wind_speed_120m", "wind_speed_180m",
-    "wind_direction_10m", "wind_direction_80m", "wind_direction_120m", "wind_direction_180m",
-    "wind_gusts_10m", "temperature_80m", "temperature_120m", "temperature_180m",
-    "soil_moisture_0_to_1cm", "soil_moisture_1_to_3cm", "soil_moisture_3_to_9cm",
-    "soil_moisture_9_to_27cm", "soil_moisture_27_to_81cm",
-    "soil_temperature_0cm", "soil_temperature_6cm", "soil_temperature_18cm", "soil_temperature_54cm",
-    "temperature_1000hPa", "temperature_975hPa", "temperature_950hPa", "temperature_925hPa",
-    "temperature_900hPa", "temperature_850hPa", "temperature_800hPa", "temperature_700hPa",
-    "temperature_600hPa", "temperature_500hPa", "temperature_400hPa", "temperature_300hPa",
-    "temperature_250hPa", "temperature_200hPa", "temperature_150hPa", "temperature_100hPa",
-    "temperature_70hPa", "temperature_50hPa", "temperature_30hPa",
-    "relative_humidity_1000hPa", "relative_humidity_975hPa", "relative_humidity_950hPa",
-    "relative_humidity_925hPa", "relative_humidity_900hPa", "relative_humidity_850hPa",
-    "relative_humidity_800hPa", "relative_humidity_700hPa", "relative_humidity_600hPa",
-    "relative_humidity_500hPa", "relative_humidity_400hPa", "relative_humidity_300hPa",
-    "relative_humidity_250hPa", "relative_humidity_200hPa", "relative_humidity_150hPa",
-    "relative_humidity_100hPa", "relative_humidity_70hPa", "relative_humidity_50hPa",
-    "relative_humidity_30hPa",
-    "cloud_cover_1000hPa", "cloud_cover_975hPa", "cloud_cover_950hPa", "cloud_cover_925hPa",
-    "cloud_cover_900hPa", "cloud_cover_850hPa", "cloud_cover_800hPa", "cloud_cover_700hPa",
-    "cloud_cover_600hPa", "cloud_cover_500hPa", "cloud_cover_400hPa", "cloud_cover_300hPa",
-    "cloud_cover_250hPa", "cloud_cover_200hPa", "cloud_cover_150hPa", "cloud_cover_100hPa",
-    "cloud_cover_70hPa", "cloud_cover_50hPa", "cloud_cover_30hPa",
-    "wind_speed_1000hPa", "wind_speed_975hPa", "wind_speed_950hPa", "wind_speed_925hPa",
-    "wind_speed_900hPa", "wind_speed_850hPa", "wind_speed_800hPa", "wind_speed_700hPa",
-    "wind_speed_600hPa", "wind_speed_500hPa", "wind_speed_400hPa", "wind_speed_300hPa",
-    "wind_speed_250hPa", "wind_speed_200hPa", "wind_speed_150hPa", "wind_speed_100hPa",
-    "wind_speed_70hPa", "wind_speed_50hPa", "wind_speed_30hPa",
-    "wind_direction_1000hPa", "wind_direction_975hPa", "wind_direction_950hPa",
-    "wind_direction_925hPa", "wind_direction_900hPa", "wind_direction_850hPa",
-    "wind_direction_800hPa", "wind_direction_700hPa", "wind_direction_600hPa",
-    "wind_direction_500hPa", "wind_direction_400hPa", "wind_direction_300hPa",
-    "wind_direction_250hPa", "wind_direction_200hPa", "wind_direction_150hPa",
-    "wind_direction_100hPa", "wind_direction_70hPa", "wind_direction_50hPa",
-    "wind_direction_30hPa",
-    "geopotential_height_1000hPa", "geopotential_height_975hPa", "geopotential_height_950hPa",
-    "geopotential_height_925hPa", "geopotential_height_900hPa", "geopotential_height_850hPa",
-    "geopotential_height_800hPa", "geopotential_height_700hPa", "geopotential_height_600hPa",
-    "geopotential_height_500hPa", "geopotential_height_400hPa", "geopotential_height_300hPa",
-    "geopotential_height_250hPa", "geopotential_height_200hPa", "geopotential_height_150hPa",
-    "geopotential_height_100hPa", "geopotential_height_70hPa", "geopotential_height_50hPa",
-    "geopotential_height_30hPa"
-]
-
-# ALL DAILY VARIABLES from Forecast API (61 variables!)
-DAILY_VARIABLES = [
-    "weather_code", "temperature_2m_max", "temperature_2m_min", "apparent_temperature_max",
-    "apparent_temperature_min", "sunrise", "sunset", "daylight_duration", "sunshine_duration",
-    "uv_index_max", "uv_index_clear_sky_max", "rain_sum", "showers_sum", "snowfall_sum",
-    "precipitation_sum", "precipitation_hours", "precipitation_probability_max",
-    "wind_speed_10m_max", "wind_gusts_10m_max", "wind_direction_10m_dominant",
-    "shortwave_radiation_sum", "et0_fao_evapotranspiration", "temperature_2m_mean",
-    "apparent_temperature_mean", "cape_mean", "cape_max", "cape_min", "cloud_cover_mean",
-    "cloud_cover_max", "cloud_cover_min", "dew_point_2m_mean", "dew_point_2m_max",
-    "dew_point_2m_min", "pressure_msl_min", "pressure_msl_max", "pressure_msl_mean",
-    "snowfall_water_equivalent_sum", "relative_humidity_2m_min", "relative_humidity_2m_max",
-    "relative_humidity_2m_mean", "precipitation_probability_min", "precipitation_probability_mean",
-    "leaf_wetness_probability_mean", "growing_degree_days_base_0_limit_50",
-    "et0_fao_evapotranspiration_sum", "surface_pressure_mean", "surface_pressure_max",
-    "surface_pressure_min", "updraft_max", "visibility_mean", "visibility_min", "visibility_max",
-    "winddirection_10m_dominant", "wind_gusts_10m_mean", "wind_speed_10m_mean",
-    "wind_gusts_10m_min", "wind_speed_10m_min", "wet_bulb_temperature_2m_mean",
-    "wet_bulb_temperature_2m_max", "wet_bulb_temperature_2m_min", "vapour_pressure_deficit_max"
-]
-
-# Setup Open-Meteo API client with cache and retry
-cache_session = requests_cache.CachedSession(str(project_root / '.cache'), expire_after=3600)
-retry_session = retry(cache_session, retries=5, backoff_factor=0.2)
-openmeteo = openmeteo_requests.Client(session=retry_session)
+
+# Variables to fetch come from a profile in config.VARIABLE_PROFILES
+# ('full-forecast' = all 156 hourly incl. pressure levels, 'tourism-core' =
+# ground-level variables used by the analysis). Change with --profile.
+VARIABLE_PROFILE = FORECAST_PROFILE
+CURRENT_VARIABLES = get_variable_profile(VARIABLE_PROFILE, "forecast")["current"]
+HOURLY_VARIABLES = get_variable_profile(VARIABLE_PROFILE, "forecast")["hourly"]
+DAILY_VARIABLES = get_variable_profile(VARIABLE_PROFILE, "forecast")["daily"]
+
+
+def apply_profile(profile_name):
+    """Switch the variables this script fetches to another profile."""
+    global VARIABLE_PROFILE, CURRENT_VARIABLES, HOURLY_VARIABLES, DAILY_VARIABLES
+    variables = get_variable_profile(profile_name, "forecast")
+    VARIABLE_PROFILE = profile_name
+    CURRENT_VARIABLES = variables["current"]
+    HOURLY_VARIABLES = variables["hourly"]
+    DAILY_VARIABLES = variables["daily"]
+
+# API client, call ledger and run state - created by setup(), so importing
+# this module (e.g. from scripts/benchmark_fetch.py) writes nothing to disk
+metrics = None
+controller = None
+cache_session = None
+openmeteo = None
+rate_limiter = None
+forecast_state = None
+snapshot_store = None
+
+
+def setup():
+    """Create the data directories, the cached API client and the run state."""
+    global metrics, controller, cache_session, openmeteo, rate_limiter, forecast_state, snapshot_store
+    
+    for directory in (current_dir, hourly_dir, daily_dir):
+        directory.mkdir(parents=True, exist_ok=True)
+    
+    # Setup Open-Meteo API client with cache and retry
+    # Cached responses expire when the next model run is due, not after a flat hour
+    seconds_to_next_run = (next_expected_run() - datetime.now(timezone.utc)).total_seconds()
+    cache_session = requests_cache.CachedSession(
+        str(project_root / '.cache'), expire_after=max(int(seconds_to_next_run), 60)
+    )
+    # Latency, bytes, retries, cache hits, rate-limit waits and parse time for
+    # this run, written to data/metrics/fetch_forecast.{json,prom} at the end
+    metrics = FetchMetrics("fetch_forecast")
+    
+    # Retries with jittered backoff / Retry-After, adaptive concurrency and a circuit breaker
+    controller = ApiController(
+        retry_exceptions=(requests.ConnectionError, requests.Timeout),
+        metrics=metrics,
+        source="forecast",
+    )
+    # The controller sits UNDER the cache (as the session's transport adapter),
+    # so cache hits never take a concurrency slot or count as fast successes
+    adapter = ControlledAdapter(controller)
+    cache_session.mount("https://", adapter)
+    cache_session.mount("http://", adapter)
+    openmeteo = openmeteo_requests.Client(
+        session=InstrumentedSession(cache_session, metrics, source="forecast")
+    )
+    
+    # Shared call ledger (data/rate_limit_ledger.json), also used by the historical fetcher
+    rate_limiter = RateLimitLedger()
+    
+    # Which model run each location was last fetched from
+    forecast_state = ForecastState()
+    
+    # Every run we fetch is also kept (delta-encoded) in data/raw/forecast/snapshots,
+    # because the CSVs above only hold the latest run
+    snapshot_store = ForecastSnapshotStore()
 
 # ============================================================================
 # FETCH FUNCTIONS
 # ============================================================================
 
-def fetch_forecast(location_code):
+def current_to_frame(current, location_code, location):
+    """One-row DataFrame of the current conditions in a response."""
+    current_data = {
+        "timestamp": [pd.to_datetime(current.Time(), unit="s", utc=True)],
+        "location_code": [location_code],
+        "location_name": [location["name"]]
+    }
+    
+    # Add all current variables
+    for i, var in enumerate(CURRENT_VARIABLES):
+        current_data[var] = [current.Variables(i).Value()]
+    
+    return conform_frame(pd.DataFrame(data=current_data))
+
+
+def section_to_frame(section, variables, location_code, location):
+    """DataFrame of the hourly or daily section of a response."""
+    data = {
+        "date": pd.date_range(
+            start=pd.to_datetime(section.Time(), unit="s", utc=True),
+            end=pd.to_datetime(section.TimeEnd(), unit="s", utc=True),
+            freq=pd.Timedelta(seconds=section.Interval()),
+            inclusive="left"
+        ),
+        "location_code": location_code,
+        "location_name": location["name"]
+    }
+    
+    # Add all variables (sunrise/sunset are int64 timestamps)
+    for i, var in enumerate(variables):
+        if var in ["sunset", "sunrise"]:
+            data[var] = section.Variables(i).ValuesInt64AsNumpy()
+        else:
+            data[var] = section.Variables(i).ValuesAsNumpy()
+    
+    return conform_frame(pd.DataFrame(data=data))
+
+
+def response_to_frames(response, location_code):
     """
-    Fetch forecast data for one location and save to CSV.
+    Turn one forecast API response into current, hourly and daily DataFrames.
     
     Args:
-        location_code: e.g. 'cape_town', 'johannesburg'
+        response: One WeatherApiResponse from openmeteo.weather_api()
+        location_code: Location the response belongs to
+    
+    Returns:
+        (current_df, hourly_df, daily_df) in the compact weather_schema.py dtypes;
+        None for a section the profile does not request (e.g. 'pressure-levels'
+        has no current or daily variables)
     """
     location = LOCATIONS[location_code]
-    print(f"\n📍 Fetching forecast for {location['name']}...")
+    current_df = hourly_df = daily_df = None
     
-    try:
-        # API request - Forecast API (16 days ahead)
-        url = "https://api.open-meteo.com/v1/forecast"
-        params = {
-            "latitude": location["latitude"],
-            "longitude": location["longitude"],
-            "current": CURRENT_VARIABLES,
-            "hourly": HOURLY_VARIABLES,
-            "daily": DAILY_VARIABLES,
-            "timezone": "auto",
-            "start_date": "2025-08-16",
-            "end_date": "2025-11-30"
-        }
-        
-        responses = openmeteo.weather_api(url, params=params)
-        response = responses[0]
-        
-        print(f"   Coordinates: {response.Latitude()}°N {response.Longitude()}°E")
-        print(f"   Elevation: {response.Elevation()} m")
-        
-        # ===== CURRENT DATA =====
-        current = response.Current()
-        current_data = {
-            "timestamp": [pd.to_datetime(current.Time(), unit="s", utc=True)],
-            "location_code": [location_code],
-            "location_name": [location["name"]]
-        }
-        
-        # Add all current variables
-        for i, var in enumerate(CURRENT_VARIABLES):
-            current_data[var] = [current.Variables(i).Value()]
-        
-        current_df = pd.DataFrame(data=current_data)
-        
-        # Save current (REPLACE - always get latest)
+    # ===== CURRENT DATA =====
+    current = response.Current() if CURRENT_VARIABLES else None
+    if current is not None:
+        current_df = current_to_frame(current, location_code, location)
+    
+    # ===== HOURLY DATA =====
+    hourly = response.Hourly() if HOURLY_VARIABLES else None
+    if hourly is not None:
+        hourly_df = section_to_frame(hourly, HOURLY_VARIABLES, location_code, location)
+    
+    # ===== DAILY DATA =====
+    daily = response.Daily() if DAILY_VARIABLES else None
+    if daily is not None:
+        daily_df = section_to_frame(daily, DAILY_VARIABLES, location_code, location)
+    
+    return current_df, hourly_df, daily_df
+
+
+def merge_forecast_csv(csv_file, new_df):
+    """
+    Replace the changed part of a forecast CSV with new_df.
+    
+    Rows before the first date in new_df are kept (they did not change),
+    everything from there on comes from the new model run.
+    """
+    if not csv_file.exists():
+        return new_df
+    
+    existing_df = read_csv_frame(csv_file)
+    kept_df = existing_df[existing_df['date'] < new_df['date'].min()]
+    return conform_frame(pd.concat([kept_df, new_df], ignore_index=True))
+
+
+def save_forecast_frames(location_code, current_df, hourly_df, daily_df, merge=False,
+                         model_run=None):
+    """
+    Write a location's forecast frames to CSV.
+    
+    Frames that are None (sections the profile does not request) are
+    skipped: no CSV and no snapshot for them.
+    
+    Args:
+        merge: False = REPLACE the files (full fetch),
+               True = keep older rows and replace only the re-fetched horizon
+        model_run: Issue time of the run; the merged frames are also added to
+            the snapshot store under it (None = skip snapshots)
+    """
+    if current_df is not None:
         current_csv = current_dir / f"{location_code}_current.csv"
         current_df.to_csv(current_csv, index=False)
         print(f"   ✅ Saved current conditions to {current_csv.name}")
+    
+    frames = {"hourly": (hourly_df, hourly_dir), "daily": (daily_df, daily_dir)}
+    for frequency, (df, directory) in frames.items():
+        if df is None:
+            continue
+        csv_file = directory / f"{location_code}_{frequency}.csv"
+        if merge:
+            df = merge_forecast_csv(csv_file, df)
+        df.to_csv(csv_file, index=False)
+        print(f"   ✅ Saved {len(df)} {frequency} forecast records to {csv_file.name}")
         
-        # ===== HOURLY DATA =====
-        hourly = response.Hourly()
-        hourly_data = {
-            "date": pd.date_range(
-                start=pd.to_datetime(hourly.Time(), unit="s", utc=True),
-                end=pd.to_datetime(hourly.TimeEnd(), unit="s", utc=True),
-                freq=pd.Timedelta(seconds=hourly.Interval()),
-                inclusive="left"
-            ),
-            "location_code": location_code,
-            "location_name": location["name"]
+        if model_run is not None:
+            snapshot_store.save(location_code, frequency, df, model_run)
+    
+    if model_run is not None:
+        print(f"   ✅ Snapshot stored for run {model_run.strftime('%Y-%m-%d %H:%M')} UTC")
+
+
+def fetch_forecast_group(location_codes, model_run=None, start_date=None):
+    """
+    Fetch forecasts for several locations in ONE API request.
+    
+    Open-Meteo accepts lists of coordinates and returns one response per
+    coordinate, in the same order, so we split them back per location.
+    
+    Args:
+        location_codes: list of location codes, e.g. ['cape_town', 'durban']
+        model_run: Model run being fetched (recorded in the forecast state and
+            used as the snapshot issue time; None = no snapshot)
+        start_date: "YYYY-MM-DD" to fetch only from this day to the end of the
+            horizon and merge into the existing CSVs (None = full fetch)
+    
+    Returns:
+        Dict of location_code -> True/False (saved successfully)
+    """
+    locations = [LOCATIONS[code] for code in location_codes]
+    names = ", ".join(location["name"] for location in locations)
+    print(f"\n📍 Fetching forecast for {names}...")
+    
+    try:
+        # API request - Forecast API (16 days ahead)
+        url = API_BASE_URL
+        params = {
+            # Comma-separated coordinate lists -> one response per location
+            "latitude": ",".join(str(location["latitude"]) for location in locations),
+            "longitude": ",".join(str(location["longitude"]) for location in locations),
+            "timezone": "auto",
         }
+        # Only the sections the profile has variables for
+        sections = {"current": CURRENT_VARIABLES, "hourly": HOURLY_VARIABLES, "daily": DAILY_VARIABLES}
+        params.update({section: variables for section, variables in sections.items() if variables})
         
-        # Add all hourly variables
-        for i, var in enumerate(HOURLY_VARIABLES):
-            hourly_data[var] = hourly.Variables(i).ValuesAsNumpy()
-        
-        hourly_df = pd.DataFrame(data=hourly_data)
-        
-        # Save hourly (REPLACE - forecast changes)
-        hourly_csv = hourly_dir / f"{location_code}_hourly.csv"
-        hourly_df.to_csv(hourly_csv, index=False)
-        print(f"   ✅ Saved {len(hourly_df)} hourly forecast records to {hourly_csv.name}")
-        
-        # ===== DAILY DATA =====
-        daily = response.Daily()
-        daily_data = {
-            "date": pd.date_range(
-                start=pd.to_datetime(daily.Time(), unit="s", utc=True),
-                end=pd.to_datetime(daily.TimeEnd(), unit="s", utc=True),
-                freq=pd.Timedelta(seconds=daily.Interval()),
-                inclusive="left"
-            ),
-            "location_code": location_code,
-            "location_name": location["name"]
-        }
+        if start_date:
+            # Delta: only the days the new model run can have changed
+            today = pd.Timestamp.now(tz=locations[0]["timezone"]).normalize()
+            params["start_date"] = start_date
+            params["end_date"] = (today + pd.Timedelta(days=FORECAST_DAYS - 1)).strftime("%Y-%m-%d")
+            n_days = (pd.Timestamp(params["end_date"]) - pd.Timestamp(start_date)).days + 1
+            print(f"   Delta fetch: {start_date} to {params['end_date']}")
+        else:
+            params["past_days"] = FORECAST_PAST_DAYS
+            params["forecast_days"] = FORECAST_DAYS
+            n_days = FORECAST_PAST_DAYS + FORECAST_DAYS
         
-        # Add all daily variables
-        for i, var in enumerate(DAILY_VARIABLES):
-            if var in ["sunset", "sunrise"]:
-                daily_data[var] = daily.Variables(i).ValuesInt64AsNumpy()
-            else:
-                daily_data[var] = daily.Variables(i).ValuesAsNumpy()
+        # Wait for room in the shared API budget
+        n_variables = len(CURRENT_VARIABLES) + len(HOURLY_VARIABLES) + len(DAILY_VARIABLES)
+        waited = rate_limiter.acquire(estimate_call_weight(n_variables, n_days, len(location_codes)))
+        metrics.observe("rate_limit_wait_seconds", waited, source="forecast")
+        if waited > 0:
+            print(f"   ⏳ Waited {waited:.1f}s for rate limit ({names})")
         
-        daily_df = pd.DataFrame(data=daily_data)
+        responses = openmeteo.weather_api(url, params=params)
+        if len(responses) != len(location_codes):
+            raise ValueError(f"expected {len(location_codes)} responses, got {len(responses)}")
+    
+    except Exception as e:
+        print(f"   ❌ ERROR ({names}): {e}")
+        return {code: False for code in location_codes}
+    
+    results = {}
+    for location_code, response in zip(location_codes, responses):
+        try:
+            parse_start = time.perf_counter()
+            current_df, hourly_df, daily_df = response_to_frames(response, location_code)
+            frames = [df for df in (current_df, hourly_df, daily_df) if df is not None]
+            metrics.inc("records_parsed_total", sum(len(df) for df in frames), source="forecast")
+            save_forecast_frames(location_code, current_df, hourly_df, daily_df,
+                                 merge=start_date is not None,
+                                 model_run=model_run)
+            metrics.observe("parse_seconds", time.perf_counter() - parse_start, source="forecast")
+            if model_run is not None:
+                forecast_state.record(location_code, model_run)
+            results[location_code] = True
+        except Exception as e:
+            print(f"   ❌ ERROR ({location_code}): {e}")
+            results[location_code] = False
+    
+    return results
+
+
+def fetch_forecast(location_code):
+    """
+    Fetch forecast data for one location and save to CSV.
+    
+    The model run is looked up first (as in fetch_all_forecasts), so the
+    snapshot is stored under the run actually fetched.
+    
+    Args:
+        location_code: e.g. 'cape_town', 'johannesburg'
+    """
+    return fetch_forecast_group([location_code], model_run=fetch_latest_run())[location_code]
+
+
+def plan_forecast_requests(location_codes, latest_run, full=False):
+    """
+    Decide what each location needs for the latest model run.
+    
+    - already has latest_run -> skipped (no API call)
+    - never fetched / no CSV yet / full=True -> full fetch
+    - otherwise -> delta from the day of the run we last fetched
+      (everything before that was already final in the previous run)
+    
+    Returns:
+        (plan, skipped): plan maps start_date (None = full) -> location codes
+    """
+    plan = {}
+    skipped = []
+    
+    for location_code in location_codes:
+        if not full and forecast_state.is_current(location_code, latest_run):
+            skipped.append(location_code)
+            continue
         
-        # Save daily (REPLACE - forecast changes)
-        daily_csv = daily_dir / f"{location_code}_daily.csv"
-        daily_df.to_csv(daily_csv, index=False)
-        print(f"   ✅ Saved {len(daily_df)} daily forecast records to {daily_csv.name}")
+        last_run = forecast_state.last_run(location_code)
+        has_csv = (hourly_dir / f"{location_code}_hourly.csv").exists()
+        if full or last_run is None or not has_csv:
+            start_date = None
+        else:
+            location_tz = LOCATIONS[location_code]["timezone"]
+            start_date = pd.Timestamp(last_run).tz_convert(location_tz).strftime("%Y-%m-%d")
         
-        return True
+        plan.setdefault(start_date, []).append(location_code)
     
-    except Exception as e:
-        print(f"   ❌ ERROR: {e}")
-        return False
+    return plan, skipped
 
 
-def fetch_all_forecasts():
-    """Fetch forecasts for all 15 locations."""
+def fetch_all_forecasts(group_size=API_LOCATIONS_PER_REQUEST, full=False):
+    """
+    Fetch forecasts for all 15 locations, `group_size` locations per request.
+    
+    Only locations whose data is older than the latest model run are
+    fetched, and only the part of the horizon that run changed
+    (full=True forces a full fetch for every location).
+    """
     print("\n" + "="*70)
     print("🌍 SA TOURISM WEATHER PROJECT - FORECAST DATA COLLECTION")
     print("="*70)
-    print(f"Fetching forecasts for {len(LOCATIONS)} locations")
+    
+    latest_run = fetch_latest_run()
+    print(f"Latest model run: {latest_run.strftime('%Y-%m-%d %H:%M')} UTC")
+    
+    plan, skipped = plan_forecast_requests(list(LOCATIONS.keys()), latest_run, full=full)
+    groups = [
+        (start_date, codes[i:i + group_size])
+        for start_date, codes in plan.items()
+        for i in range(0, len(codes), group_size)
+    ]
+    
+    print(f"Fetching forecasts for {len(LOCATIONS) - len(skipped)} locations ({len(groups)} requests)")
+    if skipped:
+        print(f"Up to date (no new model run): {len(skipped)} locations")
     print(f"Started: {datetime.now().strftime('%H:%M:%S')}")
     print("="*70)
     
     success = 0
     failed = []
     
-    for i, location_code in enumerate(LOCATIONS.keys(), 1):
-        print(f"\n[{i}/{len(LOCATIONS)}]", end=" ")
-        
-        if fetch_forecast(location_code):
-            success += 1
-        else:
-            failed.append(location_code)
+    for i, (start_date, group) in enumerate(groups, 1):
+        print(f"\n[{i}/{len(groups)}]", end=" ")
         
-        # Wait 1 second between locations (be nice to API)
-        if i < len(LOCATIONS):
-            time.sleep(1)
+        for location_code, ok in fetch_forecast_group(group, latest_run, start_date).items():
+            if ok:
+                success += 1
+            else:
+                failed.append(location_code)
     
     # Summary
     print("\n" + "="*70)
-    print(f"✅ DONE: {success}/{len(LOCATIONS)} successful")
+    print(f"✅ DONE: {success}/{len(LOCATIONS) - len(skipped)} successful, {len(skipped)} already up to date")
     if failed:
         print(f"   ⚠️  Failed: {', '.join(failed)}")
     print(f"   Current data: {current_dir}")
@@ -277,8 +435,20 @@ def fetch_all_forecasts():
 def main():
     """Main entry point for forecast fetching."""
     
+    parser = argparse.ArgumentParser(description="Fetch forecast weather data")
+    parser.add_argument('--full', action='store_true',
+                        help='Ignore saved model runs and re-fetch the full horizon')
+    parser.add_argument('--profile', choices=profile_names("forecast"), default=FORECAST_PROFILE,
+                        help=f'Variable profile to fetch (default: {FORECAST_PROFILE})')
+    args = parser.parse_args()
+    
+    setup()
+    apply_profile(args.profile)
+    print(f"📋 Variable profile: {VARIABLE_PROFILE} ({len(CURRENT_VARIABLES)} current, "
+          f"{len(HOURLY_VARIABLES)} hourly, {len(DAILY_VARIABLES)} daily)")
+    
     try:
-        fetch_all_forecasts()
+        fetch_all_forecasts(full=args.full)
     
     except KeyboardInterrupt:
         print("\n\n⚠️  Interrupted by user. Exiting gracefully...")
@@ -289,6 +459,11 @@ def main():
         import traceback
         traceback.print_exc()
         return
+    
+    finally:
+        metrics.print_summary()
+        paths = metrics.export()
+        print(f"   📊 Metrics written to {paths['json']} and {paths['prom'].name}")
 
 
 if __name__ == "__main__":
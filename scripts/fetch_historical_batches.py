@@ -5,17 +5,21 @@ Fetches ALL available weather data for SA locations and saves as CSV files.
 Data APPENDS to existing CSV files (safe to re-run).
 
 Usage:
-    python scripts/fetch_historical_batches.py
+    python scripts/fetch_historical_batches.py                          # Interactive menu
+    python scripts/fetch_historical_batches.py --backfill 2020-01-01    # Fetch only missing days
+    python scripts/fetch_historical_batches.py --backfill 2020-01-01 --end 2024-12-31 --source parquet
+    python scripts/fetch_historical_batches.py --format parquet          # Write Parquet partitions, not CSV
 """
 
 import sys
+import time
+import argparse
 from pathlib import Path
 from datetime import datetime
-import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
 import pandas as pd
 import openmeteo_requests
-import requests_cache
-from retry_requests import retry
+import requests
 
 # ============================================================================
 # SETUP
@@ -26,82 +30,235 @@ project_root = Path(__file__).parent.parent
 sys.path.insert(0, str(project_root / "src"))
 
 # Import locations from config
-from config import LOCATIONS
+from config import (
+    LOCATIONS, ARCHIVE_API_URL, API_MAX_WORKERS, API_CONCURRENCY_MAX, API_LOCATIONS_PER_REQUEST,
+    HTTP_CACHE_DIR, HISTORICAL_CACHE_MAX_MB,
+    HISTORICAL_PROFILE, get_variable_profile, profile_names,
+)
+from rate_limiter import RateLimitLedger, estimate_call_weight
+from backfill import BackfillCheckpoint, plan_backfill, DEFAULT_CHUNK_DAYS
+from arrow_writer import section_to_record_batch, write_partition
+from http_cache import BoundedCacheSession
+from metrics import FetchMetrics, InstrumentedSession
+from api_controller import ApiController, ControlledSession
+from weather_schema import conform_frame
 
-# Data directories - RAW data from API goes to data/raw/historical
+# Data directories - RAW data from API goes to data/raw/historical (created by setup())
 data_dir = project_root / "data" / "raw" / "historical"
 hourly_dir = data_dir / "hourly"
 daily_dir = data_dir / "daily"
-hourly_dir.mkdir(parents=True, exist_ok=True)
-daily_dir.mkdir(parents=True, exist_ok=True)
-
-# ALL HOURLY VARIABLES from Archive API
-HOURLY_VARIABLES = [
-    "temperature_2m", "relative_humidity_2m", "dew_point_2m",
-    "apparent_temperature", "precipitation", "rain", "snowfall",
-    "snow_depth", "weather_code", "pressure_msl", "surface_pressure",
-    "cloud_cover", "cloud_cover_low", "cloud_cover_mid", "cloud_cover_high",
-    "et0_fao_evapotranspiration", "vapour_pressure_deficit", "wind_gusts_10m",
-    "wind_direction_100m", "wind_direction_10m", "wind_speed_100m", "wind_speed_10m",
-    "soil_temperature_0_to_7cm", "soil_temperature_7_to_28cm",
-    "soil_temperature_28_to_100cm", "soil_temperature_100_to_255cm",
-    "soil_moisture_0_to_7cm", "soil_moisture_7_to_28cm",
-    "soil_moisture_28_to_100cm", "soil_moisture_100_to_255cm",
-    "sunshine_duration", "shortwave_radiation"  # ADDED: Tourism-relevant solar variables
-]
-
-# ALL DAILY VARIABLES from Archive API
-DAILY_VARIABLES = [
-    "weather_code", "temperature_2m_mean", "temperature_2m_max", "temperature_2m_min",
-    "apparent_temperature_mean", "apparent_temperature_max", "apparent_temperature_min",
-    "sunshine_duration", "daylight_duration", "sunset", "sunrise",
-    "precipitation_sum", "rain_sum", "snowfall_sum", "precipitation_hours",
-    "et0_fao_evapotranspiration", "shortwave_radiation_sum",
-    "wind_direction_10m_dominant", "wind_gusts_10m_max", "wind_speed_10m_max",
-    "cloud_cover_mean", "cloud_cover_max", "cloud_cover_min",
-    "dew_point_2m_mean", "dew_point_2m_max", "dew_point_2m_min",
-    "pressure_msl_min", "pressure_msl_max", "pressure_msl_mean",
-    "snowfall_water_equivalent_sum",
-    "relative_humidity_2m_min", "relative_humidity_2m_max", "et0_fao_evapotranspiration_sum",
-    "relative_humidity_2m_mean", "surface_pressure_mean", "surface_pressure_max", "surface_pressure_min",
-    "winddirection_10m_dominant", "wind_gusts_10m_mean", "wind_speed_10m_mean",
-    "wind_gusts_10m_min", "wind_speed_10m_min",
-    "wet_bulb_temperature_2m_mean", "wet_bulb_temperature_2m_max", "wet_bulb_temperature_2m_min",
-    "vapour_pressure_deficit_max",
-    "soil_moisture_0_to_100cm_mean", "soil_moisture_0_to_7cm_mean",
-    "soil_moisture_28_to_100cm_mean", "soil_moisture_7_to_28cm_mean",
-    "soil_temperature_0_to_100cm_mean", "soil_temperature_0_to_7cm_mean",
-    "soil_temperature_28_to_100cm_mean", "soil_temperature_7_to_28cm_mean"
-]
-
-# Setup Open-Meteo API client with cache and retry
-cache_session = requests_cache.CachedSession(str(project_root / '.cache'), expire_after=-1)
-retry_session = retry(cache_session, retries=5, backoff_factor=0.2)
-openmeteo = openmeteo_requests.Client(session=retry_session)
+
+# Output format: 'csv' (appends to {location}_{hourly|daily}.csv) or
+# 'parquet' / 'arrow' (one partition file per location + date range, written
+# straight from the API buffers, under data/raw/historical/<format>/;
+# process_to_parquet.py adds both kinds to the processed datasets)
+OUTPUT_FORMAT = "csv"
+
+# Variables to fetch come from a profile in config.VARIABLE_PROFILES
+# ('full-archive' = every Archive API variable, 'tourism-core' = only what
+# the analysis uses). Change with --profile.
+VARIABLE_PROFILE = HISTORICAL_PROFILE
+HOURLY_VARIABLES = get_variable_profile(VARIABLE_PROFILE, "archive")["hourly"]
+DAILY_VARIABLES = get_variable_profile(VARIABLE_PROFILE, "archive")["daily"]
+
+
+def apply_profile(profile_name):
+    """Switch the variables this script fetches to another profile."""
+    global VARIABLE_PROFILE, HOURLY_VARIABLES, DAILY_VARIABLES
+    variables = get_variable_profile(profile_name, "archive")
+    VARIABLE_PROFILE = profile_name
+    HOURLY_VARIABLES = variables["hourly"]
+    DAILY_VARIABLES = variables["daily"]
+
+# API client and call ledger - created by setup(), so importing this module
+# (e.g. from scripts/benchmark_fetch.py) writes nothing to disk
+metrics = None
+controller = None
+cache_session = None
+openmeteo = None
+rate_limiter = None
+
+
+def setup():
+    """Create the data directories, the cached API client and the call ledger."""
+    global metrics, controller, cache_session, openmeteo, rate_limiter
+    
+    hourly_dir.mkdir(parents=True, exist_ok=True)
+    daily_dir.mkdir(parents=True, exist_ok=True)
+    
+    # Latency, bytes, retries, cache hits, rate-limit waits and parse time for
+    # this run, written to data/metrics/fetch_historical.{json,prom} at the end
+    metrics = FetchMetrics("fetch_historical")
+    
+    # Retries (jittered backoff / Retry-After), an adaptive limit on requests in
+    # flight and a circuit breaker, shared by all worker threads
+    controller = ApiController(
+        retry_exceptions=(requests.ConnectionError, requests.Timeout),
+        metrics=metrics,
+        source="archive",
+    )
+    
+    # Setup Open-Meteo API client with retry and a size-bounded cache
+    # (historical data never changes, so entries only leave when the budget is full).
+    # Cache hits are answered before the controller, so they never wait for a slot.
+    cache_session = BoundedCacheSession(
+        ControlledSession(requests.Session(), controller),
+        HTTP_CACHE_DIR / "historical.sqlite",
+        max_bytes=HISTORICAL_CACHE_MAX_MB * 1024 * 1024,
+    )
+    openmeteo = openmeteo_requests.Client(
+        session=InstrumentedSession(cache_session, metrics, source="archive")
+    )
+    
+    # Shared call ledger (data/rate_limit_ledger.json): all worker threads AND any
+    # other fetch script running at the same time draw from the same budget
+    rate_limiter = RateLimitLedger()
 
 # ============================================================================
 # FETCH FUNCTIONS
 # ============================================================================
 
-def fetch_location(location_code, start_date, end_date):
+def response_to_frames(response, location_code):
     """
-    Fetch weather data for one location and save to CSV.
-    Just change the location_code or dates to fetch different data!
+    Turn one API response into hourly and daily DataFrames for a location.
     
     Args:
-        location_code: e.g. 'cape_town', 'johannesburg'
+        response: One WeatherApiResponse from openmeteo.weather_api()
+        location_code: Location the response belongs to
+    
+    Returns:
+        (hourly_df, daily_df) in the compact weather_schema.py dtypes
+    """
+    location = LOCATIONS[location_code]
+    
+    # ===== HOURLY DATA =====
+    hourly = response.Hourly()
+    hourly_data = {
+        "date": pd.date_range(
+            start=pd.to_datetime(hourly.Time(), unit="s", utc=True),
+            end=pd.to_datetime(hourly.TimeEnd(), unit="s", utc=True),
+            freq=pd.Timedelta(seconds=hourly.Interval()),
+            inclusive="left"
+        ),
+        "location_code": location_code,
+        "location_name": location["name"]
+    }
+    
+    # Add all hourly variables
+    for i, var in enumerate(HOURLY_VARIABLES):
+        hourly_data[var] = hourly.Variables(i).ValuesAsNumpy()
+    
+    hourly_df = conform_frame(pd.DataFrame(data=hourly_data))
+    
+    # ===== DAILY DATA =====
+    daily = response.Daily()
+    daily_data = {
+        "date": pd.date_range(
+            start=pd.to_datetime(daily.Time(), unit="s", utc=True),
+            end=pd.to_datetime(daily.TimeEnd(), unit="s", utc=True),
+            freq=pd.Timedelta(seconds=daily.Interval()),
+            inclusive="left"
+        ),
+        "location_code": location_code,
+        "location_name": location["name"]
+    }
+    
+    # Add all daily variables
+    for i, var in enumerate(DAILY_VARIABLES):
+        if var in ["sunset", "sunrise"]:
+            daily_data[var] = daily.Variables(i).ValuesInt64AsNumpy()
+        else:
+            daily_data[var] = daily.Variables(i).ValuesAsNumpy()
+    
+    daily_df = conform_frame(pd.DataFrame(data=daily_data))
+    
+    return hourly_df, daily_df
+
+
+def append_csv(csv_file, df):
+    """
+    Append rows to a CSV, matching the columns already in the file.
+
+    Keeps old files readable when a run uses a smaller variable profile:
+    variables the profile skips are written as empty values.
+    """
+    header = pd.read_csv(csv_file, nrows=0).columns
+    df.reindex(columns=header).to_csv(csv_file, mode='a', header=False, index=False)
+
+
+def save_location_frames(location_code, hourly_df, daily_df):
+    """Append hourly and daily DataFrames to the location's CSV files."""
+    # Save hourly (append if exists)
+    hourly_csv = hourly_dir / f"{location_code}_hourly.csv"
+    if hourly_csv.exists():
+        append_csv(hourly_csv, hourly_df)
+        print(f"   ✅ {location_code}: appended {len(hourly_df)} hourly records")
+    else:
+        hourly_df.to_csv(hourly_csv, index=False)
+        print(f"   ✅ Created {hourly_csv.name} with {len(hourly_df)} hourly records")
+    
+    # Save daily (append if exists)
+    daily_csv = daily_dir / f"{location_code}_daily.csv"
+    if daily_csv.exists():
+        append_csv(daily_csv, daily_df)
+        print(f"   ✅ {location_code}: appended {len(daily_df)} daily records")
+    else:
+        daily_df.to_csv(daily_csv, index=False)
+        print(f"   ✅ Created {daily_csv.name} with {len(daily_df)} daily records")
+
+
+def save_location_batches(response, location_code, start_date, end_date):
+    """
+    Write a response as Parquet/Arrow partitions without going through pandas.
+    
+    The float32 values are wrapped straight from the response buffer.
+    
+    Returns:
+        Number of hourly + daily records written
+    """
+    location = LOCATIONS[location_code]
+    
+    n_records = 0
+    for frequency, section, variables in [
+        ("hourly", response.Hourly(), HOURLY_VARIABLES),
+        ("daily", response.Daily(), DAILY_VARIABLES),
+    ]:
+        batch = section_to_record_batch(section, variables, location["name"])
+        file_path = write_partition(
+            [batch], data_dir / OUTPUT_FORMAT / frequency,
+            location_code, start_date, end_date, output_format=OUTPUT_FORMAT
+        )
+        n_records += batch.num_rows
+        print(f"   ✅ {location_code}: wrote {batch.num_rows} {frequency} records to {file_path.name}")
+    return n_records
+
+
+def fetch_location_group(location_codes, start_date, end_date):
+    """
+    Fetch several locations in ONE API request and save each to its own CSV.
+    
+    Open-Meteo accepts lists of coordinates and returns one response per
+    coordinate, in the same order, so we split them back per location.
+    
+    Args:
+        location_codes: list of location codes, e.g. ['cape_town', 'durban']
         start_date: "YYYY-MM-DD"
         end_date: "YYYY-MM-DD"
+    
+    Returns:
+        Dict of location_code -> True/False (saved successfully)
     """
-    location = LOCATIONS[location_code]
-    print(f"\n📍 Fetching {location['name']} ({start_date} to {end_date})...")
+    locations = [LOCATIONS[code] for code in location_codes]
+    names = ", ".join(location["name"] for location in locations)
+    print(f"\n📍 Fetching {names} ({start_date} to {end_date})...")
     
     try:
         # API request
-        url = "https://archive-api.open-meteo.com/v1/archive"
+        url = ARCHIVE_API_URL
         params = {
-            "latitude": location["latitude"],
-            "longitude": location["longitude"],
+            # Comma-separated coordinate lists -> one response per location
+            "latitude": ",".join(str(location["latitude"]) for location in locations),
+            "longitude": ",".join(str(location["longitude"]) for location in locations),
             "start_date": start_date,
             "end_date": end_date,
             "hourly": HOURLY_VARIABLES,
@@ -109,108 +266,210 @@ def fetch_location(location_code, start_date, end_date):
             "timezone": "auto"
         }
         
-        responses = openmeteo.weather_api(url, params=params)
-        response = responses[0]
-        
-        print(f"   Coordinates: {response.Latitude()}°N {response.Longitude()}°E")
-        print(f"   Elevation: {response.Elevation()} m")
-        
-        # ===== HOURLY DATA =====
-        hourly = response.Hourly()
-        hourly_data = {
-            "date": pd.date_range(
-                start=pd.to_datetime(hourly.Time(), unit="s", utc=True),
-                end=pd.to_datetime(hourly.TimeEnd(), unit="s", utc=True),
-                freq=pd.Timedelta(seconds=hourly.Interval()),
-                inclusive="left"
-            ),
-            "location_code": location_code,
-            "location_name": location["name"]
-        }
-        
-        # Add all hourly variables
-        for i, var in enumerate(HOURLY_VARIABLES):
-            hourly_data[var] = hourly.Variables(i).ValuesAsNumpy()
-        
-        hourly_df = pd.DataFrame(data=hourly_data)
-        
-        # Save hourly (append if exists)
-        hourly_csv = hourly_dir / f"{location_code}_hourly.csv"
-        if hourly_csv.exists():
-            hourly_df.to_csv(hourly_csv, mode='a', header=False, index=False)
-            print(f"   ✅ Appended {len(hourly_df)} hourly records")
-        else:
-            hourly_df.to_csv(hourly_csv, index=False)
-            print(f"   ✅ Created {hourly_csv.name} with {len(hourly_df)} hourly records")
-        
-        # ===== DAILY DATA =====
-        daily = response.Daily()
-        daily_data = {
-            "date": pd.date_range(
-                start=pd.to_datetime(daily.Time(), unit="s", utc=True),
-                end=pd.to_datetime(daily.TimeEnd(), unit="s", utc=True),
-                freq=pd.Timedelta(seconds=daily.Interval()),
-                inclusive="left"
-            ),
-            "location_code": location_code,
-            "location_name": location["name"]
-        }
-        
-        # Add all daily variables
-        for i, var in enumerate(DAILY_VARIABLES):
-            if var in ["sunset", "sunrise"]:
-                daily_data[var] = daily.Variables(i).ValuesInt64AsNumpy()
-            else:
-                daily_data[var] = daily.Variables(i).ValuesAsNumpy()
-        
-        daily_df = pd.DataFrame(data=daily_data)
+        # Wait for our share of the API quota (no fixed sleeps)
+        n_days = (pd.Timestamp(end_date) - pd.Timestamp(start_date)).days + 1
+        weight = estimate_call_weight(
+            len(HOURLY_VARIABLES) + len(DAILY_VARIABLES), n_days, len(location_codes)
+        )
+        # Cached responses don't touch the API, so they don't spend quota
+        # (openmeteo_requests adds format=flatbuffers to every request)
+        if not cache_session.contains(url, {**params, "format": "flatbuffers"}):
+            waited = rate_limiter.acquire(weight)
+            metrics.observe("rate_limit_wait_seconds", waited, source="archive")
+            if waited > 0:
+                print(f"   ⏳ Waited {waited:.1f}s for rate limit ({names})")
         
-        # Save daily (append if exists)
-        daily_csv = daily_dir / f"{location_code}_daily.csv"
-        if daily_csv.exists():
-            daily_df.to_csv(daily_csv, mode='a', header=False, index=False)
-            print(f"   ✅ Appended {len(daily_df)} daily records")
-        else:
-            daily_df.to_csv(daily_csv, index=False)
-            print(f"   ✅ Created {daily_csv.name} with {len(daily_df)} daily records")
-        
-        return True
+        responses = openmeteo.weather_api(url, params=params)
+        if len(responses) != len(location_codes):
+            raise ValueError(f"expected {len(location_codes)} responses, got {len(responses)}")
     
     except Exception as e:
-        print(f"   ❌ ERROR: {e}")
-        return False
+        print(f"   ❌ ERROR ({names}): {e}")
+        return {code: False for code in location_codes}
+    
+    results = {}
+    for location_code, response in zip(location_codes, responses):
+        try:
+            parse_start = time.perf_counter()
+            if OUTPUT_FORMAT == "csv":
+                hourly_df, daily_df = response_to_frames(response, location_code)
+                save_location_frames(location_code, hourly_df, daily_df)
+                n_records = len(hourly_df) + len(daily_df)
+            else:
+                n_records = save_location_batches(response, location_code, start_date, end_date)
+            metrics.observe("parse_seconds", time.perf_counter() - parse_start, source="archive")
+            metrics.inc("records_parsed_total", n_records, source="archive")
+            results[location_code] = True
+        except Exception as e:
+            print(f"   ❌ ERROR ({location_code}): {e}")
+            results[location_code] = False
+    
+    return results
+
+
+def fetch_location(location_code, start_date, end_date):
+    """
+    Fetch weather data for one location and save to CSV.
+    Just change the location_code or dates to fetch different data!
+    
+    Args:
+        location_code: e.g. 'cape_town', 'johannesburg'
+        start_date: "YYYY-MM-DD"
+        end_date: "YYYY-MM-DD"
+    """
+    return fetch_location_group([location_code], start_date, end_date)[location_code]
 
 
-def fetch_batch(start_date, end_date, batch_name):
-    """Loop through all 15 locations and fetch data."""
+def print_cache_stats():
+    """Print how the response cache did this run."""
+    stats = cache_session.stats()
+    print(f"   Cache: {stats['hits']} hits / {stats['misses']} misses "
+          f"({stats['hit_rate']:.0%}), {stats['bytes_from_cache'] / 1024**2:.1f} MB served from cache")
+    print(f"   Cache size: {stats['stored_bytes'] / 1024**2:.1f} / {stats['max_bytes'] / 1024**2:.0f} MB "
+          f"({stats['entries']} entries, {stats['evictions']} evicted)")
+
+
+def chunk_locations(location_codes, group_size):
+    """Split location codes into groups of at most group_size."""
+    location_codes = list(location_codes)
+    return [
+        location_codes[i:i + group_size]
+        for i in range(0, len(location_codes), group_size)
+    ]
+
+
+def fetch_batch(start_date, end_date, batch_name, max_workers=API_CONCURRENCY_MAX,
+                group_size=API_LOCATIONS_PER_REQUEST):
+    """
+    Fetch all 15 locations concurrently.
+    
+    Locations are packed `group_size` per API request and the groups run in
+    a thread pool; the shared rate limiter decides when each request may go
+    out, so there are no fixed sleeps between cities. How many requests are
+    in flight at once is adjusted by the controller (see api_controller.py).
+    Each location writes to its own CSV files, so workers never share a file.
+    """
+    groups = chunk_locations(LOCATIONS.keys(), group_size)
+    
     print("\n" + "="*70)
     print(f"🚀 BATCH: {batch_name}")
     print(f"   Dates: {start_date} to {end_date}")
-    print(f"   Locations: {len(LOCATIONS)}")
+    print(f"   Locations: {len(LOCATIONS)} ({len(groups)} requests of up to {group_size})")
+    print(f"   Workers: {max_workers} (requests in flight adapt, starting at {API_MAX_WORKERS})")
     print(f"   Started: {datetime.now().strftime('%H:%M:%S')}")
     print("="*70)
     
     success = 0
     failed = []
-
-    #for i, location_code in enumerate(['franschhoek', 'knysna', 'hermanus'], 1):
-    for i, location_code in enumerate(LOCATIONS.keys(), 1):
-        print(f"\n[{i}/{len(LOCATIONS)}]", end=" ")
-        
-        if fetch_location(location_code, start_date, end_date):
-            success += 1
-        else:
-            failed.append(location_code)
+    done = 0
+    
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        futures = [
+            executor.submit(fetch_location_group, group, start_date, end_date)
+            for group in groups
+        ]
         
-        # Wait 2 seconds between locations
-        if i < len(LOCATIONS):
-            time.sleep(2)
+        for future in as_completed(futures):
+            for location_code, ok in future.result().items():
+                done += 1
+                if ok:
+                    success += 1
+                    print(f"\n[{done}/{len(LOCATIONS)}] ✅ {location_code} done")
+                else:
+                    failed.append(location_code)
+                    print(f"\n[{done}/{len(LOCATIONS)}] ❌ {location_code} failed")
     
     # Summary
     print("\n" + "="*70)
     print(f"✅ DONE: {success}/{len(LOCATIONS)} successful")
     if failed:
         print(f"   ⚠️  Failed: {', '.join(failed)}")
+    print(f"   API calls used: {rate_limiter.total_calls:,.0f} "
+          f"(rate limit waits: {rate_limiter.total_wait:.0f}s)")
+    print_cache_stats()
+    print("="*70 + "\n")
+    
+    return success, failed
+
+
+def run_backfill(start_date, end_date=None, source="csv", fresh=False,
+                 max_workers=API_CONCURRENCY_MAX, group_size=API_LOCATIONS_PER_REQUEST,
+                 chunk_days=DEFAULT_CHUNK_DAYS):
+    """
+    Non-interactive backfill: fetch ONLY the days each location is missing.
+    
+    Existing coverage is read from the raw CSVs (or processed Parquet), the
+    gaps are split into request-sized chunks and every finished chunk is
+    recorded in a checkpoint file. Re-running after a crash continues with
+    the chunks that were not finished; once everything is done the
+    checkpoint is removed, so the next run plans fresh gaps (nightly top-up).
+    
+    Args:
+        start_date: First day wanted, "YYYY-MM-DD"
+        end_date: Last day wanted (default: latest day the archive has)
+        source: 'csv', 'parquet' or 'partitions' - where to look for existing data
+        fresh: Ignore any saved checkpoint and plan again
+    """
+    checkpoint = BackfillCheckpoint()
+    
+    if not fresh and checkpoint.matches(start_date, end_date) and checkpoint.pending():
+        tasks = checkpoint.pending()
+        print(f"\n♻️  Resuming backfill from checkpoint: {len(tasks)} chunks left")
+    else:
+        print(f"\n🔎 Planning backfill from {source} coverage...")
+        tasks = plan_backfill(start_date, end_date, source=source,
+                              chunk_days=chunk_days, group_size=group_size)
+        checkpoint.start(start_date, end_date, tasks)
+    
+    if not tasks:
+        print("   ✅ Nothing missing - all locations are up to date.")
+        checkpoint.clear()
+        return 0, []
+    
+    location_days = sum(
+        ((pd.Timestamp(task["end_date"]) - pd.Timestamp(task["start_date"])).days + 1)
+        * len(task["locations"])
+        for task in tasks
+    )
+    print("\n" + "="*70)
+    print(f"🚀 BACKFILL: {start_date} to {end_date or 'latest'}")
+    print(f"   Requests: {len(tasks)}")
+    print(f"   Location-days missing: {location_days:,}")
+    print(f"   Workers: {max_workers} (requests in flight adapt, starting at {API_MAX_WORKERS})")
+    print("="*70)
+    
+    def run_task(task):
+        results = fetch_location_group(task["locations"], task["start_date"], task["end_date"])
+        if all(results.values()):
+            checkpoint.mark_done(task["id"])
+        return task, results
+    
+    success = 0
+    failed = []
+    
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        futures = [executor.submit(run_task, task) for task in tasks]
+        
+        for i, future in enumerate(as_completed(futures), 1):
+            task, results = future.result()
+            if all(results.values()):
+                success += 1
+                print(f"\n[{i}/{len(tasks)}] ✅ {task['start_date']} to {task['end_date']}")
+            else:
+                failed.append(task["id"])
+                print(f"\n[{i}/{len(tasks)}] ❌ {task['start_date']} to {task['end_date']} "
+                      f"({', '.join(code for code, ok in results.items() if not ok)})")
+    
+    if not failed:
+        checkpoint.clear()
+    
+    print("\n" + "="*70)
+    print(f"✅ DONE: {success}/{len(tasks)} requests successful")
+    if failed:
+        print(f"   ⚠️  {len(failed)} failed - re-run the same command to retry them")
+    print(f"   API calls used: {rate_limiter.total_calls:,.0f} "
+          f"(rate limit waits: {rate_limiter.total_wait:.0f}s)")
+    print_cache_stats()
     print("="*70 + "\n")
     
     return success, failed
@@ -223,6 +482,61 @@ def fetch_batch(start_date, end_date, batch_name):
 def main():
     """Main entry point for batch fetching."""
     
+    parser = argparse.ArgumentParser(description="Fetch historical weather data")
+    parser.add_argument('--backfill', metavar='START_DATE',
+                        help='Non-interactive: fetch only missing days from START_DATE')
+    parser.add_argument('--end', metavar='END_DATE', default=None,
+                        help='Last day to backfill (default: latest archive day)')
+    parser.add_argument('--source', choices=['csv', 'parquet', 'partitions'], default=None,
+                        help="Where to read existing coverage from (default: where --format writes: "
+                             "csv, or partitions for parquet/arrow)")
+    parser.add_argument('--format', choices=['csv', 'parquet', 'arrow'], default='csv',
+                        help='Output format for fetched data (default: csv)')
+    parser.add_argument('--fresh', action='store_true',
+                        help='Ignore the saved checkpoint and plan again')
+    parser.add_argument('--profile', choices=profile_names("archive"), default=HISTORICAL_PROFILE,
+                        help=f'Variable profile to fetch (default: {HISTORICAL_PROFILE})')
+    args = parser.parse_args()
+    
+    setup()
+    try:
+        run(args)
+    finally:
+        export_metrics()
+
+
+def export_metrics():
+    """Print and write this run's metrics (data/metrics/fetch_historical.json/.prom)."""
+    stats = controller.stats()
+    print(f"   Controller: concurrency {stats['concurrency_limit']:.1f} "
+          f"(+{stats['increases']}/-{stats['decreases']}), {stats['retries']} retries, "
+          f"{stats['throttled']} throttled, circuit {stats['circuit_state']}")
+    metrics.print_summary()
+    paths = metrics.export()
+    print(f"   📊 Metrics written to {paths['json']} and {paths['prom'].name}")
+
+
+def run(args):
+    """Run a backfill or the interactive batch menu (see main)."""
+    
+    global OUTPUT_FORMAT
+    OUTPUT_FORMAT = args.format
+    apply_profile(args.profile)
+    print(f"📋 Variable profile: {VARIABLE_PROFILE} "
+          f"({len(HOURLY_VARIABLES)} hourly, {len(DAILY_VARIABLES)} daily)")
+    
+    if args.backfill:
+        # Coverage comes from where this run writes, or nothing would ever look covered
+        source = args.source or ("csv" if OUTPUT_FORMAT == "csv" else "partitions")
+        try:
+            _, failed = run_backfill(args.backfill, args.end, source=source, fresh=args.fresh)
+        except KeyboardInterrupt:
+            print("\n\n⚠️  Interrupted. Re-run the same command to resume from the checkpoint.")
+            return
+        if failed:
+            sys.exit(1)
+        return
+    
     print("\n" + "🌍 SA TOURISM WEATHER PROJECT - HISTORICAL DATA COLLECTION")
     print("="*70)
     print("This script will fetch weather data for 15 SA locations")
@@ -257,8 +571,8 @@ def main():
             fetch_batch("2024-01-01", "2024-11-14", "2024")
         
         elif choice == "4":
-            print("\n🚀 Running ALL batches sequentially...")
-            print("This will take approximately 30-45 minutes.\n")
+            print("\n🚀 Running ALL batches...")
+            print("Pacing is set by the API rate limits, not fixed breaks.\n")
             
             confirm = input("Continue? (yes/no): ").strip().lower()
             if confirm != "yes":
@@ -267,13 +581,9 @@ def main():
             
             # Batch 1
             fetch_batch("2020-01-01", "2021-12-31", "2020-2021")
-            print("\n⏸️  5-minute break before next batch...")
-            time.sleep(300)
             
             # Batch 2
             fetch_batch("2022-01-01", "2023-12-31", "2022-2023")
-            print("\n⏸️  5-minute break before next batch...")
-            time.sleep(300)
             
             # Batch 3
             fetch_batch("2024-01-01", "2024-11-14", "2024")
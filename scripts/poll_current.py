@@ -0,0 +1,224 @@
+"""
+Current Conditions Poller
+
+Keeps a small "right now" file up to date for ALL SA locations, for the
+dashboards. Only the current-conditions variables are requested (no
+16-day forecast), several locations per request, all requests of a tick
+in flight at the same time.
+
+Every tick (CURRENT_POLL_INTERVAL_SECONDS) each request starts after a
+random delay of up to CURRENT_POLL_JITTER_SECONDS, so we never hit the
+API in a burst exactly on the minute. The output file is written to a
+temp file and renamed, so readers never see a half-written file.
+
+Output: data/raw/current/current_conditions.json
+
+Usage:
+    python scripts/poll_current.py            # Poll forever
+    python scripts/poll_current.py --once     # One refresh, then exit
+"""
+
+import sys
+import os
+import json
+import time
+import random
+import asyncio
+import argparse
+from pathlib import Path
+from datetime import datetime, timezone
+
+import httpx
+
+# ============================================================================
+# SETUP
+# ============================================================================
+
+# Project paths
+project_root = Path(__file__).parent.parent
+sys.path.insert(0, str(project_root / "src"))
+
+from config import (
+    LOCATIONS, API_BASE_URL, API_TIMEOUT, API_LOCATIONS_PER_REQUEST,
+    CURRENT_VARIABLES, CURRENT_POLL_INTERVAL_SECONDS, CURRENT_POLL_JITTER_SECONDS,
+    RAW_CURRENT_DIR,
+)
+from rate_limiter import RateLimitLedger, estimate_call_weight
+
+OUTPUT_FILE = RAW_CURRENT_DIR / "current_conditions.json"
+
+# Shared call ledger (data/rate_limit_ledger.json), also used by the other fetchers
+rate_limiter = RateLimitLedger()
+
+# ============================================================================
+# POLLING
+# ============================================================================
+
+def chunk_locations(location_codes, group_size):
+    """Split location codes into groups of at most group_size."""
+    return [location_codes[i:i + group_size] for i in range(0, len(location_codes), group_size)]
+
+
+async def fetch_current_group(client, location_codes, jitter):
+    """
+    Fetch current conditions for several locations in ONE request.
+    
+    Args:
+        client: httpx.AsyncClient (shared, keeps connections alive)
+        location_codes: e.g. ['cape_town', 'durban']
+        jitter: Maximum random delay (seconds) before sending
+    
+    Returns:
+        Dict of location_code -> conditions (missing if the request failed)
+    """
+    await asyncio.sleep(random.uniform(0, jitter))
+    
+    locations = [LOCATIONS[code] for code in location_codes]
+    params = {
+        "latitude": ",".join(str(location["latitude"]) for location in locations),
+        "longitude": ",".join(str(location["longitude"]) for location in locations),
+        "current": ",".join(CURRENT_VARIABLES),
+        "timezone": "auto",
+    }
+    
+    # The ledger blocks while waiting for budget, so keep it off the event loop
+    weight = estimate_call_weight(len(CURRENT_VARIABLES), 1, len(location_codes))
+    await asyncio.to_thread(rate_limiter.acquire, weight)
+    
+    try:
+        response = await client.get(API_BASE_URL, params=params)
+        response.raise_for_status()
+        data = response.json()
+    except (httpx.HTTPError, ValueError) as e:
+        print(f"   ❌ ERROR ({', '.join(location_codes)}): {e}")
+        return {}
+    
+    # One location -> a single object, several -> a list in the same order
+    if isinstance(data, dict):
+        data = [data]
+    if len(data) < len(location_codes):
+        missing = location_codes[len(data):]
+        print(f"   ❌ ERROR ({', '.join(missing)}): expected {len(location_codes)} results, got {len(data)}")
+    
+    results = {}
+    for location_code, item in zip(location_codes, data):
+        # An error body or a malformed item only costs this location this tick
+        try:
+            results[location_code] = {
+                "name": LOCATIONS[location_code]["name"],
+                "observed_at": item["current"]["time"],
+                "utc_offset_seconds": item.get("utc_offset_seconds"),
+                "values": {var: item["current"].get(var) for var in CURRENT_VARIABLES},
+                "units": {var: item.get("current_units", {}).get(var) for var in CURRENT_VARIABLES},
+            }
+        except (KeyError, TypeError, AttributeError) as e:
+            print(f"   ❌ ERROR ({location_code}): unexpected response ({type(e).__name__}: {e})")
+    return results
+
+
+def write_conditions(conditions, output_file=OUTPUT_FILE):
+    """Replace the output file atomically (temp file + rename)."""
+    output_file.parent.mkdir(parents=True, exist_ok=True)
+    tmp_path = output_file.parent / f".{output_file.name}.tmp"
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        json.dump({
+            "updated_at": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+            "locations": conditions,
+        }, f, indent=1)
+    os.replace(tmp_path, output_file)
+
+
+def load_conditions(output_file=OUTPUT_FILE):
+    """Conditions from the last run (kept for locations that fail this tick)."""
+    if not output_file.exists():
+        return {}
+    with open(output_file, "r", encoding="utf-8") as f:
+        return json.load(f).get("locations", {})
+
+
+async def refresh_all(client, conditions, group_size, jitter):
+    """One tick: fetch every location concurrently and rewrite the file."""
+    location_codes = list(LOCATIONS.keys())
+    groups = chunk_locations(location_codes, group_size)
+    
+    start = time.monotonic()
+    # A group that raises must not end the poller: it keeps its last conditions
+    results = await asyncio.gather(
+        *(fetch_current_group(client, group, jitter) for group in groups),
+        return_exceptions=True
+    )
+    
+    updated = 0
+    for group, result in zip(groups, results):
+        if isinstance(result, BaseException):
+            print(f"   ❌ ERROR ({', '.join(group)}): {type(result).__name__}: {result}")
+            continue
+        for location_code, values in result.items():
+            values["fetched_at"] = datetime.now(timezone.utc).isoformat(timespec="seconds")
+            conditions[location_code] = values
+            updated += 1
+    
+    write_conditions(conditions)
+    print(f"   ✅ {datetime.now().strftime('%H:%M:%S')} updated {updated}/{len(location_codes)} "
+          f"locations in {time.monotonic() - start:.1f}s")
+    return updated
+
+
+async def poll(interval=CURRENT_POLL_INTERVAL_SECONDS, jitter=CURRENT_POLL_JITTER_SECONDS,
+               group_size=API_LOCATIONS_PER_REQUEST, once=False):
+    """
+    Refresh current conditions every `interval` seconds.
+    
+    Ticks are scheduled on a fixed grid (start + n * interval), so a slow
+    tick does not push every later tick back.
+    """
+    conditions = load_conditions()
+    jitter = min(jitter, interval / 2)
+    
+    print("\n" + "="*70)
+    print("🌤️  SA TOURISM WEATHER PROJECT - CURRENT CONDITIONS POLLER")
+    print("="*70)
+    print(f"Locations: {len(LOCATIONS)} | Every {interval}s (jitter up to {jitter:.0f}s)")
+    print(f"Output: {OUTPUT_FILE}")
+    
+    limits = httpx.Limits(max_connections=len(LOCATIONS), max_keepalive_connections=len(LOCATIONS))
+    async with httpx.AsyncClient(timeout=API_TIMEOUT, limits=limits) as client:
+        next_tick = time.monotonic()
+        while True:
+            await refresh_all(client, conditions, group_size, jitter)
+            if once:
+                return
+            
+            next_tick += interval
+            # Skip ticks we are already late for instead of bunching them up
+            while next_tick <= time.monotonic():
+                next_tick += interval
+            await asyncio.sleep(next_tick - time.monotonic())
+
+
+# ============================================================================
+# MAIN
+# ============================================================================
+
+def main():
+    """Main entry point for the current conditions poller."""
+    
+    parser = argparse.ArgumentParser(description="Poll current conditions for all locations")
+    parser.add_argument('--once', action='store_true',
+                        help='Refresh once and exit')
+    parser.add_argument('--interval', type=int, default=CURRENT_POLL_INTERVAL_SECONDS,
+                        help=f'Seconds between refreshes (default: {CURRENT_POLL_INTERVAL_SECONDS})')
+    parser.add_argument('--jitter', type=float, default=CURRENT_POLL_JITTER_SECONDS,
+                        help=f'Max random delay per request (default: {CURRENT_POLL_JITTER_SECONDS})')
+    parser.add_argument('--group-size', type=int, default=API_LOCATIONS_PER_REQUEST,
+                        help=f'Locations per request (default: {API_LOCATIONS_PER_REQUEST})')
+    args = parser.parse_args()
+    
+    try:
+        asyncio.run(poll(args.interval, args.jitter, args.group_size, once=args.once))
+    except KeyboardInterrupt:
+        print("\n\n⚠️  Stopped by user.")
+
+
+if __name__ == "__main__":
+    main()
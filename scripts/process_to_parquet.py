@@ -2,16 +2,33 @@
 Data Processing Script - CSV to Parquet Conversion
 
 Converts raw CSV weather data to Parquet format for faster analysis.
-Intelligently detects new data and appends to existing Parquet files.
+Intelligently detects new data and appends it to the processed datasets.
+
+Each dataset is partitioned by location and year
+(all_locations_hourly/location_code=<code>/year=<yyyy>/part-*.parquet, see
+src/partitioned_store.py): new rows are written as new files and only the
+partitions they overlap are rewritten. CSVs are added one at a time and
+overlapping partitions are merged as sorted streams (src/stream_merge.py),
+so memory stays within PROCESSING_MEMORY_MB plus a few CSVs, however large
+the history grows.
+
+An ingestion manifest (_ingest_manifest.json in the dataset directory)
+keeps a byte-offset watermark per CSV, so incremental runs only parse the
+rows appended since the last run; unchanged CSVs are not even opened.
+
+Data fetched with fetch_historical_batches.py --format parquet|arrow
+(data/raw/historical/<format>/<frequency>/location_code=<code>/*) is added
+the same way, straight from the Arrow tables (no CSV parsing); a partition
+file is read again only when a re-fetch replaced it.
 
 Usage:
     python scripts/process_to_parquet.py           # Process new data only
     python scripts/process_to_parquet.py --rebuild # Rebuild everything from scratch
+    python scripts/process_to_parquet.py --rebuild --compression zstd --compression-level 9
 """
 
 import sys
 from pathlib import Path
-import pandas as pd
 from datetime import datetime
 import argparse
 
@@ -20,6 +37,15 @@ import argparse
 # ============================================================================
 
 project_root = Path(__file__).parent.parent
+sys.path.insert(0, str(project_root / "src"))
+
+from config import PROCESSED_HOURLY_DATASET, PROCESSED_DAILY_DATASET, PROCESSED_PARTITION_BY
+from ingest_manifest import IngestManifest, NEW, UNCHANGED, APPENDED, REWRITTEN
+from partitioned_store import PartitionedStore
+from csv_ingest import read_csv_files, read_csv_frame
+from parquet_layout import ParquetLayout, COMPRESSIONS
+from arrow_writer import OUTPUT_FORMATS, partition_files, read_partition
+from weather_schema import conform_frame, conform_table, to_pandas
 
 # Data directories
 raw_dir = project_root / "data" / "raw" / "historical"
@@ -37,9 +63,16 @@ daily_parquet_dir = processed_dir / "daily"
 hourly_parquet_dir.mkdir(parents=True, exist_ok=True)
 daily_parquet_dir.mkdir(parents=True, exist_ok=True)
 
-# Output files
-hourly_parquet_file = hourly_parquet_dir / "all_locations_hourly.parquet"
-daily_parquet_file = daily_parquet_dir / "all_locations_daily.parquet"
+# Output datasets (one directory per location/year partition)
+hourly_dataset_dir = PROCESSED_HOURLY_DATASET
+daily_dataset_dir = PROCESSED_DAILY_DATASET
+
+# Single-file outputs of earlier versions, converted on the next run
+hourly_legacy_file = hourly_parquet_dir / "all_locations_hourly.parquet"
+daily_legacy_file = daily_parquet_dir / "all_locations_daily.parquet"
+
+# Byte-offset watermarks of the CSVs already in each dataset
+MANIFEST_NAME = "_ingest_manifest.json"
 
 
 # ============================================================================
@@ -53,113 +86,223 @@ def get_csv_files(directory):
     return sorted(directory.glob("*.csv"))
 
 
-def get_existing_locations(parquet_file):
-    """Get list of locations already in the Parquet file."""
-    if not parquet_file.exists():
-        return set()
-    
-    try:
-        df = pd.read_parquet(parquet_file, columns=['location_code'])
-        return set(df['location_code'].unique())
-    except Exception as e:
-        print(f"   ⚠️  Warning: Could not read existing Parquet: {e}")
-        return set()
+def get_partition_files(frequency):
+    """Raw Parquet/Arrow partition files of one frequency (every output format)."""
+    return [
+        path
+        for output_format in OUTPUT_FORMATS
+        for path in partition_files(raw_dir / output_format / frequency)
+    ]
+
+
+def partition_key(path):
+    """Manifest key of a raw partition file, e.g. parquet/hourly/location_code=durban/<range>.parquet."""
+    return path.relative_to(raw_dir).as_posix()
+
+
+def partition_location(path):
+    """Location code of a raw partition file (from its location_code=<code> directory)."""
+    return path.parent.name.split("=", 1)[1]
 
 
-def process_csv_files(csv_files, frequency="hourly"):
+def new_totals():
+    return {"rows": 0, "start": None, "end": None, "locations": set(), "columns": set(),
+            "files_written": 0, "partitions_rewritten": 0}
+
+
+def add_to_totals(totals, df, result):
+    """Count one appended frame (and the store's append() result) in the run totals."""
+    totals["rows"] += len(df)
+    totals["start"] = df['date'].min() if totals["start"] is None else min(totals["start"], df['date'].min())
+    totals["end"] = df['date'].max() if totals["end"] is None else max(totals["end"], df['date'].max())
+    totals["locations"].update(df['location_code'].unique())
+    totals["columns"].update(df.columns)
+    totals["files_written"] += result["files_written"]
+    totals["partitions_rewritten"] += result["partitions_rewritten"]
+
+
+def combine_totals(first, second):
+    """Totals of two process_* calls (False if either failed, None if both had no rows)."""
+    if first is False or second is False:
+        return False
+    if first is None or second is None:
+        return first or second
+    combined = new_totals()
+    for key in ("rows", "files_written", "partitions_rewritten"):
+        combined[key] = first[key] + second[key]
+    combined["start"] = min(first["start"], second["start"])
+    combined["end"] = max(first["end"], second["end"])
+    combined["locations"] = first["locations"] | second["locations"]
+    combined["columns"] = first["columns"] | second["columns"]
+    return combined
+
+
+def process_csv_files(csv_files, store, frequency="hourly", manifest=None, statuses=None):
     """
-    Read and combine multiple CSV files into a single DataFrame.
+    Read CSV files and add them to the dataset, one file at a time.
+    
+    Files are read in parallel with the column types from weather_schema.py
+    (dates are parsed while reading, not afterwards). Each file's rows go
+    straight into the store, so memory holds a few files, never the whole
+    dataset; overlapping partitions are merged on disk (stream_merge.py).
     
     Args:
         csv_files: List of Path objects pointing to CSV files
+        store: PartitionedStore to add the rows to
         frequency: "hourly" or "daily"
+        manifest: IngestManifest; if given, only rows after each file's
+            watermark are read (new watermarks are staged, call commit()
+            once the data is saved)
+        statuses: Dict of csv_file -> manifest status, if already checked
     
     Returns:
-        Combined DataFrame
+        Dict with rows, start, end, locations, columns, files_written and
+        partitions_rewritten (None if there were no rows, False if saving failed)
     """
     if not csv_files:
         return None
     
     print(f"\n   Processing {len(csv_files)} {frequency} CSV files...")
     
-    dfs = []
-    for csv_file in csv_files:
-        try:
-            df = pd.read_csv(csv_file)
-            
-            # Parse date column
-            df['date'] = pd.to_datetime(df['date'])
-            
-            # Add metadata
-            location_code = csv_file.stem.replace(f"_{frequency}", "")
-            
-            # Ensure location_code and location_name columns exist
-            if 'location_code' not in df.columns:
-                df['location_code'] = location_code
-            if 'location_name' not in df.columns:
-                # Try to infer from filename or use location_code
-                df['location_name'] = location_code.replace('_', ' ').title()
-            
-            dfs.append(df)
-            print(f"      ✅ {csv_file.name}: {len(df):,} records")
-            
-        except Exception as e:
-            print(f"      ❌ Error reading {csv_file.name}: {e}")
-            continue
-    
-    if not dfs:
-        return None
-    
-    # Combine all DataFrames
-    combined_df = pd.concat(dfs, ignore_index=True)
+    # Typed, multithreaded reads (several files at once, see csv_ingest.py)
+    if manifest is not None:
+        statuses = statuses or {}
+        reader = lambda csv_file: manifest.read_new_rows(
+            csv_file, statuses.get(csv_file), reader=read_csv_frame
+        )
+    else:
+        reader = read_csv_frame
     
-    # Sort by date and location
-    combined_df = combined_df.sort_values(['date', 'location_code']).reset_index(drop=True)
+    totals = new_totals()
+    duplicates_removed = 0
     
-    # Remove duplicates (if any)
-    original_rows = len(combined_df)
-    combined_df = combined_df.drop_duplicates(subset=['date', 'location_code'], keep='last')
-    duplicates_removed = original_rows - len(combined_df)
+    for csv_file, df, error in read_csv_files(csv_files, reader):
+        if error is not None:
+            print(f"      ❌ Error reading {csv_file.name}: {error}")
+            continue
+        if df is None:
+            continue
+        
+        # Add metadata
+        location_code = csv_file.stem.replace(f"_{frequency}", "")
+        
+        # Ensure location_code and location_name columns exist
+        if 'location_code' not in df.columns:
+            df['location_code'] = location_code
+        if 'location_name' not in df.columns:
+            # Try to infer from filename or use location_code
+            df['location_name'] = location_code.replace('_', ' ').title()
+        df = conform_frame(df)
+        
+        # Remove duplicates within the file (the store handles the rest)
+        original_rows = len(df)
+        df = df.drop_duplicates(subset=['location_code', 'date'], keep='last')
+        duplicates_removed += original_rows - len(df)
+        
+        try:
+            result = store.append(df)
+        except Exception as e:
+            print(f"      ❌ Error saving {csv_file.name} to Parquet: {e}")
+            return False
+        
+        print(f"      ✅ {csv_file.name}: {len(df):,} records")
+        add_to_totals(totals, df, result)
     
     if duplicates_removed > 0:
         print(f"   🧹 Removed {duplicates_removed:,} duplicate records")
     
-    return combined_df
+    if totals["rows"] == 0:
+        return None
+    return totals
 
 
-def save_to_parquet(df, output_file, frequency="hourly"):
-    """Save DataFrame to Parquet format."""
-    if df is None or len(df) == 0:
-        print(f"   ⚠️  No data to save for {frequency}")
-        return False
+def process_partition_files(files, store, frequency="hourly", manifest=None):
+    """
+    Add raw Parquet/Arrow partitions (fetch_historical_batches.py --format
+    parquet|arrow) to the dataset, one file at a time.
     
-    try:
-        df.to_parquet(output_file, index=False, compression='snappy')
-        
-        # Get file size
-        size_mb = output_file.stat().st_size / (1024 * 1024)
+    The files are already typed Arrow tables: they are cast to the
+    weather_schema.py types and appended without any CSV parsing. A file
+    covers one fetched date range, so it is always read in full; rows it
+    shares with earlier data replace them (last write wins in the store).
+    
+    Args:
+        files: Partition files (see get_partition_files)
+        store: PartitionedStore to add the rows to
+        frequency: "hourly" or "daily"
+        manifest: IngestManifest; each file read is staged in it (call
+            commit() once the data is saved)
+    
+    Returns:
+        Same as process_csv_files
+    """
+    if not files:
+        return None
+    
+    print(f"\n   Processing {len(files)} {frequency} Parquet/Arrow partition files...")
+    
+    totals = new_totals()
+    for path in files:
+        name = f"{partition_location(path)}/{path.name}"
+        try:
+            df = to_pandas(conform_table(read_partition(path)))
+        except Exception as e:
+            print(f"      ❌ Error reading {name}: {e}")
+            continue
         
-        print(f"   ✅ Saved {len(df):,} records to {output_file.name}")
-        print(f"      File size: {size_mb:.2f} MB")
+        if len(df):
+            df = df.drop_duplicates(subset=['location_code', 'date'], keep='last')
+            try:
+                result = store.append(df)
+            except Exception as e:
+                print(f"      ❌ Error saving {name} to Parquet: {e}")
+                return False
+            print(f"      ✅ {name}: {len(df):,} records")
+            add_to_totals(totals, df, result)
         
-        return True
+        if manifest is not None:
+            max_date = str(df['date'].max()) if len(df) else None
+            manifest.stage_partition(path, partition_key(path), len(df), max_date)
     
-    except Exception as e:
-        print(f"   ❌ Error saving Parquet: {e}")
-        return False
+    if totals["rows"] == 0:
+        return None
+    return totals
+
+
+def print_ingest_summary(totals, store):
+    """Print what one run added to the dataset."""
+    print(f"\n   📈 Combined Statistics:")
+    print(f"      Total records: {totals['rows']:,}")
+    print(f"      Date range: {totals['start']} to {totals['end']}")
+    print(f"      Locations: {len(totals['locations'])}")
+    print(f"      Columns: {len(totals['columns'])}")
+    print(f"   ✅ Saved {totals['rows']:,} records to {store.root.name}/")
+    print(f"      {totals['files_written']} files written, "
+          f"{totals['partitions_rewritten']} partitions rewritten")
+
+
+def print_dataset_summary(store):
+    """Print rows, files, size and date range of a dataset (from file footers)."""
+    summary = store.summary()
+    print(f"\n   📈 Dataset Statistics:")
+    print(f"      Total records: {summary['rows']:,} in {summary['files']} files "
+          f"({summary['bytes'] / (1024 * 1024):.2f} MB)")
+    print(f"      Date range: {summary['start']} to {summary['end']}")
+    print(f"      Locations: {summary['locations']}")
 
 
 # ============================================================================
 # MAIN PROCESSING FUNCTIONS
 # ============================================================================
 
-def process_frequency(frequency, force_rebuild=False):
+def process_frequency(frequency, force_rebuild=False, layout=None):
     """
     Process data for a specific frequency (hourly or daily).
     
     Args:
         frequency: "hourly" or "daily"
         force_rebuild: If True, rebuild from scratch. If False, append new data.
+        layout: ParquetLayout for the files written (default from config.py)
     """
     print("\n" + "="*80)
     print(f"📊 Processing {frequency.upper()} Data")
@@ -168,106 +311,130 @@ def process_frequency(frequency, force_rebuild=False):
     # Set up paths
     if frequency == "hourly":
         csv_dir = hourly_csv_dir
-        parquet_file = hourly_parquet_file
+        dataset_dir = hourly_dataset_dir
+        legacy_file = hourly_legacy_file
     else:
         csv_dir = daily_csv_dir
-        parquet_file = daily_parquet_file
+        dataset_dir = daily_dataset_dir
+        legacy_file = daily_legacy_file
     
-    # Get all CSV files
+    # Get all CSV files and Parquet/Arrow partitions
     csv_files = get_csv_files(csv_dir)
+    raw_partitions = get_partition_files(frequency)
     
-    if not csv_files:
-        print(f"   ⚠️  No CSV files found in {csv_dir}")
+    if not csv_files and not raw_partitions:
+        print(f"   ⚠️  No CSV files found in {csv_dir} "
+              f"(nor Parquet/Arrow partitions in {raw_dir}/<format>/{frequency})")
         return False
     
-    print(f"   Found {len(csv_files)} CSV files in {csv_dir}")
+    if csv_files:
+        print(f"   Found {len(csv_files)} CSV files in {csv_dir}")
+    if raw_partitions:
+        print(f"   Found {len(raw_partitions)} Parquet/Arrow partition files")
+    
+    store = PartitionedStore(dataset_dir, partition_by=PROCESSED_PARTITION_BY, layout=layout)
+    manifest = IngestManifest(dataset_dir / MANIFEST_NAME)
+    
+    # The old single file is rebuilt from the CSVs as a partitioned dataset
+    if legacy_file.exists():
+        print(f"   📦 Converting {legacy_file.name} to a partitioned dataset...")
+        force_rebuild = True
     
     # Check if we should do incremental or full rebuild
-    if force_rebuild or not parquet_file.exists():
+    if force_rebuild or store.is_empty():
         print(f"   🔄 Building from scratch...")
         
-        # Process all CSV files
-        combined_df = process_csv_files(csv_files, frequency)
+        # Forget the watermarks on disk BEFORE clearing the store: if the
+        # build is interrupted, the next run then re-reads every CSV
+        # instead of trusting watermarks for rows that are gone
+        manifest.reset()
+        manifest.save()
+        store.clear()
         
-        if combined_df is not None:
-            print(f"\n   📈 Combined Statistics:")
-            print(f"      Total records: {len(combined_df):,}")
-            print(f"      Date range: {combined_df['date'].min()} to {combined_df['date'].max()}")
-            print(f"      Locations: {combined_df['location_code'].nunique()}")
-            print(f"      Columns: {len(combined_df.columns)}")
-            
-            # Save to Parquet
-            return save_to_parquet(combined_df, parquet_file, frequency)
+        # Process all CSV files (and record where each one ends), then the partitions
+        totals = process_csv_files(csv_files, store, frequency, manifest)
+        if totals is not False:
+            totals = combine_totals(totals, process_partition_files(raw_partitions, store, frequency, manifest))
+        
+        if totals:
+            print_ingest_summary(totals, store)
+            manifest.commit()
+            if legacy_file.exists():
+                legacy_file.unlink()
+            print_dataset_summary(store)
+            return True
     
     else:
-        print(f"   📂 Existing Parquet found, checking for new data...")
-        
-        # Load existing Parquet
-        existing_df = pd.read_parquet(parquet_file)
-        print(f"   📊 Existing data: {len(existing_df):,} records")
-        print(f"      Date range: {existing_df['date'].min()} to {existing_df['date'].max()}")
-        
-        # Get locations already in Parquet
-        existing_locations = set(existing_df['location_code'].unique())
-        print(f"      Locations: {len(existing_locations)}")
+        print(f"   📂 Existing dataset found, checking for new data...")
         
-        # Find new CSV files (locations not in Parquet OR updated dates)
+        # Compare each CSV with its watermark (size/mtime first, no parsing)
+        statuses = {csv_file: manifest.status(csv_file) for csv_file in csv_files}
         new_csv_files = []
         for csv_file in csv_files:
             location_code = csv_file.stem.replace(f"_{frequency}", "")
+            status = statuses[csv_file]
             
-            # Check if this location is new
-            if location_code not in existing_locations:
-                new_csv_files.append(csv_file)
-                print(f"   🆕 New location: {location_code}")
+            if status == UNCHANGED:
+                continue
+            new_csv_files.append(csv_file)
+            
+            if status == NEW:
+                print(f"   🆕 New file: {location_code}")
+            elif status == APPENDED:
+                entry = manifest.files[csv_file.name]
+                new_kb = (csv_file.stat().st_size - entry["offset"]) / 1024
+                print(f"   🔄 Updated data: {location_code} ({new_kb:,.1f} KB appended "
+                      f"after {entry['max_date']})")
             else:
-                # Check if CSV has newer data than Parquet
-                try:
-                    csv_df = pd.read_csv(csv_file)
-                    csv_df['date'] = pd.to_datetime(csv_df['date'])
-                    csv_max_date = csv_df['date'].max()
-                    
-                    existing_max_date = existing_df[existing_df['location_code'] == location_code]['date'].max()
-                    
-                    if csv_max_date > existing_max_date:
-                        new_csv_files.append(csv_file)
-                        print(f"   🔄 Updated data: {location_code} (new data until {csv_max_date.date()})")
-                except:
-                    # If error, include it to be safe
-                    new_csv_files.append(csv_file)
+                print(f"   ♻️  Rewritten: {location_code} (reading it in full)")
+        
+        # Partition files: new ones, and ones a re-fetch replaced
+        new_partitions = []
+        for path in raw_partitions:
+            status = manifest.partition_status(path, partition_key(path))
+            if status == UNCHANGED:
+                continue
+            new_partitions.append(path)
+            label = "New partition" if status == NEW else "Re-fetched partition"
+            print(f"   🆕 {label}: {partition_key(path)}")
         
-        if not new_csv_files:
-            print(f"\n   ✅ No new data to process! Parquet is up to date.")
+        if not new_csv_files and not new_partitions:
+            print(f"\n   ✅ No new data to process! Dataset is up to date.")
             return True
         
-        print(f"\n   🔄 Processing {len(new_csv_files)} new/updated files...")
+        print(f"\n   🔄 Processing {len(new_csv_files) + len(new_partitions)} new/updated files...")
         
-        # Process new CSV files
-        new_df = process_csv_files(new_csv_files, frequency)
+        # A rewritten CSV replaces everything we had for its location
+        # (its watermark is only committed once it has been read back in);
+        # that location's partition files are then read again too
+        dropped = set()
+        for csv_file in new_csv_files:
+            if statuses[csv_file] == REWRITTEN:
+                location_code = csv_file.stem.replace(f"_{frequency}", "")
+                store.drop_location(location_code)
+                dropped.add(location_code)
+        new_partitions += [
+            path for path in raw_partitions
+            if partition_location(path) in dropped and path not in new_partitions
+        ]
         
-        if new_df is not None:
-            # Combine with existing data
-            print(f"\n   🔗 Combining with existing data...")
-            combined_df = pd.concat([existing_df, new_df], ignore_index=True)
-            
-            # Remove duplicates (keep latest)
-            original_rows = len(combined_df)
-            combined_df = combined_df.drop_duplicates(subset=['date', 'location_code'], keep='last')
-            duplicates_removed = original_rows - len(combined_df)
-            
-            if duplicates_removed > 0:
-                print(f"   🧹 Removed {duplicates_removed:,} duplicate records")
-            
-            # Sort
-            combined_df = combined_df.sort_values(['date', 'location_code']).reset_index(drop=True)
-            
-            print(f"\n   📈 Updated Statistics:")
-            print(f"      Total records: {len(combined_df):,} (added {len(combined_df) - len(existing_df):,})")
-            print(f"      Date range: {combined_df['date'].min()} to {combined_df['date'].max()}")
-            print(f"      Locations: {combined_df['location_code'].nunique()}")
-            
-            # Save updated Parquet
-            return save_to_parquet(combined_df, parquet_file, frequency)
+        # Only the rows past each watermark are parsed; they go to new
+        # files and only partitions they overlap are rewritten
+        totals = process_csv_files(new_csv_files, store, frequency, manifest, statuses)
+        if totals is not False:
+            totals = combine_totals(totals, process_partition_files(new_partitions, store, frequency, manifest))
+        
+        if totals is False:
+            return False
+        if totals is None:
+            # Nothing but half-written lines: keep the watermarks where they are
+            print(f"\n   ✅ No complete new rows yet! Dataset is up to date.")
+            return True
+        
+        print_ingest_summary(totals, store)
+        manifest.commit()
+        print_dataset_summary(store)
+        return True
     
     return False
 
@@ -283,8 +450,23 @@ def main():
     parser = argparse.ArgumentParser(description="Process weather data to Parquet format")
     parser.add_argument('--rebuild', action='store_true', 
                        help='Force rebuild from scratch (ignore existing Parquet)')
+    parser.add_argument('--compression', choices=COMPRESSIONS, default=None,
+                       help='Compression for files written in this run (default from config.py; '
+                            'existing files keep theirs unless --rebuild)')
+    parser.add_argument('--compression-level', type=int, default=None,
+                       help='Compression level, e.g. zstd 1 (fast) .. 22 (small)')
     args = parser.parse_args()
     
+    layout_options = {}
+    if args.compression:
+        layout_options['compression'] = args.compression
+    if args.compression_level is not None:
+        layout_options['compression_level'] = args.compression_level
+    layouts = {
+        frequency: ParquetLayout.for_frequency(frequency, **layout_options)
+        for frequency in ('hourly', 'daily')
+    }
+    
     print("\n" + "🌍 SA TOURISM WEATHER PROJECT - DATA PROCESSING")
     print("="*80)
     
@@ -293,15 +475,17 @@ def main():
     else:
         print("⚡ INCREMENTAL MODE: Processing only new/updated data")
     
+    for frequency, layout in layouts.items():
+        print(f"   {frequency.capitalize()}: {layout}")
     print("="*80)
     
     start_time = datetime.now()
     
     # Process hourly data
-    hourly_success = process_frequency("hourly", force_rebuild=args.rebuild)
+    hourly_success = process_frequency("hourly", force_rebuild=args.rebuild, layout=layouts["hourly"])
     
     # Process daily data
-    daily_success = process_frequency("daily", force_rebuild=args.rebuild)
+    daily_success = process_frequency("daily", force_rebuild=args.rebuild, layout=layouts["daily"])
     
     # Summary
     elapsed = datetime.now() - start_time
@@ -313,20 +497,20 @@ def main():
     print(f"   Total time: {minutes}m {seconds}s")
     
     if hourly_success:
-        print(f"   ✅ Hourly data: {hourly_parquet_file}")
+        print(f"   ✅ Hourly data: {hourly_dataset_dir}")
     else:
         print(f"   ⚠️  Hourly data: Issues encountered")
     
     if daily_success:
-        print(f"   ✅ Daily data: {daily_parquet_file}")
+        print(f"   ✅ Daily data: {daily_dataset_dir}")
     else:
         print(f"   ⚠️  Daily data: Issues encountered")
     
     print("\n💡 Next Steps:")
     print("   Load data in Jupyter notebook:")
-    print("   >>> import pandas as pd")
-    print(f"   >>> hourly = pd.read_parquet('data/processed/hourly/all_locations_hourly.parquet')")
-    print(f"   >>> daily = pd.read_parquet('data/processed/daily/all_locations_daily.parquet')")
+    print("   >>> from weather_data import load_weather   # src/ on sys.path")
+    print("   >>> hourly = load_weather('hourly', locations=['cape_town'], columns=['temperature_2m'])")
+    print("   >>> daily = load_weather('daily', start='2024-12-01', end='2025-02-28')")
     print("="*80 + "\n")
 
 
@@ -0,0 +1,166 @@
+"""
+Weather Analytics - Query the processed Parquet data with DuckDB
+
+Runs the bronze/silver/gold tables of the SQL Server warehouse (sql/*.sql)
+as in-process DuckDB views over the processed datasets (see
+src/analytics.py): no server, all cores, and only the columns and row
+groups a query needs are read from the Parquet files.
+
+Usage:
+    python scripts/query_weather.py views
+    python scripts/query_weather.py show gold.gold_location_season_summary
+    python scripts/query_weather.py show silver.silver_daily_features --locations cape_town --limit 20
+    python scripts/query_weather.py sql "SELECT season, AVG(perfect_day_score) FROM silver.silver_daily_features GROUP BY season"
+    python scripts/query_weather.py export silver.silver_daily_features --output data/exports/silver.parquet
+    python scripts/query_weather.py refresh-gold   # gold views -> data/exports/gold/*.parquet
+    python scripts/query_weather.py --persist views  # also save the views in data/database/weather.duckdb
+"""
+
+import sys
+from pathlib import Path
+from datetime import datetime
+import argparse
+import pandas as pd
+
+# ============================================================================
+# SETUP
+# ============================================================================
+
+project_root = Path(__file__).parent.parent
+sys.path.insert(0, str(project_root / "src"))
+
+from config import ANALYTICS_DATABASE_PATH, GOLD_EXPORT_DIR, EXPORTS_DIR
+from analytics import WeatherAnalytics
+
+
+# ============================================================================
+# COMMANDS
+# ============================================================================
+
+def print_frame(df, elapsed):
+    """Print a query result with its row count and run time."""
+    with pd.option_context("display.max_rows", 200, "display.max_columns", None, "display.width", 200):
+        print(df.to_string(index=False) if len(df) else "   (no rows)")
+    print(f"\n   {len(df):,} rows in {elapsed.total_seconds():.3f}s")
+
+
+def list_views(analytics):
+    """Print every view and whether it has data."""
+    print(f"\n{'View':<36} {'Data':<6} Description")
+    print("-" * 100)
+    for view in analytics.views():
+        status = "✅" if view["available"] else "⚠️"
+        print(f"{view['name']:<36} {status:<6} {view['description']}")
+
+    if len(analytics.available) < len(analytics.views()):
+        print("\n   ⚠️  Views without data: run scripts/process_to_parquet.py first")
+
+
+def show_view(analytics, name, locations=None, limit=None):
+    """Print (part of) one view."""
+    start_time = datetime.now()
+    df = analytics.view(name, locations=locations, limit=limit)
+    print_frame(df, datetime.now() - start_time)
+
+
+def run_sql(analytics, query):
+    """Print the result of a SQL query."""
+    start_time = datetime.now()
+    df = analytics.query(query)
+    print_frame(df, datetime.now() - start_time)
+
+
+def export_view(analytics, name, output=None):
+    """Write one view to Parquet."""
+    output = Path(output) if output else EXPORTS_DIR / f"{name.replace('.', '_')}.parquet"
+    start_time = datetime.now()
+    rows = analytics.export(name, output)
+    elapsed = (datetime.now() - start_time).total_seconds()
+    print(f"   ✅ {name}: {rows:,} rows -> {output} ({elapsed:.2f}s)")
+
+
+def refresh_gold(analytics, output_dir=None):
+    """Write every gold view to Parquet (like gold.usp_refresh_gold_location_season_summary)."""
+    output_dir = Path(output_dir) if output_dir else GOLD_EXPORT_DIR
+    start_time = datetime.now()
+    results = analytics.refresh_gold(output_dir)
+    elapsed = (datetime.now() - start_time).total_seconds()
+    for name, rows in results.items():
+        print(f"   ✅ {name}: {rows:,} rows")
+    print(f"\n   Written to: {output_dir} ({elapsed:.2f}s)")
+
+
+# ============================================================================
+# MAIN
+# ============================================================================
+
+def main():
+    """Main entry point."""
+
+    parser = argparse.ArgumentParser(description="Query the processed weather data (DuckDB views)")
+    parser.add_argument('--threads', type=int, default=None,
+                       help='Threads per query (default: all cores)')
+    parser.add_argument('--memory-limit', default=None,
+                       help="DuckDB memory limit, e.g. '2GB' (larger queries spill to disk)")
+    parser.add_argument('--persist', action='store_true',
+                       help=f'Also save the views in {ANALYTICS_DATABASE_PATH.relative_to(project_root)} '
+                            '(for the duckdb CLI, DBeaver, ...)')
+
+    commands = parser.add_subparsers(dest='command', required=True)
+    commands.add_parser('views', help='List the views')
+
+    show = commands.add_parser('show', help='Print a view')
+    show.add_argument('view', help='e.g. gold.gold_location_season_summary')
+    show.add_argument('--locations', nargs='+', default=None, help='Location codes, e.g. cape_town durban')
+    show.add_argument('--limit', type=int, default=None, help='Maximum rows')
+
+    sql = commands.add_parser('sql', help='Run a SQL query against the views')
+    sql.add_argument('query')
+
+    export = commands.add_parser('export', help='Write a view to Parquet')
+    export.add_argument('view')
+    export.add_argument('--output', default=None, help='Parquet file (default: data/exports/<view>.parquet)')
+
+    gold = commands.add_parser('refresh-gold', help='Write every gold view to Parquet')
+    gold.add_argument('--output-dir', default=None, help='Directory (default: data/exports/gold)')
+
+    args = parser.parse_args()
+
+    options = {}
+    if args.threads:
+        options['threads'] = args.threads
+    if args.memory_limit:
+        options['memory_limit'] = args.memory_limit
+    if args.persist:
+        options['database'] = str(ANALYTICS_DATABASE_PATH)
+
+    print("\n" + "🦆 SA TOURISM WEATHER PROJECT - ANALYTICS")
+    print("="*80)
+
+    try:
+        with WeatherAnalytics(**options) as analytics:
+            if args.command == 'views':
+                list_views(analytics)
+            elif args.command == 'show':
+                show_view(analytics, args.view, locations=args.locations, limit=args.limit)
+            elif args.command == 'sql':
+                run_sql(analytics, args.query)
+            elif args.command == 'export':
+                export_view(analytics, args.view, args.output)
+            elif args.command == 'refresh-gold':
+                refresh_gold(analytics, args.output_dir)
+    except (ImportError, ValueError) as e:
+        print(f"   ❌ {e}")
+        sys.exit(1)
+    except Exception as e:
+        # DuckDB errors (bad SQL, unknown column, ...)
+        print(f"   ❌ Query failed: {e}")
+        sys.exit(1)
+
+    if args.persist:
+        print(f"\n   💾 Views saved in: {ANALYTICS_DATABASE_PATH}")
+    print("="*80 + "\n")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,485 @@
+"""
+Embedded analytics over the processed Parquet datasets (DuckDB).
+
+The bronze/silver/gold tables of the SQL Server warehouse (sql/*.sql) as
+DuckDB views over the partitioned datasets, in-process, with no server:
+
+    bronze.bronze_hourly_weather       hourly rows as processed
+    bronze.bronze_daily_weather        daily rows, date as the local day
+    silver.silver_daily_features       notebook 04's features, in SQL
+    gold.gold_location_season_summary  = gold.usp_refresh_gold_location_season_summary
+    gold.gold_location_month_summary   the same per calendar month
+
+- Views read the Parquet files directly (the file list is expanded on every
+  query, so newly processed files are picked up); nothing is loaded into
+  a DataFrame unless a result is asked for
+- Queries run on all cores (ANALYTICS_THREADS), vectorized, with filters
+  and column selection pushed down to the row group statistics of the
+  Parquet layout (parquet_layout.py)
+- Daily dates are converted to the local day (config.TIMEZONE) in the view
+  SQL itself, so seasons/months follow the local calendar in any DuckDB
+  session, including a --persist database opened in the duckdb CLI
+
+Example:
+    >>> with WeatherAnalytics() as analytics:
+    ...     summary = analytics.view("gold.gold_location_season_summary")
+    ...     wet = analytics.query(
+    ...         "SELECT location_name, month, avg_precipitation FROM gold.gold_location_month_summary "
+    ...         "WHERE avg_precipitation > ? ORDER BY avg_precipitation DESC", [5.0])
+"""
+
+import os
+from pathlib import Path
+from typing import Dict, List, Optional
+
+import pandas as pd
+import pyarrow as pa
+
+try:
+    import duckdb
+except ImportError:
+    duckdb = None
+
+try:
+    from .config import (
+        LOCATIONS, TIMEZONE, PROCESSED_HOURLY_DATASET, PROCESSED_DAILY_DATASET, PROCESSED_PARTITION_BY,
+        ANALYTICS_THREADS, ANALYTICS_MEMORY_LIMIT, GOLD_EXPORT_DIR
+    )
+    from .partitioned_store import PartitionedStore
+except ImportError:
+    from config import (
+        LOCATIONS, TIMEZONE, PROCESSED_HOURLY_DATASET, PROCESSED_DAILY_DATASET, PROCESSED_PARTITION_BY,
+        ANALYTICS_THREADS, ANALYTICS_MEMORY_LIMIT, GOLD_EXPORT_DIR
+    )
+    from partitioned_store import PartitionedStore
+
+
+# Location groups of notebook 04 (tourism type)
+COASTAL_LOCATIONS = ["cape_town", "durban", "port_elizabeth", "east_london", "hermanus", "knysna"]
+WINE_REGIONS = ["stellenbosch", "franschhoek", "paarl"]
+SAFARI_GATEWAYS = ["nelspruit", "polokwane"]
+CITY_BUSINESS = ["johannesburg", "pretoria", "bloemfontein"]
+ADVENTURE_OUTDOOR = ["knysna", "hermanus", "port_elizabeth"]
+
+# Public holidays on a fixed date (month, day); Good Friday and Family Day
+# move with Easter and are not included
+PUBLIC_HOLIDAYS = [
+    (1, 1), (3, 21), (4, 27), (5, 1), (6, 16), (8, 9), (9, 24), (12, 16), (12, 25), (12, 26),
+]
+
+# name -> description, in dependency order
+VIEWS = {
+    "bronze.bronze_hourly_weather": "Hourly rows as processed (UTC timestamps)",
+    "bronze.bronze_daily_weather": "Daily rows, date as the local day",
+    "silver.silver_daily_features": "Daily rows with notebook 04's tourism features",
+    "gold.gold_location_season_summary": "Perfect-day score, temperature and rain per location and season",
+    "gold.gold_location_month_summary": "Perfect-day score, temperature and rain per location and month",
+}
+
+GOLD_VIEWS = [name for name in VIEWS if name.startswith("gold.")]
+
+# Which dataset each view reads (silver and gold are built on the daily one)
+_VIEW_DATASETS = {
+    "bronze.bronze_hourly_weather": "hourly",
+    "bronze.bronze_daily_weather": "daily",
+    "silver.silver_daily_features": "daily",
+    "gold.gold_location_season_summary": "daily",
+    "gold.gold_location_month_summary": "daily",
+}
+
+# DuckDB types of the directory (Hive) columns
+_PARTITION_TYPES = {"location_code": "VARCHAR", "year": "SMALLINT", "month": "TINYINT"}
+
+
+def _quote(value) -> str:
+    """SQL string literal."""
+    return "'" + str(value).replace("'", "''") + "'"
+
+
+def _in_list(values: List) -> str:
+    return "(" + ", ".join(_quote(value) for value in values) + ")"
+
+
+def _read_parquet(store: PartitionedStore) -> str:
+    """read_parquet() call over every data file of a store."""
+    pattern = store.root / "location_code=*"
+    for key in store.keys:
+        pattern = pattern / f"{key}=*"
+    hive_types = ", ".join(f"{_quote(key)}: {_PARTITION_TYPES[key]}" for key in ("location_code",) + store.keys)
+    # union_by_name: files written before a column was added read it as NULL
+    return (f"read_parquet({_quote(pattern / '*.parquet')}, hive_partitioning = true, "
+            f"hive_types = {{{hive_types}}}, union_by_name = true)")
+
+
+def _bronze_hourly_sql(store: PartitionedStore) -> str:
+    return f"""
+        SELECT * EXCLUDE ({", ".join(store.keys)})
+        FROM {_read_parquet(store)}
+    """
+
+
+def _bronze_daily_sql(store: PartitionedStore) -> str:
+    # Stored dates are UTC (local midnight = 22:00 the day before): take the
+    # local day in the SQL, not from the session's TimeZone setting
+    return f"""
+        SELECT
+            CAST(timezone({_quote(TIMEZONE)}, date) AS DATE) AS date,
+            location_code,
+            location_name,
+            * EXCLUDE (date, location_code, location_name, {", ".join(store.keys)})
+        FROM {_read_parquet(store)}
+    """
+
+
+_SILVER_SQL = """
+    WITH days AS (
+        SELECT
+            *,
+            CAST(year(date) AS SMALLINT) AS year,
+            CAST(month(date) AS TINYINT) AS month,
+            day(date) AS day_of_month,
+            COALESCE(temperature_2m_mean BETWEEN 18 AND 28, false) AS is_comfortable_temp,
+            COALESCE(precipitation_sum < 0.5, false) AS is_dry,
+            COALESCE(precipitation_sum > 2, false) AS is_rainy,
+            COALESCE(wind_speed_10m_max > 30, false) AS is_windy,
+            location_code IN {coastal} AS is_coastal,
+            location_code IN {wine} AS is_wine_region,
+            location_code IN {safari} AS is_safari_gateway,
+            location_code IN {city} AS is_city_business,
+            location_code IN {adventure} AS is_adventure,
+            ROW_NUMBER() OVER by_day AS day_number
+        FROM bronze.bronze_daily_weather
+        WINDOW by_day AS (PARTITION BY location_code ORDER BY date)
+    ),
+    scored AS (
+        SELECT
+            *,
+            CAST(is_comfortable_temp AS INTEGER) * 30
+                + CAST(is_dry AS INTEGER) * 25
+                + sunshine_duration / 3600 / 12 * 30
+                + (1 - wind_speed_10m_max / 60) * 15 AS raw_score,
+            CASE
+                WHEN location_code IN {coastal} THEN
+                    CASE WHEN month IN (12, 1, 2) THEN 'Peak' WHEN month IN (11, 3, 4) THEN 'Shoulder' ELSE 'Low' END
+                WHEN location_code IN {wine} THEN
+                    CASE WHEN month IN (2, 3, 4, 10, 11) THEN 'Peak' WHEN month IN (1, 5, 9, 12) THEN 'Shoulder' ELSE 'Low' END
+                WHEN location_code IN {safari} THEN
+                    CASE WHEN month IN (6, 7, 8, 12, 1) THEN 'Peak' WHEN month IN (5, 9, 11, 2) THEN 'Shoulder' ELSE 'Low' END
+                ELSE
+                    CASE WHEN month IN (12, 1, 4, 7) THEN 'Peak' WHEN month IN (11, 2, 3, 6, 8, 9) THEN 'Shoulder' ELSE 'Low' END
+            END AS tourism_season
+        FROM days
+    ),
+    featured AS (
+        SELECT
+            *,
+            -- clipped to 0-100 (NULL if a measurement is missing)
+            CASE WHEN raw_score IS NOT NULL THEN LEAST(GREATEST(raw_score, 0), 100) END AS perfect_day_score
+        FROM scored
+    )
+    SELECT
+        date,
+        location_code,
+        location_name,
+        temperature_2m_mean,
+        temperature_2m_min,
+        temperature_2m_max,
+        precipitation_sum,
+        wind_speed_10m_max,
+        sunshine_duration,
+        cloud_cover_mean,
+        year,
+        month,
+        CASE
+            WHEN month IN (12, 1, 2) THEN 'Summer'
+            WHEN month IN (3, 4, 5) THEN 'Autumn'
+            WHEN month IN (6, 7, 8) THEN 'Winter'
+            ELSE 'Spring'
+        END AS season,
+        isodow(date) IN (5, 6, 7) AS is_weekend,  -- Fri, Sat, Sun
+        COALESCE(perfect_day_score > 80, false) AS is_perfect_day,
+        perfect_day_score,
+        tourism_season,
+        CASE
+            WHEN temperature_2m_mean < 10 THEN 'Cold'
+            WHEN temperature_2m_mean < 18 THEN 'Cool'
+            WHEN temperature_2m_mean < 28 THEN 'Comfortable'
+            WHEN temperature_2m_mean < 35 THEN 'Hot'
+            WHEN temperature_2m_mean >= 35 THEN 'Very Hot'
+        END AS temp_category,
+        CASE
+            WHEN precipitation_sum = 0 THEN 'No Rain'
+            WHEN precipitation_sum < 2 THEN 'Light'
+            WHEN precipitation_sum < 10 THEN 'Moderate'
+            WHEN precipitation_sum < 20 THEN 'Heavy'
+            WHEN precipitation_sum >= 20 THEN 'Very Heavy'
+        END AS rain_category,
+        CASE
+            WHEN month = 12 OR (month = 1 AND day_of_month <= 15) THEN true
+            WHEN month IN (3, 4) THEN day_of_month BETWEEN 15 AND 30
+            WHEN month = 6 THEN day_of_month >= 15
+            WHEN month = 7 THEN day_of_month >= 15 OR day_of_month <= 10
+            WHEN month = 9 THEN day_of_month BETWEEN 20 AND 30
+            ELSE false
+        END AS is_school_holiday,
+        (month, day_of_month) IN {holidays} AS is_public_holiday,
+        is_dry,
+        is_rainy,
+        is_windy,
+        is_coastal,
+        is_wine_region,
+        is_safari_gateway,
+        is_city_business,
+        is_adventure,
+        COALESCE(is_coastal AND temperature_2m_max > 24 AND temperature_2m_max < 35
+                 AND precipitation_sum < 1 AND wind_speed_10m_max < 30
+                 AND sunshine_duration > 6 * 3600, false) AS perfect_beach_day,
+        COALESCE(is_wine_region AND temperature_2m_mean BETWEEN 18 AND 28
+                 AND precipitation_sum < 2 AND wind_speed_10m_max < 25
+                 AND cloud_cover_mean < 60, false) AS perfect_wine_day,
+        COALESCE(is_safari_gateway AND temperature_2m_mean BETWEEN 15 AND 30
+                 AND precipitation_sum < 5 AND wind_speed_10m_max < 35, false) AS perfect_safari_day,
+        tourism_season = 'Peak' AS is_peak_season,
+        tourism_season = 'Low' AS is_low_season,
+        AVG(temperature_2m_mean) OVER last_7_days AS temp_7day_avg,
+        SUM(precipitation_sum) OVER last_7_days AS precip_7day_sum,
+        AVG(temperature_2m_mean) OVER last_3_days AS temp_3day_avg,
+        -- days since the last day that was not dry / rainy
+        day_number - COALESCE(MAX(CASE WHEN NOT is_dry THEN day_number END) OVER up_to_day, 0) AS consecutive_dry_days,
+        day_number - COALESCE(MAX(CASE WHEN NOT is_rainy THEN day_number END) OVER up_to_day, 0) AS consecutive_rainy_days,
+        temperature_2m_mean - LAG(temperature_2m_mean) OVER by_day AS temp_change_1day,
+        COALESCE(ABS(temperature_2m_mean - LAG(temperature_2m_mean) OVER by_day) > 5, false) AS sudden_temp_change
+    FROM featured
+    WINDOW
+        by_day AS (PARTITION BY location_code ORDER BY date),
+        last_7_days AS (by_day ROWS BETWEEN 6 PRECEDING AND CURRENT ROW),
+        last_3_days AS (by_day ROWS BETWEEN 2 PRECEDING AND CURRENT ROW),
+        up_to_day AS (by_day ROWS BETWEEN UNBOUNDED PRECEDING AND CURRENT ROW)
+""".format(
+    coastal=_in_list(COASTAL_LOCATIONS),
+    wine=_in_list(WINE_REGIONS),
+    safari=_in_list(SAFARI_GATEWAYS),
+    city=_in_list(CITY_BUSINESS),
+    adventure=_in_list(ADVENTURE_OUTDOOR),
+    holidays="(" + ", ".join(f"({month}, {day})" for month, day in PUBLIC_HOLIDAYS) + ")",
+)
+
+# Same query as gold.usp_refresh_gold_location_season_summary
+_GOLD_SEASON_SQL = """
+    SELECT
+        COALESCE(location_name, 'Unknown') AS location_name,
+        COALESCE(season, 'Unknown') AS season,
+        AVG(perfect_day_score) AS avg_perfect_day_score,
+        AVG(temperature_2m_mean) AS avg_temperature,
+        AVG(precipitation_sum) AS avg_precipitation,
+        AVG(CAST(is_perfect_day AS DOUBLE)) * 100.0 AS percent_perfect_days,
+        COUNT(*) AS total_days
+    FROM silver.silver_daily_features
+    GROUP BY location_name, season
+"""
+
+_GOLD_MONTH_SQL = """
+    SELECT
+        COALESCE(location_name, 'Unknown') AS location_name,
+        month,
+        AVG(perfect_day_score) AS avg_perfect_day_score,
+        AVG(temperature_2m_mean) AS avg_temperature,
+        AVG(temperature_2m_min) AS avg_temperature_min,
+        AVG(temperature_2m_max) AS avg_temperature_max,
+        AVG(precipitation_sum) AS avg_precipitation,
+        AVG(sunshine_duration) / 3600 AS avg_sunshine_hours,
+        AVG(CAST(is_perfect_day AS DOUBLE)) * 100.0 AS percent_perfect_days,
+        AVG(CAST(is_rainy AS DOUBLE)) * 100.0 AS percent_rainy_days,
+        COUNT(*) AS total_days
+    FROM silver.silver_daily_features
+    GROUP BY location_name, month
+"""
+
+
+class WeatherAnalytics:
+    """
+    DuckDB connection with the bronze/silver/gold views over the processed datasets.
+    """
+
+    def __init__(
+        self,
+        database: str = ":memory:",
+        hourly_dataset: Path = PROCESSED_HOURLY_DATASET,
+        daily_dataset: Path = PROCESSED_DAILY_DATASET,
+        partition_by: str = PROCESSED_PARTITION_BY,
+        threads: Optional[int] = ANALYTICS_THREADS,
+        memory_limit: Optional[str] = ANALYTICS_MEMORY_LIMIT
+    ):
+        """
+        Args:
+            database: ':memory:', or a .duckdb file to keep the views in
+                (e.g. for the duckdb CLI or DBeaver)
+            hourly_dataset: Processed hourly dataset directory
+            daily_dataset: Processed daily dataset directory
+            partition_by: How the datasets are partitioned ('year' or 'month')
+            threads: Threads per query (None = all cores)
+            memory_limit: e.g. '2GB' (None = DuckDB default); larger
+                aggregations spill to disk
+
+        Raises:
+            ImportError: If duckdb is not installed
+        """
+        if duckdb is None:
+            raise ImportError("The analytics views need DuckDB: pip install duckdb")
+
+        if database != ":memory:":
+            Path(database).parent.mkdir(parents=True, exist_ok=True)
+        self.connection = duckdb.connect(str(database))
+        if threads:
+            self.connection.execute(f"SET threads = {int(threads)}")
+        if memory_limit:
+            self.connection.execute(f"SET memory_limit = {_quote(memory_limit)}")
+        # Hourly timestamps are shown in local time (display only: the views
+        # do their own time zone conversion, see _bronze_daily_sql)
+        self.connection.execute(f"SET TimeZone = {_quote(TIMEZONE)}")
+
+        self.stores = {
+            "hourly": PartitionedStore(hourly_dataset, partition_by=partition_by),
+            "daily": PartitionedStore(daily_dataset, partition_by=partition_by),
+        }
+        self.available: List[str] = []
+        self.create_views()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+
+    def close(self):
+        self.connection.close()
+
+    # ------------------------------------------------------------------
+    # Views
+    # ------------------------------------------------------------------
+
+    def create_views(self) -> List[str]:
+        """
+        (Re)create the views of every dataset that has files.
+
+        A dataset that is still empty gets no views (DuckDB checks the
+        files when a view is created); call again after processing.
+
+        Returns:
+            Names of the views created
+        """
+        definitions = {
+            "bronze.bronze_hourly_weather": lambda: _bronze_hourly_sql(self.stores["hourly"]),
+            "bronze.bronze_daily_weather": lambda: _bronze_daily_sql(self.stores["daily"]),
+            "silver.silver_daily_features": lambda: _SILVER_SQL,
+            "gold.gold_location_season_summary": lambda: _GOLD_SEASON_SQL,
+            "gold.gold_location_month_summary": lambda: _GOLD_MONTH_SQL,
+        }
+
+        self.available = []
+        for name, sql in definitions.items():
+            schema = name.split(".")[0]
+            self.connection.execute(f"CREATE SCHEMA IF NOT EXISTS {schema}")
+            if self.stores[_VIEW_DATASETS[name]].is_empty():
+                self.connection.execute(f"DROP VIEW IF EXISTS {name}")
+                continue
+            self.connection.execute(f"CREATE OR REPLACE VIEW {name} AS {sql()}")
+            self.available.append(name)
+        return self.available
+
+    def views(self) -> List[Dict]:
+        """Every view: name, description and whether its dataset has data."""
+        return [
+            {"name": name, "description": description, "available": name in self.available}
+            for name, description in VIEWS.items()
+        ]
+
+    def _check_view(self, name: str):
+        if name not in VIEWS:
+            raise ValueError(f"Unknown view: {name} (use one of {list(VIEWS)})")
+        if name not in self.available:
+            raise ValueError(f"No data for {name} yet: run scripts/process_to_parquet.py first")
+
+    # ------------------------------------------------------------------
+    # Queries
+    # ------------------------------------------------------------------
+
+    def sql(self, query: str, params: Optional[List] = None) -> "duckdb.DuckDBPyRelation":
+        """Run SQL and return the DuckDB relation (fetch with .df(), .arrow(), .fetchall())."""
+        if params:
+            return self.connection.execute(query, params)
+        return self.connection.sql(query)
+
+    def query(self, query: str, params: Optional[List] = None) -> pd.DataFrame:
+        """Run SQL (with ? placeholders for params) and return the result as a DataFrame."""
+        return self.sql(query, params).df()
+
+    def query_arrow(self, query: str, params: Optional[List] = None) -> pa.Table:
+        """Run SQL and return the result as an Arrow table."""
+        return self.sql(query, params).fetch_arrow_table()
+
+    def view(self, name: str, locations: Optional[List[str]] = None, limit: Optional[int] = None) -> pd.DataFrame:
+        """
+        Read a view, optionally only some locations.
+
+        Args:
+            name: View name, e.g. 'gold.gold_location_season_summary'
+            locations: Location codes (gold views are matched on location_name)
+            limit: Maximum rows
+
+        Raises:
+            ValueError: Unknown view, or its dataset has no data yet
+        """
+        self._check_view(name)
+        query = f"SELECT * FROM {name}"
+        params = []
+        if locations:
+            columns = [row[0] for row in self.connection.execute(f"DESCRIBE {name}").fetchall()]
+            if "location_code" in columns:
+                values = list(locations)
+                query += f" WHERE location_code IN ({', '.join('?' for _ in values)})"
+            else:
+                values = [LOCATIONS[code]["name"] if code in LOCATIONS else code for code in locations]
+                query += f" WHERE location_name IN ({', '.join('?' for _ in values)})"
+            params += values
+        if limit is not None:
+            query += f" LIMIT {int(limit)}"
+        return self.query(query, params)
+
+    # ------------------------------------------------------------------
+    # Exports
+    # ------------------------------------------------------------------
+
+    def export(self, name: str, path: Path, compression: str = "zstd") -> int:
+        """
+        Write a view to a Parquet file (streamed, temp name + rename).
+
+        Returns:
+            Rows written
+        """
+        self._check_view(name)
+        path = Path(path)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = path.parent / f".{path.name}.tmp"
+        try:
+            rows = self.connection.execute(
+                f"COPY (SELECT * FROM {name}) TO {_quote(tmp_path)} (FORMAT parquet, COMPRESSION {compression})"
+            ).fetchone()[0]
+        except BaseException:
+            tmp_path.unlink(missing_ok=True)
+            raise
+        os.replace(tmp_path, path)
+        return rows
+
+    def refresh_gold(self, output_dir: Path = GOLD_EXPORT_DIR) -> Dict[str, int]:
+        """
+        Export every gold view to <output_dir>/<table>.parquet (e.g. for Power BI).
+
+        Returns:
+            Rows written per view
+        """
+        self._check_view(GOLD_VIEWS[0])
+        return {
+            name: self.export(name, Path(output_dir) / f"{name.split('.', 1)[1]}.parquet")
+            for name in GOLD_VIEWS
+        }
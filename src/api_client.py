@@ -3,9 +3,11 @@ API Client for Open-Meteo Weather API.
 Handles fetching historical, forecast, and current weather data.
 """
 
-import requests
+import httpx
 import json
+import threading
 import time
+from collections import deque
 from datetime import datetime, timedelta
 from pathlib import Path
 from typing import Dict, Optional, List
@@ -15,6 +17,8 @@ from .config import (
     API_TIMEOUT,
     API_RETRY_COUNT,
     API_RETRY_DELAY,
+    API_POOL_SIZE,
+    API_HTTP2,
     LOCATIONS,
     HOURLY_VARIABLES,
     DAILY_VARIABLES,
@@ -22,71 +26,252 @@ from .config import (
     WIND_SPEED_UNIT,
     PRECIPITATION_UNIT,
     TIMEZONE,
+    get_variable_profile,
     RAW_HISTORICAL_DIR,
     RAW_FORECAST_DIR,
     RAW_CURRENT_DIR,
 )
+from .rate_limiter import RateLimitLedger, estimate_call_weight
+from .raw_archive import RawArchive
+from .response_cache import ResponseCache
+from .metrics import FetchMetrics
+from .api_controller import ApiController, CircuitOpenError
 
 
-class OpenMeteoClient:
-    """Client for interacting with Open-Meteo API."""
+# Recent per-request timings kept on a client (the summary covers every request)
+RECENT_TIMINGS = 1000
+
+
+class _RequestTimer:
+    """
+    httpx trace hook that records when each connection/transfer step happens.
+    
+    Lets us split a request's latency into connect time (TCP + TLS, zero
+    when a pooled connection is reused) and transfer time (the rest).
+    """
     
     def __init__(self):
+        self.marks = {}
+    
+    def __call__(self, event_name: str, info: Dict):
+        self.marks[event_name] = time.perf_counter()
+    
+    def connect_time(self) -> float:
+        started = self.marks.get("connection.connect_tcp.started")
+        if started is None:
+            return 0.0  # Reused a keep-alive connection
+        finished = self.marks.get(
+            "connection.start_tls.complete",
+            self.marks.get("connection.connect_tcp.complete", started)
+        )
+        return finished - started
+
+
+def _http2_available() -> bool:
+    """HTTP/2 needs the optional 'h2' package (pip install httpx[http2])."""
+    try:
+        import h2  # noqa: F401
+        return True
+    except ImportError:
+        return False
+
+
+class OpenMeteoClient:
+    """
+    Client for interacting with Open-Meteo API.
+    
+    Owns a pooled keep-alive httpx session, so repeated calls reuse TCP/TLS
+    connections. One client can be shared by several worker threads.
+    Use as a context manager (or call close()) to release the connections.
+    
+    Responses are memoized in memory (see response_cache.py): a repeated
+    call with the same parameters returns the cached dict without a request
+    or rate-limit quota. Treat returned dicts as read-only.
+    """
+    
+    def __init__(
+        self,
+        pool_size: int = API_POOL_SIZE,
+        http2: bool = API_HTTP2,
+        rate_limiter=None,
+        response_cache: Optional[ResponseCache] = None,
+        use_cache: bool = True,
+        metrics: Optional[FetchMetrics] = None,
+        controller: Optional[ApiController] = None
+    ):
+        """
+        Args:
+            pool_size: Maximum number of open (and kept-alive) connections
+            http2: Use HTTP/2 if the 'h2' package is installed
+            rate_limiter: Anything with acquire(weight)/usage() (default: shared RateLimitLedger)
+            response_cache: In-memory cache to use (default: a new ResponseCache,
+                pass one to share it between clients)
+            use_cache: False = always make the request
+            metrics: Where to record request metrics (default: a new
+                FetchMetrics('openmeteo_client'), exported on close())
+            controller: Adaptive concurrency/backoff/circuit breaker (default:
+                a new ApiController; share one between clients on the same API)
+        """
         self.base_url = API_BASE_URL
         self.timeout = API_TIMEOUT
         self.retry_count = API_RETRY_COUNT
         self.retry_delay = API_RETRY_DELAY
         
-        # Rate limit tracking
+        if http2 and not _http2_available():
+            print("⚠️  HTTP/2 requested but 'h2' is not installed, using HTTP/1.1")
+            http2 = False
+        
+        # Pooled session (thread-safe, keeps connections alive between calls)
+        self.session = httpx.Client(
+            timeout=self.timeout,
+            http2=http2,
+            limits=httpx.Limits(
+                max_connections=pool_size,
+                max_keepalive_connections=pool_size,
+            ),
+        )
+        
+        # Per-request latency split into connect and transfer time: running
+        # totals plus the most recent requests (a long-running poller keeps
+        # its client open indefinitely, so nothing grows per request)
+        self.request_timings = deque(maxlen=RECENT_TIMINGS)
+        self._timing_totals = {"requests": 0, "new_connections": 0, "connect_total": 0.0, "transfer_total": 0.0}
+        self._timings_lock = threading.Lock()
+        
+        # Rate limit tracking (ledger is shared with all other processes)
+        self.rate_limiter = rate_limiter or RateLimitLedger()
         self.call_count = 0
         self.session_start_time = datetime.now()
         self.last_call_time = None
+        
+        # In-memory response memoization + single-flight deduplication
+        self.response_cache = None
+        if use_cache:
+            self.response_cache = response_cache or ResponseCache()
+        
+        # Latency/bytes/retries/cache/wait metrics (see metrics.py)
+        self.metrics = metrics or FetchMetrics("openmeteo_client")
+        
+        # Retries with jittered backoff / Retry-After, AIMD in-flight limit, circuit breaker
+        self.controller = controller or ApiController(
+            max_attempts=self.retry_count,
+            backoff_base=self.retry_delay,
+            retry_exceptions=(httpx.TransportError,),
+            metrics=self.metrics,
+        )
+    
+    def __enter__(self):
+        return self
+    
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
     
-    def _check_rate_limits(self):
+    def close(self):
+        """Close the pooled HTTP connections and export this run's metrics."""
+        self.session.close()
+        if self.call_count > 0:
+            paths = self.metrics.export()
+            print(f"📊 Metrics written to {paths['json'].name} / {paths['prom'].name}")
+    
+    def timing_summary(self) -> Dict:
         """
-        Check if we're approaching rate limits and add delays if needed.
+        Summarise request latencies recorded so far (every request of this client).
+        
+        Returns:
+            Dict with request count, connections opened and mean/total
+            connect and transfer seconds
+        """
+        with self._timings_lock:
+            totals = dict(self._timing_totals)
+        
+        if not totals["requests"]:
+            return {"requests": 0}
+        
+        totals["connect_mean"] = totals["connect_total"] / totals["requests"]
+        totals["transfer_mean"] = totals["transfer_total"] / totals["requests"]
+        return totals
+    
+    def _check_rate_limits(self, weight: float = 1.0):
+        """
+        Wait for room in the shared rate limit ledger, then record the call.
+        
+        The ledger lives under data/ and is shared by every client and
+        script, so parallel fetchers all see the same budget.
         
         Free tier limits:
         - 10,000 calls per day
         - 5,000 calls per hour
         - 600 calls per minute
+        
+        Args:
+            weight: Number of API calls this request counts as
         """
-        now = datetime.now()
-        
-        # Add small delay between calls (rate limit protection)
-        if self.last_call_time:
-            time_since_last = (now - self.last_call_time).total_seconds()
-            if time_since_last < 1:  # Less than 1 second
-                time.sleep(1 - time_since_last)
-        
-        # Check hourly limit
-        elapsed_hours = (now - self.session_start_time).total_seconds() / 3600
-        if elapsed_hours > 0:
-            calls_per_hour = self.call_count / elapsed_hours
-            if calls_per_hour > 4500:  # 90% of 5,000 limit
-                print(f"⚠️  Approaching hourly rate limit ({calls_per_hour:.0f} calls/hour)")
-                print(f"   Pausing for 1 minute...")
-                time.sleep(60)
-        
-        # Check daily limit
-        if self.call_count > 9000:  # 90% of 10,000 limit
-            print(f"⚠️  WARNING: Approaching daily rate limit!")
-            print(f"   Calls today: {self.call_count}")
-            print(f"   Consider stopping and resuming tomorrow.")
+        waited = self.rate_limiter.acquire(weight)
+        self.metrics.observe("rate_limit_wait_seconds", waited)
+        if waited > 0:
+            print(f"⏳ Waited {waited:.1f}s for rate limit")
         
         # Update tracking
         self.call_count += 1
-        self.last_call_time = now
+        self.last_call_time = datetime.now()
+    
+    @staticmethod
+    def _request_weight(params: Dict) -> float:
+        """Estimate how many API calls a request counts as (see estimate_call_weight)."""
+        n_variables = sum(
+            len(str(params[key]).split(","))
+            for key in ("hourly", "daily")
+            if params.get(key)
+        )
+        
+        if "start_date" in params and "end_date" in params:
+            start = datetime.strptime(params["start_date"], "%Y-%m-%d")
+            end = datetime.strptime(params["end_date"], "%Y-%m-%d")
+            n_days = (end - start).days + 1
+        else:
+            n_days = params.get("forecast_days", 1) + params.get("past_days", 0)
+        
+        n_locations = len(str(params["latitude"]).split(","))
+        return estimate_call_weight(n_variables, n_days, n_locations)
+    
+    def cache_stats(self) -> Dict:
+        """Hit/miss counters of the in-memory response cache."""
+        if self.response_cache is None:
+            return {}
+        return self.response_cache.stats()
+    
+    def _make_request(self, params: Dict, data_type: str = "forecast") -> Optional[Dict]:
+        """
+        Make HTTP GET request to API, answered from the response cache if possible.
         
-        # Log progress every 100 calls
-        if self.call_count % 100 == 0:
-            elapsed_time = (now - self.session_start_time).total_seconds() / 60
-            print(f"📊 API Stats: {self.call_count} calls in {elapsed_time:.1f} minutes")
+        Args:
+            params: Dictionary of URL parameters
+            data_type: 'historical', 'forecast' or 'current' (selects the cache TTL)
+        
+        Returns:
+            JSON response as dict, or None if request fails
+        """
+        if self.response_cache is None:
+            return self._request(params)
+        
+        fetched = []
+        
+        def fetch():
+            fetched.append(True)
+            return self._request(params)
+        
+        data = self.response_cache.get_or_fetch(params, data_type, fetch)
+        self.metrics.inc("cache_misses_total" if fetched else "cache_hits_total")
+        return data
     
-    def _make_request(self, params: Dict) -> Optional[Dict]:
+    def _request(self, params: Dict) -> Optional[Dict]:
         """
         Make HTTP GET request to API with retry logic.
         
+        Retries, backoff (honouring Retry-After), the number of requests in
+        flight and the circuit breaker are handled by self.controller
+        (see api_controller.py).
+        
         Args:
             params: Dictionary of URL parameters
         
@@ -94,30 +279,82 @@ class OpenMeteoClient:
             JSON response as dict, or None if request fails
         """
         # Check rate limits before making request
-        self._check_rate_limits()
-        
-        for attempt in range(self.retry_count):
-            try:
-                response = requests.get(
-                    self.base_url,
-                    params=params,
-                    timeout=self.timeout
-                )
-                response.raise_for_status()  # Raise exception for 4xx/5xx status codes
-                return response.json()
-            
-            except requests.exceptions.Timeout:
-                print(f"⚠️  Request timeout (attempt {attempt + 1}/{self.retry_count})")
-                if attempt < self.retry_count - 1:
-                    time.sleep(self.retry_delay)
-            
-            except requests.exceptions.RequestException as e:
-                print(f"⚠️  Request failed: {e} (attempt {attempt + 1}/{self.retry_count})")
-                if attempt < self.retry_count - 1:
-                    time.sleep(self.retry_delay)
-        
-        print(f"❌ Failed to fetch data after {self.retry_count} attempts")
-        return None
+        self._check_rate_limits(self._request_weight(params))
+        
+        timers = []
+        
+        def send():
+            timers.append(_RequestTimer())
+            return self.session.get(
+                self.base_url,
+                params=params,
+                extensions={"trace": timers[-1]}
+            )
+        
+        started = time.perf_counter()
+        try:
+            response = self.controller.send(send)
+            response.raise_for_status()  # Raise exception for 4xx/5xx status codes
+            data = response.json()
+        
+        except CircuitOpenError as e:
+            print(f"⛔ {e}")
+            self.metrics.inc("request_errors_total")
+            return None
+        
+        except (httpx.HTTPError, ValueError) as e:
+            print(f"❌ Request failed: {e}")
+            self.metrics.inc("request_errors_total")
+            return None
+        
+        total = time.perf_counter() - started
+        connect = sum(timer.connect_time() for timer in timers)
+        with self._timings_lock:
+            self.request_timings.append({
+                "connect": connect,
+                "transfer": total - connect,
+                "bytes": len(response.content),
+            })
+            self._timing_totals["requests"] += 1
+            self._timing_totals["new_connections"] += 1 if connect > 0 else 0
+            self._timing_totals["connect_total"] += connect
+            self._timing_totals["transfer_total"] += total - connect
+        
+        self.metrics.inc("requests_total")
+        self.metrics.observe("request_latency_seconds", total)
+        self.metrics.inc("response_bytes_total", len(response.content))
+        self.metrics.inc("records_parsed_total", self._count_records(data))
+        return data
+    
+    @staticmethod
+    def _count_records(data) -> int:
+        """Timestamps in the hourly/daily sections (one or several locations)."""
+        items = data if isinstance(data, list) else [data]
+        return sum(
+            len(item.get(section, {}).get("time", []))
+            for item in items if isinstance(item, dict)
+            for section in ("hourly", "daily")
+        )
+    
+    @staticmethod
+    def _resolve_variables(
+        hourly_vars: Optional[List[str]],
+        daily_vars: Optional[List[str]],
+        profile: Optional[str]
+    ) -> tuple:
+        """Fill in missing variable lists from a profile (or the defaults)."""
+        if profile is not None:
+            # This client always talks to the forecast endpoint (API_BASE_URL)
+            variables = get_variable_profile(profile, "forecast")
+            default_hourly, default_daily = variables["hourly"], variables["daily"]
+        else:
+            default_hourly, default_daily = HOURLY_VARIABLES, DAILY_VARIABLES
+        
+        if hourly_vars is None:
+            hourly_vars = default_hourly
+        if daily_vars is None:
+            daily_vars = default_daily
+        return hourly_vars, daily_vars
     
     def fetch_historical_weather(
         self,
@@ -125,7 +362,8 @@ class OpenMeteoClient:
         start_date: str,
         end_date: str,
         hourly_vars: Optional[List[str]] = None,
-        daily_vars: Optional[List[str]] = None
+        daily_vars: Optional[List[str]] = None,
+        profile: Optional[str] = None
     ) -> Optional[Dict]:
         """
         Fetch historical weather data for a location.
@@ -136,6 +374,8 @@ class OpenMeteoClient:
             end_date: End date in 'YYYY-MM-DD' format
             hourly_vars: List of hourly variables to fetch (default: HOURLY_VARIABLES)
             daily_vars: List of daily variables to fetch (default: DAILY_VARIABLES)
+            profile: Variable profile name (e.g. 'full-forecast'), used for
+                whichever of hourly_vars/daily_vars is not given
         
         Returns:
             JSON response as dictionary, or None if request fails
@@ -154,11 +394,8 @@ class OpenMeteoClient:
             print(f"❌ Unknown location: {location_code}")
             return None
         
-        # Use default variables if not specified
-        if hourly_vars is None:
-            hourly_vars = HOURLY_VARIABLES
-        if daily_vars is None:
-            daily_vars = DAILY_VARIABLES
+        # Use default (or profile) variables if not specified
+        hourly_vars, daily_vars = self._resolve_variables(hourly_vars, daily_vars, profile)
         
         # Build API parameters
         params = {
@@ -178,7 +415,7 @@ class OpenMeteoClient:
         print(f"   Date range: {start_date} to {end_date}")
         print(f"   Coordinates: {location['latitude']}, {location['longitude']}")
         
-        return self._make_request(params)
+        return self._make_request(params, "historical")
     
     def fetch_forecast(
         self,
@@ -186,7 +423,8 @@ class OpenMeteoClient:
         forecast_days: int = 7,
         hourly_vars: Optional[List[str]] = None,
         daily_vars: Optional[List[str]] = None,
-        past_days: int = 0
+        past_days: int = 0,
+        profile: Optional[str] = None
     ) -> Optional[Dict]:
         """
         Fetch weather forecast for a location.
@@ -197,6 +435,8 @@ class OpenMeteoClient:
             hourly_vars: List of hourly variables
             daily_vars: List of daily variables
             past_days: Number of past days to include (0-92)
+            profile: Variable profile name, used for whichever of
+                hourly_vars/daily_vars is not given
         
         Returns:
             JSON response as dictionary
@@ -206,10 +446,7 @@ class OpenMeteoClient:
             print(f"❌ Unknown location: {location_code}")
             return None
         
-        if hourly_vars is None:
-            hourly_vars = HOURLY_VARIABLES
-        if daily_vars is None:
-            daily_vars = DAILY_VARIABLES
+        hourly_vars, daily_vars = self._resolve_variables(hourly_vars, daily_vars, profile)
         
         params = {
             "latitude": location["latitude"],
@@ -228,7 +465,7 @@ class OpenMeteoClient:
         print(f"📡 Fetching forecast for {location['name']}...")
         print(f"   Forecast days: {forecast_days}, Past days: {past_days}")
         
-        return self._make_request(params)
+        return self._make_request(params, "forecast")
     
     def fetch_current_weather(self, location_code: str) -> Optional[Dict]:
         """
@@ -256,26 +493,58 @@ class OpenMeteoClient:
         
         print(f"📡 Fetching current weather for {location['name']}...")
         
-        return self._make_request(params)
+        return self._make_request(params, "current")
 
 
 def save_raw_response(
     response_json: Dict,
     file_path: Path,
-    create_dirs: bool = True
+    create_dirs: bool = True,
+    archive: Optional[RawArchive] = None,
+    location_code: Optional[str] = None,
+    data_type: str = "historical",
+    start_date: Optional[str] = None,
+    end_date: Optional[str] = None
 ) -> bool:
     """
-    Save raw JSON response to file.
+    Save raw JSON response to file, or to a compressed archive.
     
     Args:
         response_json: JSON data to save
-        file_path: Path where to save the file
+        file_path: Path where to save the file (in archive mode only its
+            name is used, as the key to read the response back with)
         create_dirs: Create parent directories if they don't exist
+        archive: RawArchive to stream the response into instead of writing
+            a pretty-printed JSON file (compressed NDJSON + offset index)
+        location_code: Location of the response (archive index)
+        data_type: 'historical', 'forecast' or 'current' (archive index)
+        start_date: First day covered (archive index)
+        end_date: Last day covered (archive index)
     
     Returns:
         True if successful, False otherwise
+    
+    Example:
+        >>> archive = RawArchive()
+        >>> save_raw_response(data, Path(generate_filename('cape_town', 'historical',
+        ...                   '2024-01-01', '2024-01-31')), archive=archive,
+        ...                   location_code='cape_town', start_date='2024-01-01',
+        ...                   end_date='2024-01-31')
     """
+    file_path = Path(file_path)
     try:
+        if archive is not None:
+            key = archive.append(
+                response_json,
+                location_code=location_code,
+                data_type=data_type,
+                start_date=start_date,
+                end_date=end_date,
+                key=file_path.stem,
+            )
+            print(f"💾 Archived raw data as: {key}")
+            return True
+        
         if create_dirs:
             file_path.parent.mkdir(parents=True, exist_ok=True)
         
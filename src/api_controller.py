@@ -0,0 +1,436 @@
+"""
+Adaptive concurrency, backoff and circuit breaking for API calls.
+
+Fixed retry delays and a fixed worker count either waste throughput (too
+careful) or cause retry storms (too eager). The controller adjusts to what
+the API is actually taking:
+
+- AdaptiveConcurrency: AIMD limit on requests in flight. Each fast success
+  adds 1/limit (about +1 per round of requests); a 429, 5xx, network error
+  or slow response halves the limit (at most once per cooldown).
+- Backoff: jittered exponential ("full jitter") between retries, or the
+  server's Retry-After when it sends one. A Retry-After pauses ALL workers,
+  not just the one that got the 429.
+- CircuitBreaker: after several failures in a row, calls fail fast for a
+  while; then one trial request decides whether to close it again.
+
+Use ApiController.send() around any requests/httpx call, or wrap a requests
+session in ControlledSession (e.g. for openmeteo_requests.Client). Sessions
+that cannot wrap another session (requests_cache.CachedSession) mount a
+ControlledAdapter instead.
+"""
+
+import random
+import threading
+import time
+from contextlib import contextmanager
+from datetime import datetime, timezone
+from email.utils import parsedate_to_datetime
+from typing import Callable, Dict, Optional, Tuple, Type
+
+from requests.adapters import HTTPAdapter
+
+try:
+    from .config import (
+        API_RETRY_COUNT, API_RETRY_DELAY, API_RETRY_MAX_DELAY,
+        API_MAX_WORKERS, API_CONCURRENCY_MIN, API_CONCURRENCY_MAX,
+        API_LATENCY_TARGET_SECONDS, API_CIRCUIT_FAILURES, API_CIRCUIT_RESET_SECONDS,
+    )
+except ImportError:
+    from config import (
+        API_RETRY_COUNT, API_RETRY_DELAY, API_RETRY_MAX_DELAY,
+        API_MAX_WORKERS, API_CONCURRENCY_MIN, API_CONCURRENCY_MAX,
+        API_LATENCY_TARGET_SECONDS, API_CIRCUIT_FAILURES, API_CIRCUIT_RESET_SECONDS,
+    )
+
+
+RETRY_STATUS_CODES = (429, 500, 502, 503, 504)
+
+
+class CircuitOpenError(Exception):
+    """Raised instead of calling the API while the circuit breaker is open."""
+
+
+def parse_retry_after(value: Optional[str]) -> Optional[float]:
+    """
+    Seconds to wait from a Retry-After header (delay-seconds or HTTP date).
+
+    Returns:
+        Seconds (>= 0), or None if the header is missing or unreadable
+    """
+    if not value:
+        return None
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    try:
+        retry_at = parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        return None
+    if retry_at.tzinfo is None:
+        retry_at = retry_at.replace(tzinfo=timezone.utc)
+    return max(0.0, (retry_at - datetime.now(timezone.utc)).total_seconds())
+
+
+def backoff_delay(attempt: int, base: float = API_RETRY_DELAY, cap: float = API_RETRY_MAX_DELAY) -> float:
+    """Full-jitter exponential backoff: uniform(0, min(cap, base * 2**attempt))."""
+    return random.uniform(0, min(cap, base * 2 ** attempt))
+
+
+class AdaptiveConcurrency:
+    """
+    AIMD limit on the number of requests in flight.
+
+    Example:
+        >>> limiter = AdaptiveConcurrency(initial=4)
+        >>> with limiter.slot():
+        ...     response = session.get(url)
+        >>> limiter.on_success(latency=1.2)
+    """
+
+    def __init__(
+        self,
+        initial: int = API_MAX_WORKERS,
+        min_limit: int = API_CONCURRENCY_MIN,
+        max_limit: int = API_CONCURRENCY_MAX,
+        latency_target: float = API_LATENCY_TARGET_SECONDS,
+        decrease_factor: float = 0.5,
+        cooldown: float = 2.0
+    ):
+        """
+        Args:
+            initial: Starting limit
+            min_limit: Never go below this many in flight
+            max_limit: Never go above this many in flight
+            latency_target: Successes slower than this count as congestion
+            decrease_factor: Multiply the limit by this on congestion
+            cooldown: Seconds between two decreases (one burst of 429s from
+                the same window only halves the limit once)
+        """
+        self.min_limit = min_limit
+        self.max_limit = max_limit
+        self.limit = float(min(max(initial, min_limit), max_limit))
+        self.latency_target = latency_target
+        self.decrease_factor = decrease_factor
+        self.cooldown = cooldown
+
+        self.in_flight = 0
+        self.increases = 0
+        self.decreases = 0
+        self._last_decrease = 0.0
+        self._cond = threading.Condition()
+
+    @contextmanager
+    def slot(self):
+        """Hold one of the `limit` in-flight slots for the duration of a request."""
+        with self._cond:
+            while self.in_flight >= int(self.limit):
+                self._cond.wait()
+            self.in_flight += 1
+        try:
+            yield
+        finally:
+            with self._cond:
+                self.in_flight -= 1
+                self._cond.notify_all()
+
+    def on_success(self, latency: float):
+        """Additive increase, unless the response was too slow."""
+        if latency > self.latency_target:
+            self.on_congestion()
+            return
+        with self._cond:
+            if self.limit < self.max_limit:
+                self.limit = min(self.max_limit, self.limit + 1 / self.limit)
+                self.increases += 1
+                self._cond.notify_all()
+
+    def on_congestion(self):
+        """Multiplicative decrease (at most once per cooldown)."""
+        with self._cond:
+            now = time.monotonic()
+            if now - self._last_decrease < self.cooldown:
+                return
+            self._last_decrease = now
+            self.limit = max(self.min_limit, self.limit * self.decrease_factor)
+            self.decreases += 1
+
+
+class CircuitBreaker:
+    """
+    Stops calls to an API that keeps failing.
+
+    closed -> (failure_threshold failures in a row) -> open
+    open -> (reset_timeout passed) -> half-open: ONE trial request
+    half-open -> success: closed / failure: open again
+    """
+
+    def __init__(
+        self,
+        failure_threshold: int = API_CIRCUIT_FAILURES,
+        reset_timeout: float = API_CIRCUIT_RESET_SECONDS
+    ):
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.state = "closed"
+        self.failures = 0
+        self.opened_at = 0.0
+        self.times_opened = 0
+        self._trial_running = False
+        self._lock = threading.Lock()
+
+    def before_request(self):
+        """Raise CircuitOpenError if the request must not be sent now."""
+        with self._lock:
+            if self.state == "closed":
+                return
+            if self.state == "open":
+                remaining = self.reset_timeout - (time.monotonic() - self.opened_at)
+                if remaining > 0:
+                    raise CircuitOpenError(f"API circuit open, retry in {remaining:.0f}s")
+                self.state = "half-open"
+            # half-open: let exactly one trial request through
+            if self._trial_running:
+                raise CircuitOpenError("API circuit half-open, trial request in progress")
+            self._trial_running = True
+
+    def record_success(self):
+        with self._lock:
+            self.state = "closed"
+            self.failures = 0
+            self._trial_running = False
+
+    def record_failure(self):
+        with self._lock:
+            self.failures += 1
+            if self.state == "half-open" or self.failures >= self.failure_threshold:
+                if self.state != "open":
+                    self.times_opened += 1
+                    print(f"🔌 API circuit opened after {self.failures} failures "
+                          f"(pausing {self.reset_timeout:.0f}s)")
+                self.state = "open"
+                self.opened_at = time.monotonic()
+            self._trial_running = False
+
+    def release_trial(self):
+        """Trial request ended without a verdict (e.g. a 429): allow another."""
+        with self._lock:
+            self._trial_running = False
+
+
+class ApiController:
+    """
+    Sends requests with adaptive concurrency, backoff and a circuit breaker.
+
+    Thread-safe; share ONE controller between all workers hitting the same
+    API so they see the same limit, pause and breaker.
+
+    Example:
+        >>> controller = ApiController()
+        >>> response = controller.send(lambda: session.get(url, params=params))
+    """
+
+    def __init__(
+        self,
+        concurrency: Optional[AdaptiveConcurrency] = None,
+        breaker: Optional[CircuitBreaker] = None,
+        max_attempts: int = API_RETRY_COUNT,
+        backoff_base: float = API_RETRY_DELAY,
+        backoff_cap: float = API_RETRY_MAX_DELAY,
+        retry_exceptions: Tuple[Type[BaseException], ...] = (ConnectionError, TimeoutError),
+        metrics=None,
+        source: str = "api"
+    ):
+        """
+        Args:
+            concurrency: In-flight limiter (default: a new AdaptiveConcurrency)
+            breaker: Circuit breaker (default: a new CircuitBreaker)
+            max_attempts: Tries per request, including the first
+            backoff_base: First backoff ceiling in seconds (doubles per attempt)
+            backoff_cap: Longest single backoff wait
+            retry_exceptions: Exceptions that mean "network trouble, try again"
+                (e.g. requests.ConnectionError, httpx.TransportError)
+            metrics: FetchMetrics to count retries in (optional)
+            source: Metrics label
+        """
+        self.concurrency = concurrency or AdaptiveConcurrency()
+        self.breaker = breaker or CircuitBreaker()
+        self.max_attempts = max_attempts
+        self.backoff_base = backoff_base
+        self.backoff_cap = backoff_cap
+        self.retry_exceptions = retry_exceptions
+        self.metrics = metrics
+        self.source = source
+
+        self._pause_until = 0.0
+        self._lock = threading.Lock()
+        self.retries = 0
+        self.throttled = 0
+
+    def _wait_for_pause(self):
+        """Sleep while a Retry-After from any worker is in effect."""
+        while True:
+            with self._lock:
+                remaining = self._pause_until - time.monotonic()
+            if remaining <= 0:
+                return
+            time.sleep(remaining)
+
+    def _pause(self, seconds: float):
+        with self._lock:
+            self._pause_until = max(self._pause_until, time.monotonic() + seconds)
+
+    def _retry_wait(self, attempt: int, reason: str, retry_after: Optional[float] = None):
+        if retry_after is not None:
+            delay = min(retry_after, self.backoff_cap)
+            self._pause(delay)
+        else:
+            delay = backoff_delay(attempt, self.backoff_base, self.backoff_cap)
+        with self._lock:
+            self.retries += 1
+        if self.metrics is not None:
+            self.metrics.inc("retries_total", source=self.source)
+        print(f"   ↻ {reason}, retrying in {delay:.1f}s "
+              f"(attempt {attempt + 2}/{self.max_attempts}, "
+              f"concurrency {int(self.concurrency.limit)})")
+        time.sleep(delay)
+
+    def send(self, request: Callable[[], object]):
+        """
+        Call request() until it succeeds, is not retryable, or attempts run out.
+
+        Args:
+            request: Makes ONE HTTP request and returns the response
+                (anything with status_code and headers)
+
+        Returns:
+            The last response (check its status code as usual). It gets a
+            `retry_count` attribute with the number of retries it took.
+
+        Raises:
+            CircuitOpenError: The API is failing, nothing was sent
+            The last network exception, if every attempt raised one
+        """
+        for attempt in range(self.max_attempts):
+            last_attempt = attempt == self.max_attempts - 1
+            self._wait_for_pause()
+            self.breaker.before_request()
+
+            started = time.monotonic()
+            try:
+                with self.concurrency.slot():
+                    response = request()
+            except self.retry_exceptions as e:
+                self.concurrency.on_congestion()
+                self.breaker.record_failure()
+                if last_attempt:
+                    raise
+                self._retry_wait(attempt, f"{type(e).__name__}")
+                continue
+            except Exception:
+                # Not retryable (e.g. ChunkedEncodingError), but still a
+                # failed request: it must end a half-open trial, or every
+                # later call would see "trial request in progress"
+                self.concurrency.on_congestion()
+                self.breaker.record_failure()
+                raise
+            except BaseException:
+                # Interrupted (Ctrl+C): says nothing about the API
+                self.breaker.release_trial()
+                raise
+            latency = time.monotonic() - started
+
+            status = response.status_code
+            if status == 429:
+                # Throttled: slow down, but the API is up (doesn't trip the breaker)
+                self.concurrency.on_congestion()
+                self.breaker.release_trial()
+                with self._lock:
+                    self.throttled += 1
+                if last_attempt:
+                    response.retry_count = attempt
+                    return response
+                retry_after = parse_retry_after(response.headers.get("Retry-After"))
+                self._retry_wait(attempt, "429 Too Many Requests", retry_after)
+                continue
+
+            if status in RETRY_STATUS_CODES:
+                self.concurrency.on_congestion()
+                self.breaker.record_failure()
+                if last_attempt:
+                    response.retry_count = attempt
+                    return response
+                retry_after = parse_retry_after(response.headers.get("Retry-After"))
+                self._retry_wait(attempt, f"HTTP {status}", retry_after)
+                continue
+
+            # Success, or a client error that retrying won't fix (400 etc.)
+            self.breaker.record_success()
+            self.concurrency.on_success(latency)
+            response.retry_count = attempt
+            return response
+
+    def stats(self) -> Dict:
+        """Current limit and what the controller did so far."""
+        return {
+            "concurrency_limit": round(self.concurrency.limit, 2),
+            "in_flight": self.concurrency.in_flight,
+            "increases": self.concurrency.increases,
+            "decreases": self.concurrency.decreases,
+            "retries": self.retries,
+            "throttled": self.throttled,
+            "circuit_state": self.breaker.state,
+            "circuit_opened": self.breaker.times_opened,
+        }
+
+
+class ControlledSession:
+    """
+    requests-style session whose requests go through an ApiController.
+
+    Replaces retry_requests.retry(): use as the innermost session, e.g.
+    BoundedCacheSession(ControlledSession(requests.Session(), controller), ...)
+    so cache hits never wait for a concurrency slot.
+    """
+
+    def __init__(self, session, controller: ApiController):
+        self.session = session
+        self.controller = controller
+
+    def request(self, method, url, params=None, **kwargs):
+        """Any request (requests.Session.request signature), through the controller."""
+        return self.controller.send(lambda: self.session.request(method, url, params=params, **kwargs))
+
+    def get(self, url, params=None, **kwargs):
+        return self.request("GET", url, params=params, **kwargs)
+
+    def post(self, url, **kwargs):
+        return self.request("POST", url, **kwargs)
+
+    def close(self):
+        self.session.close()
+
+
+class ControlledAdapter(HTTPAdapter):
+    """
+    requests transport adapter whose requests go through an ApiController.
+
+    For sessions that do their own caching and cannot wrap another session,
+    e.g. requests_cache.CachedSession: mounted on it, the adapter sits under
+    the cache, so only cache misses wait for a concurrency slot and feed
+    the AIMD limit.
+
+    Example:
+        >>> adapter = ControlledAdapter(controller)
+        >>> session.mount("https://", adapter)
+        >>> session.mount("http://", adapter)
+    """
+
+    def __init__(self, controller: ApiController, **kwargs):
+        super().__init__(**kwargs)
+        self.controller = controller
+
+    def send(self, request, **kwargs):
+        """Send one prepared request through the controller (retries re-send it)."""
+        return self.controller.send(lambda: super(ControlledAdapter, self).send(request, **kwargs))
@@ -0,0 +1,181 @@
+"""
+Arrow output for the fetch path.
+
+Builds Arrow record batches straight from the Open-Meteo FlatBuffer
+responses (the numpy views over the response buffer are wrapped, not
+copied) and writes them as Parquet or Arrow IPC partitions, skipping the
+pandas DataFrame and the CSV text round trip.
+
+Layout (hive-style, readable with pyarrow.dataset / pd.read_parquet):
+    <base_dir>/location_code=<code>/<start>_to_<end>.parquet
+
+scripts/process_to_parquet.py reads these partitions back (partition_files,
+read_partition) and adds them to the processed datasets, like the CSVs.
+"""
+
+import os
+from pathlib import Path
+from typing import Iterable, List, Optional
+
+import numpy as np
+import pyarrow as pa
+import pyarrow.ipc as ipc
+import pyarrow.parquet as pq
+
+try:
+    from .weather_schema import cast_column, column_type
+except ImportError:
+    from weather_schema import cast_column, column_type
+
+
+# Daily variables the API returns as int64 (unix seconds), not float32
+INT64_VARIABLES = ("sunrise", "sunset")
+
+OUTPUT_FORMATS = ("parquet", "arrow")
+
+# Output format -> file extension
+EXTENSIONS = {"parquet": "parquet", "arrow": "arrow"}
+
+
+def _values_array(variable, name: str) -> pa.Array:
+    """Wrap one variable's values as an Arrow array (zero-copy for float32)."""
+    if name in INT64_VARIABLES:
+        values = variable.ValuesInt64AsNumpy()
+        if isinstance(values, np.ndarray):
+            return pa.array(values, type=pa.timestamp("s", tz="UTC"))
+    else:
+        values = variable.ValuesAsNumpy()
+        if isinstance(values, np.ndarray):
+            # float32 measurements stay zero-copy; codes become int8 (weather_schema.py)
+            return cast_column(pa.array(values, type=pa.float32()), column_type(name))
+    # Variable missing from the response: all nulls
+    return None
+
+
+def section_to_record_batch(
+    section,
+    variables: List[str],
+    location_name: str
+) -> pa.RecordBatch:
+    """
+    Build a record batch from an hourly or daily response section.
+
+    Args:
+        section: response.Hourly() or response.Daily()
+        variables: Variable names, in the order they were requested
+        location_name: Human-readable name
+
+    Returns:
+        RecordBatch with date, location_name + one column per variable
+        (location_code comes from the partition directory, see write_partition)
+    """
+    timestamps = np.arange(section.Time(), section.TimeEnd(), section.Interval(), dtype=np.int64)
+    n_rows = len(timestamps)
+
+    # Location name is dictionary-encoded: one stored string, n_rows indices
+    indices = pa.array(np.zeros(n_rows, dtype=np.int32))
+    columns = [
+        pa.array(timestamps, type=pa.timestamp("s", tz="UTC")),
+        pa.DictionaryArray.from_arrays(indices, pa.array([location_name])),
+    ]
+    names = ["date", "location_name"]
+
+    for i, var in enumerate(variables):
+        array = _values_array(section.Variables(i), var)
+        if array is None:
+            array = pa.nulls(n_rows, type=pa.float32())
+        columns.append(array)
+        names.append(var)
+
+    return pa.RecordBatch.from_arrays(columns, names=names)
+
+
+def write_partition(
+    batches: Iterable[pa.RecordBatch],
+    base_dir: Path,
+    location_code: str,
+    start_date: str,
+    end_date: str,
+    output_format: str = "parquet"
+) -> Path:
+    """
+    Write record batches as one partition file for a location and date range.
+
+    The file is written under a temporary name and renamed into place, so
+    readers never see a half-written partition. Re-fetching the same range
+    replaces the file instead of appending duplicates.
+
+    Args:
+        batches: Record batches with the same schema
+        base_dir: Dataset root, e.g. data/raw/historical/parquet/hourly
+        location_code: Partition key
+        start_date: First day in the file, 'YYYY-MM-DD'
+        end_date: Last day in the file, 'YYYY-MM-DD'
+        output_format: 'parquet' or 'arrow' (Arrow IPC file)
+
+    Returns:
+        Path of the written file
+    """
+    if output_format not in OUTPUT_FORMATS:
+        raise ValueError(f"Unknown output format: {output_format} (use one of {OUTPUT_FORMATS})")
+
+    table = pa.Table.from_batches(list(batches))
+
+    partition_dir = Path(base_dir) / f"location_code={location_code}"
+    partition_dir.mkdir(parents=True, exist_ok=True)
+    file_path = partition_dir / f"{start_date}_to_{end_date}.{EXTENSIONS[output_format]}"
+    # Dot-prefixed temp name: dataset readers skip hidden files
+    tmp_path = partition_dir / f".{file_path.name}.tmp"
+
+    if output_format == "parquet":
+        pq.write_table(table, tmp_path, compression="snappy")
+    else:
+        with ipc.new_file(tmp_path, table.schema) as writer:
+            writer.write_table(table)
+
+    os.replace(tmp_path, file_path)
+    return file_path
+
+
+def partition_files(base_dir: Path, location_code: Optional[str] = None) -> List[Path]:
+    """
+    Partition files below a dataset root (Parquet and Arrow), sorted by path.
+
+    Hidden (dot-prefixed) temp files of a write in progress are skipped.
+    """
+    base_dir = Path(base_dir)
+    pattern = f"location_code={location_code}" if location_code else "location_code=*"
+    return sorted(
+        path
+        for extension in EXTENSIONS.values()
+        for path in base_dir.glob(f"{pattern}/*.{extension}")
+        if not path.name.startswith(".")
+    )
+
+
+def read_partition(path: Path, columns: Optional[List[str]] = None) -> pa.Table:
+    """
+    Read one partition file back, with location_code taken from its directory.
+
+    Args:
+        path: Parquet or Arrow partition file
+        columns: Only read these columns (None = all)
+
+    Returns:
+        Table with date, location_code, location_name + the variables
+    """
+    path = Path(path)
+    if path.suffix == f".{EXTENSIONS['arrow']}":
+        # Memory-mapped: selecting columns does not read the others
+        with ipc.open_file(pa.memory_map(str(path))) as reader:
+            table = reader.read_all()
+        if columns is not None:
+            table = table.select(columns)
+    else:
+        table = pq.read_table(path, columns=columns)
+
+    location_code = path.parent.name.split("=", 1)[1]
+    indices = pa.array(np.zeros(table.num_rows, dtype=np.int32))
+    column = pa.DictionaryArray.from_arrays(indices, pa.array([location_code]))
+    position = table.column_names.index("date") + 1 if "date" in table.column_names else 0
+    return table.add_column(position, "location_code", column)
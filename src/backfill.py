@@ -0,0 +1,261 @@
+"""
+Gap-aware backfill planning for historical weather data.
+
+Works out which days each location is still missing (from the raw CSVs or
+the processed Parquet), splits the gaps into request-sized chunks and keeps
+a checkpoint so an interrupted backfill resumes where it stopped.
+"""
+
+import json
+import os
+import threading
+from datetime import date, datetime, timedelta
+from pathlib import Path
+from typing import Dict, List, Optional, Set, Tuple
+
+import pandas as pd
+
+try:
+    from .config import LOCATIONS, RAW_HISTORICAL_DIR, PROCESSED_DAILY_DATASET
+    from .arrow_writer import OUTPUT_FORMATS, partition_files, read_partition
+    from .partitioned_store import PartitionedStore
+except ImportError:
+    from config import LOCATIONS, RAW_HISTORICAL_DIR, PROCESSED_DAILY_DATASET
+    from arrow_writer import OUTPUT_FORMATS, partition_files, read_partition
+    from partitioned_store import PartitionedStore
+
+
+# The archive API lags real time by a few days (ERA5 reanalysis delay)
+ARCHIVE_DELAY_DAYS = 5
+
+# Days per request chunk (keeps each request's weight under the minute limit)
+DEFAULT_CHUNK_DAYS = 92
+
+CHECKPOINT_PATH = RAW_HISTORICAL_DIR / "backfill_checkpoint.json"
+
+
+# ============================================================================
+# COVERAGE
+# ============================================================================
+
+def _to_local_dates(dates: pd.Series, location_code: str) -> Set[date]:
+    """
+    Convert stored UTC timestamps back to local calendar days.
+
+    Daily rows are stamped with local midnight in UTC (e.g. 22:00 the day
+    before for Africa/Johannesburg), so we convert before taking the date.
+    """
+    timezone = LOCATIONS[location_code]["timezone"]
+    dates = pd.to_datetime(dates, utc=True).dt.tz_convert(timezone)
+    return set(dates.dt.date)
+
+
+def read_coverage(source: str = "csv") -> Dict[str, Set[date]]:
+    """
+    Find which days each location already has.
+
+    Only the date column is read. Daily data is used because every fetch
+    writes hourly and daily rows for the same days.
+
+    Args:
+        source: 'csv' (data/raw/historical/daily), 'parquet' (data/processed/daily/all_locations_daily)
+            or 'partitions' (data/raw/historical/{parquet,arrow}/daily, see arrow_writer)
+
+    Returns:
+        Dict of location_code -> set of dates already stored
+    """
+    coverage = {code: set() for code in LOCATIONS}
+
+    if source == "csv":
+        for location_code in LOCATIONS:
+            csv_file = RAW_HISTORICAL_DIR / "daily" / f"{location_code}_daily.csv"
+            if not csv_file.exists():
+                continue
+            dates = pd.read_csv(csv_file, usecols=["date"])["date"]
+            coverage[location_code] = _to_local_dates(dates, location_code)
+
+    elif source == "parquet":
+        store = PartitionedStore(PROCESSED_DAILY_DATASET)
+        if not store.is_empty():
+            df = store.read(columns=["date", "location_code"])
+            for location_code, group in df.groupby("location_code", observed=True):
+                if location_code in coverage:
+                    coverage[location_code] = _to_local_dates(group["date"], location_code)
+
+    elif source == "partitions":
+        for location_code in LOCATIONS:
+            files = [
+                path
+                for output_format in OUTPUT_FORMATS
+                for path in partition_files(RAW_HISTORICAL_DIR / output_format / "daily", location_code)
+            ]
+            for path in files:
+                dates = read_partition(path, columns=["date"]).column("date").to_pandas()
+                coverage[location_code] |= _to_local_dates(dates, location_code)
+
+    else:
+        raise ValueError(f"Unknown coverage source: {source} (use 'csv', 'parquet' or 'partitions')")
+
+    return coverage
+
+
+# ============================================================================
+# PLANNING
+# ============================================================================
+
+def find_gaps(covered: Set[date], start: date, end: date) -> List[Tuple[date, date]]:
+    """
+    List the contiguous date ranges in [start, end] that are not covered.
+
+    Example:
+        >>> find_gaps({date(2024, 1, 2)}, date(2024, 1, 1), date(2024, 1, 4))
+        [(datetime.date(2024, 1, 1), datetime.date(2024, 1, 1)),
+         (datetime.date(2024, 1, 3), datetime.date(2024, 1, 4))]
+    """
+    gaps = []
+    gap_start = None
+    day = start
+    while day <= end:
+        if day not in covered:
+            if gap_start is None:
+                gap_start = day
+        elif gap_start is not None:
+            gaps.append((gap_start, day - timedelta(days=1)))
+            gap_start = None
+        day += timedelta(days=1)
+
+    if gap_start is not None:
+        gaps.append((gap_start, end))
+    return gaps
+
+
+def split_range(start: date, end: date, chunk_days: int) -> List[Tuple[date, date]]:
+    """Split [start, end] into consecutive chunks of at most chunk_days days."""
+    chunks = []
+    while start <= end:
+        chunk_end = min(start + timedelta(days=chunk_days - 1), end)
+        chunks.append((start, chunk_end))
+        start = chunk_end + timedelta(days=1)
+    return chunks
+
+
+def plan_backfill(
+    start_date: str,
+    end_date: Optional[str] = None,
+    source: str = "csv",
+    chunk_days: int = DEFAULT_CHUNK_DAYS,
+    group_size: int = 1,
+    location_codes: Optional[List[str]] = None
+) -> List[Dict]:
+    """
+    Build the list of requests needed to fill every gap.
+
+    Locations missing exactly the same chunk (the usual case for nightly
+    top-ups) are packed together, up to group_size per request.
+
+    Args:
+        start_date: First day wanted, 'YYYY-MM-DD'
+        end_date: Last day wanted (default: today minus ARCHIVE_DELAY_DAYS)
+        source: Where to read existing coverage from ('csv', 'parquet' or 'partitions')
+        chunk_days: Maximum days per request
+        group_size: Maximum locations per request
+        location_codes: Locations to plan for (default: all LOCATIONS)
+
+    Returns:
+        List of tasks: {'id', 'start_date', 'end_date', 'locations'}
+    """
+    start = datetime.strptime(start_date, "%Y-%m-%d").date()
+    if end_date is None:
+        end = date.today() - timedelta(days=ARCHIVE_DELAY_DAYS)
+    else:
+        end = datetime.strptime(end_date, "%Y-%m-%d").date()
+
+    if location_codes is None:
+        location_codes = list(LOCATIONS.keys())
+
+    coverage = read_coverage(source)
+
+    # (chunk_start, chunk_end) -> locations missing that chunk
+    chunks: Dict[Tuple[date, date], List[str]] = {}
+    for location_code in location_codes:
+        for gap_start, gap_end in find_gaps(coverage[location_code], start, end):
+            for chunk in split_range(gap_start, gap_end, chunk_days):
+                chunks.setdefault(chunk, []).append(location_code)
+
+    tasks = []
+    for (chunk_start, chunk_end), codes in sorted(chunks.items()):
+        for i in range(0, len(codes), group_size):
+            group = codes[i:i + group_size]
+            tasks.append({
+                "id": f"{chunk_start}_{chunk_end}_{'+'.join(group)}",
+                "start_date": chunk_start.isoformat(),
+                "end_date": chunk_end.isoformat(),
+                "locations": group,
+            })
+    return tasks
+
+
+# ============================================================================
+# CHECKPOINT
+# ============================================================================
+
+class BackfillCheckpoint:
+    """
+    Remembers a backfill plan and which of its tasks are finished.
+
+    Saved after every completed task (atomically), so a killed run picks up
+    the remaining tasks instead of planning and fetching again.
+    Safe to update from several worker threads.
+    """
+
+    def __init__(self, path: Path = CHECKPOINT_PATH):
+        self.path = Path(path)
+        self.target = None
+        self.tasks: List[Dict] = []
+        self.done: Set[str] = set()
+        self._lock = threading.Lock()
+
+        if self.path.exists():
+            with open(self.path, "r", encoding="utf-8") as f:
+                state = json.load(f)
+            self.target = state["target"]
+            self.tasks = state["tasks"]
+            self.done = set(state["done"])
+
+    def matches(self, start_date: str, end_date: Optional[str]) -> bool:
+        """True if the saved plan was made for the same date range."""
+        return self.target == {"start_date": start_date, "end_date": end_date}
+
+    def start(self, start_date: str, end_date: Optional[str], tasks: List[Dict]):
+        """Replace the saved plan with a new one."""
+        with self._lock:
+            self.target = {"start_date": start_date, "end_date": end_date}
+            self.tasks = tasks
+            self.done = set()
+            self._save()
+
+    def pending(self) -> List[Dict]:
+        """Tasks not finished yet."""
+        return [task for task in self.tasks if task["id"] not in self.done]
+
+    def mark_done(self, task_id: str):
+        with self._lock:
+            self.done.add(task_id)
+            self._save()
+
+    def clear(self):
+        """Remove the checkpoint file (call when the whole plan is done)."""
+        if self.path.exists():
+            self.path.unlink()
+
+    def _save(self):
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = self.path.with_suffix(".tmp")
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump({
+                "target": self.target,
+                "tasks": self.tasks,
+                "done": sorted(self.done),
+                "updated": datetime.now().isoformat(timespec="seconds"),
+            }, f, indent=2)
+        os.replace(tmp_path, self.path)
@@ -168,10 +168,278 @@ LOCATIONS = {
 # OPEN-METEO API SETTINGS
 # ==============================================================================
 
-API_BASE_URL = "https://api.open-meteo.com/v1/forecast"
+# Endpoints can be pointed elsewhere, e.g. at the offline mock server
+# (src/mock_server.py) for load tests: OPEN_METEO_FORECAST_URL=http://127.0.0.1:8765/v1/forecast
+API_BASE_URL = os.environ.get("OPEN_METEO_FORECAST_URL", "https://api.open-meteo.com/v1/forecast")
+ARCHIVE_API_URL = os.environ.get("OPEN_METEO_ARCHIVE_URL", "https://archive-api.open-meteo.com/v1/archive")
+# Per-model metadata (latest run time); the mock serves it too:
+# OPEN_METEO_META_URL=http://127.0.0.1:8765/data/{model}/static/meta.json
+MODEL_META_URL = os.environ.get(
+    "OPEN_METEO_META_URL", "https://api.open-meteo.com/data/{model}/static/meta.json"
+)
 API_TIMEOUT = 30  # seconds
 API_RETRY_COUNT = 3
-API_RETRY_DELAY = 5  # seconds
+API_RETRY_DELAY = 5  # seconds (base of the jittered exponential backoff)
+API_RETRY_MAX_DELAY = 60  # seconds, cap for one backoff wait
+
+# Connection pooling for OpenMeteoClient (connections are kept alive and reused)
+API_POOL_SIZE = 10
+API_HTTP2 = False  # Needs: pip install httpx[http2]
+
+# Free tier rate limits (shared by ALL scripts hitting Open-Meteo)
+# Requests with >10 variables or >2 weeks of data count as several calls,
+# see rate_limiter.estimate_call_weight()
+API_RATE_LIMITS = {
+    "minute": 600,
+    "hour": 5000,
+    "day": 10000,
+}
+
+# How many requests to run at the same time (the rate limiter does the pacing).
+# The number in flight adapts (see api_controller.py): it starts at
+# API_MAX_WORKERS, grows by ~1 per round of fast successes and halves on
+# 429s, 5xx errors or responses slower than API_LATENCY_TARGET_SECONDS.
+API_MAX_WORKERS = 4
+API_CONCURRENCY_MIN = 1
+API_CONCURRENCY_MAX = 12
+API_LATENCY_TARGET_SECONDS = 20
+
+# Circuit breaker: after this many failed requests in a row (5xx / network
+# errors) stop calling the API for a while instead of retrying
+API_CIRCUIT_FAILURES = 5
+API_CIRCUIT_RESET_SECONDS = 60
+
+# How many locations to pack into ONE request (comma-separated coordinates).
+# Each location still counts towards the rate limit, but we save round trips.
+API_LOCATIONS_PER_REQUEST = 5
+
+# In-memory response cache inside OpenMeteoClient (per process).
+# TTL per data type in seconds; None = keep until evicted (LRU)
+RESPONSE_CACHE_MAX_ENTRIES = 256
+RESPONSE_CACHE_TTL_SECONDS = {
+    "historical": 24 * 3600,  # Last few archive days can still be revised
+    "forecast": 15 * 60,
+    "current": 60,
+}
+
+# Response cache for historical fetches (LRU-evicted, zlib-compressed SQLite)
+HTTP_CACHE_DIR = PROJECT_ROOT / ".cache"
+HISTORICAL_CACHE_MAX_MB = 2048
+
+# Forecast refreshes: models are re-run every few hours, so we only fetch
+# when a new run is out (see model_runs.py)
+FORECAST_MODELS = ["ecmwf_ifs025", "ncep_gfs025"]  # Main models behind best_match for SA
+FORECAST_RUN_CYCLE_HOURS = 6   # 00/06/12/18 UTC runs
+FORECAST_RUN_DELAY_HOURS = 5   # Roughly how long a run takes to reach the API
+FORECAST_DAYS = 16
+FORECAST_PAST_DAYS = 92        # History included on a first (full) fetch
+
+# Current-conditions poller (scripts/poll_current.py)
+CURRENT_POLL_INTERVAL_SECONDS = 300  # Open-Meteo updates current conditions every 15 min
+CURRENT_POLL_JITTER_SECONDS = 20     # Spread requests randomly over the start of each tick
+
+
+# ==============================================================================
+# VARIABLE PROFILES
+# ==============================================================================
+#
+# WHY PROFILES?
+# -------------
+# The full variable lists are huge (150+ hourly forecast variables, most of
+# them upper-air pressure levels), but notebooks 02/03 keep only a small
+# ground-level subset. Every extra variable costs API quota, bandwidth,
+# parse time and disk. A profile names the set of variables a run needs:
+#
+# - tourism-core:    what the analysis actually uses (notebooks 02/03 selection)
+# - full-archive:    every variable the Archive API offers (historical backfills)
+# - full-forecast:   every variable the Forecast API offers
+# - pressure-levels: upper-air fields only (19 levels x 6 fields)
+#
+# The Archive and Forecast APIs offer different variables, so each profile
+# lists them per API. Use get_variable_profile(name, api) to look one up.
+#
+
+# Ground-level weather (what tourists feel) - notebook 02 selection
+_TOURISM_HOURLY = [
+    "temperature_2m", "relative_humidity_2m", "dew_point_2m", "apparent_temperature",
+    "precipitation", "rain", "weather_code", "wind_speed_10m", "wind_direction_10m",
+    "wind_gusts_10m", "pressure_msl", "surface_pressure", "cloud_cover",
+    "cloud_cover_low", "cloud_cover_mid", "cloud_cover_high", "vapour_pressure_deficit",
+    "et0_fao_evapotranspiration",
+]
+
+# Essential daily summaries - notebook 03 selection
+_TOURISM_DAILY = [
+    "weather_code", "temperature_2m_max", "temperature_2m_min", "temperature_2m_mean",
+    "apparent_temperature_max", "apparent_temperature_min", "apparent_temperature_mean",
+    "precipitation_sum", "rain_sum", "precipitation_hours", "wind_speed_10m_max",
+    "wind_gusts_10m_max", "wind_direction_10m_dominant", "sunshine_duration",
+    "daylight_duration", "sunrise", "sunset", "cloud_cover_mean",
+    "relative_humidity_2m_mean", "pressure_msl_mean", "shortwave_radiation_sum",
+]
+
+PRESSURE_LEVELS = [1000, 975, 950, 925, 900, 850, 800, 700, 600, 500, 400, 300, 250, 200, 150, 100, 70, 50, 30]
+PRESSURE_FIELDS = [
+    "temperature", "relative_humidity", "cloud_cover",
+    "wind_speed", "wind_direction", "geopotential_height",
+]
+_PRESSURE_LEVEL_HOURLY = [
+    f"{field}_{level}hPa" for field in PRESSURE_FIELDS for level in PRESSURE_LEVELS
+]
+
+CURRENT_VARIABLES = [
+    "temperature_2m", "relative_humidity_2m", "apparent_temperature", "is_day",
+    "precipitation", "rain", "showers", "snowfall", "weather_code",
+    "cloud_cover", "pressure_msl", "surface_pressure", "wind_speed_10m",
+    "wind_direction_10m", "wind_gusts_10m"
+]
+
+VARIABLE_PROFILES = {
+    "tourism-core": {
+        "archive": {
+            "hourly": _TOURISM_HOURLY + ["sunshine_duration", "shortwave_radiation"],
+            "daily": _TOURISM_DAILY,
+        },
+        "forecast": {
+            "current": CURRENT_VARIABLES,
+            "hourly": _TOURISM_HOURLY + [
+                "visibility", "evapotranspiration", "precipitation_probability",
+            ],
+            "daily": _TOURISM_DAILY + [
+                "uv_index_max", "uv_index_clear_sky_max", "visibility_mean",
+                "precipitation_probability_max", "cape_max",
+            ],
+        },
+    },
+    "full-archive": {
+        "archive": {
+            "hourly": [
+                "temperature_2m", "relative_humidity_2m", "dew_point_2m",
+                "apparent_temperature", "precipitation", "rain", "snowfall",
+                "snow_depth", "weather_code", "pressure_msl", "surface_pressure",
+                "cloud_cover", "cloud_cover_low", "cloud_cover_mid", "cloud_cover_high",
+                "et0_fao_evapotranspiration", "vapour_pressure_deficit", "wind_gusts_10m",
+                "wind_direction_100m", "wind_direction_10m", "wind_speed_100m", "wind_speed_10m",
+                "soil_temperature_0_to_7cm", "soil_temperature_7_to_28cm",
+                "soil_temperature_28_to_100cm", "soil_temperature_100_to_255cm",
+                "soil_moisture_0_to_7cm", "soil_moisture_7_to_28cm",
+                "soil_moisture_28_to_100cm", "soil_moisture_100_to_255cm",
+                "sunshine_duration", "shortwave_radiation"
+            ],
+            "daily": [
+                "weather_code", "temperature_2m_mean", "temperature_2m_max", "temperature_2m_min",
+                "apparent_temperature_mean", "apparent_temperature_max", "apparent_temperature_min",
+                "sunshine_duration", "daylight_duration", "sunset", "sunrise",
+                "precipitation_sum", "rain_sum", "snowfall_sum", "precipitation_hours",
+                "et0_fao_evapotranspiration", "shortwave_radiation_sum",
+                "wind_direction_10m_dominant", "wind_gusts_10m_max", "wind_speed_10m_max",
+                "cloud_cover_mean", "cloud_cover_max", "cloud_cover_min",
+                "dew_point_2m_mean", "dew_point_2m_max", "dew_point_2m_min",
+                "pressure_msl_min", "pressure_msl_max", "pressure_msl_mean",
+                "snowfall_water_equivalent_sum",
+                "relative_humidity_2m_min", "relative_humidity_2m_max", "et0_fao_evapotranspiration_sum",
+                "relative_humidity_2m_mean", "surface_pressure_mean", "surface_pressure_max", "surface_pressure_min",
+                "winddirection_10m_dominant", "wind_gusts_10m_mean", "wind_speed_10m_mean",
+                "wind_gusts_10m_min", "wind_speed_10m_min",
+                "wet_bulb_temperature_2m_mean", "wet_bulb_temperature_2m_max", "wet_bulb_temperature_2m_min",
+                "vapour_pressure_deficit_max",
+                "soil_moisture_0_to_100cm_mean", "soil_moisture_0_to_7cm_mean",
+                "soil_moisture_28_to_100cm_mean", "soil_moisture_7_to_28cm_mean",
+                "soil_temperature_0_to_100cm_mean", "soil_temperature_0_to_7cm_mean",
+                "soil_temperature_28_to_100cm_mean", "soil_temperature_7_to_28cm_mean"
+            ],
+        },
+    },
+    "full-forecast": {
+        "forecast": {
+            "current": CURRENT_VARIABLES,
+            "hourly": [
+                "temperature_2m", "relative_humidity_2m", "dew_point_2m", "apparent_temperature",
+                "precipitation_probability", "precipitation", "rain", "showers", "snowfall",
+                "snow_depth", "weather_code", "pressure_msl", "surface_pressure", "cloud_cover",
+                "cloud_cover_low", "cloud_cover_mid", "cloud_cover_high", "visibility",
+                "evapotranspiration", "et0_fao_evapotranspiration", "vapour_pressure_deficit",
+                "wind_speed_10m", "wind_speed_80m", "wind_speed_120m", "wind_speed_180m",
+                "wind_direction_10m", "wind_direction_80m", "wind_direction_120m", "wind_direction_180m",
+                "wind_gusts_10m", "temperature_80m", "temperature_120m", "temperature_180m",
+                "soil_moisture_0_to_1cm", "soil_moisture_1_to_3cm", "soil_moisture_3_to_9cm",
+                "soil_moisture_9_to_27cm", "soil_moisture_27_to_81cm",
+                "soil_temperature_0cm", "soil_temperature_6cm", "soil_temperature_18cm", "soil_temperature_54cm",
+            ] + _PRESSURE_LEVEL_HOURLY,
+            "daily": [
+                "weather_code", "temperature_2m_max", "temperature_2m_min", "apparent_temperature_max",
+                "apparent_temperature_min", "sunrise", "sunset", "daylight_duration", "sunshine_duration",
+                "uv_index_max", "uv_index_clear_sky_max", "rain_sum", "showers_sum", "snowfall_sum",
+                "precipitation_sum", "precipitation_hours", "precipitation_probability_max",
+                "wind_speed_10m_max", "wind_gusts_10m_max", "wind_direction_10m_dominant",
+                "shortwave_radiation_sum", "et0_fao_evapotranspiration", "temperature_2m_mean",
+                "apparent_temperature_mean", "cape_mean", "cape_max", "cape_min", "cloud_cover_mean",
+                "cloud_cover_max", "cloud_cover_min", "dew_point_2m_mean", "dew_point_2m_max",
+                "dew_point_2m_min", "pressure_msl_min", "pressure_msl_max", "pressure_msl_mean",
+                "snowfall_water_equivalent_sum", "relative_humidity_2m_min", "relative_humidity_2m_max",
+                "relative_humidity_2m_mean", "precipitation_probability_min", "precipitation_probability_mean",
+                "leaf_wetness_probability_mean", "growing_degree_days_base_0_limit_50",
+                "et0_fao_evapotranspiration_sum", "surface_pressure_mean", "surface_pressure_max",
+                "surface_pressure_min", "updraft_max", "visibility_mean", "visibility_min", "visibility_max",
+                "winddirection_10m_dominant", "wind_gusts_10m_mean", "wind_speed_10m_mean",
+                "wind_gusts_10m_min", "wind_speed_10m_min", "wet_bulb_temperature_2m_mean",
+                "wet_bulb_temperature_2m_max", "wet_bulb_temperature_2m_min", "vapour_pressure_deficit_max"
+            ],
+        },
+    },
+    "pressure-levels": {
+        "forecast": {
+            "current": [],
+            "hourly": _PRESSURE_LEVEL_HOURLY,
+            "daily": [],
+        },
+    },
+}
+
+# Profiles used when a script/client is not told otherwise.
+# Switch these to "tourism-core" to make routine runs download only what
+# the analysis reads (existing CSVs keep their columns, new ones are NaN).
+HISTORICAL_PROFILE = "full-archive"
+FORECAST_PROFILE = "full-forecast"
+CLIENT_PROFILE = "tourism-core"
+
+
+def get_variable_profile(name: str, api: str = "forecast") -> dict:
+    """
+    Look up a variable profile for one API.
+
+    Args:
+        name: Profile name, e.g. 'tourism-core'
+        api: 'archive' or 'forecast'
+
+    Returns:
+        Dict with 'hourly', 'daily' (and 'current' for forecast) variable lists
+    """
+    if name not in VARIABLE_PROFILES:
+        raise ValueError(f"Unknown variable profile: {name} (choose from {list(VARIABLE_PROFILES)})")
+    if api not in VARIABLE_PROFILES[name]:
+        raise ValueError(f"Profile '{name}' has no variables for the {api} API")
+
+    profile = VARIABLE_PROFILES[name][api]
+    return {
+        "current": list(profile.get("current", [])),
+        "hourly": list(profile.get("hourly", [])),
+        "daily": list(profile.get("daily", [])),
+    }
+
+
+def profile_names(api: str = "forecast") -> list:
+    """Names of the profiles with variables for one API ('archive' or 'forecast'), sorted."""
+    return sorted(name for name, profile in VARIABLE_PROFILES.items() if api in profile)
+
+
+# Defaults for OpenMeteoClient (src/api_client.py)
+HOURLY_VARIABLES = get_variable_profile(CLIENT_PROFILE, "forecast")["hourly"]
+DAILY_VARIABLES = get_variable_profile(CLIENT_PROFILE, "forecast")["daily"]
+TEMPERATURE_UNIT = "celsius"
+WIND_SPEED_UNIT = "kmh"
+PRECIPITATION_UNIT = "mm"
+TIMEZONE = "Africa/Johannesburg"
 
 
 # ==============================================================================
@@ -184,12 +452,62 @@ RAW_HISTORICAL_DIR = RAW_DATA_DIR / "historical"
 RAW_FORECAST_DIR = RAW_DATA_DIR / "forecast"
 RAW_CURRENT_DIR = RAW_DATA_DIR / "current"
 
+# Fetch metrics (JSON summary + Prometheus textfile per run, see metrics.py)
+METRICS_DIR = PROJECT_ROOT / "data" / "metrics"
+
+# Fetch benchmark results (scripts/benchmark_fetch.py, against the mock server)
+BENCHMARK_DIR = PROJECT_ROOT / "data" / "benchmarks"
+
+# Raw response archive (compressed NDJSON segments + offset index, see raw_archive.py)
+RAW_ARCHIVE_DIR = RAW_DATA_DIR / "archive"
+RAW_ARCHIVE_CODEC = "zstd"       # 'zstd' (needs: pip install zstandard) or 'gzip'
+RAW_ARCHIVE_SEGMENT_MB = 256     # Start a new segment file after this many MB
+
 # Processed data (Parquet files)
 PROCESSED_DATA_DIR = PROJECT_ROOT / "data" / "processed"
 PROCESSED_HOURLY_DIR = PROCESSED_DATA_DIR / "hourly"
 PROCESSED_DAILY_DIR = PROCESSED_DATA_DIR / "daily"
 PROCESSED_CURRENT_DIR = PROCESSED_DATA_DIR / "current"
 
+# Partitioned datasets written by process_to_parquet.py (see partitioned_store.py):
+# <dataset>/location_code=<code>/year=<yyyy>/part-*.parquet
+PROCESSED_HOURLY_DATASET = PROCESSED_HOURLY_DIR / "all_locations_hourly"
+PROCESSED_DAILY_DATASET = PROCESSED_DAILY_DIR / "all_locations_daily"
+PROCESSED_PARTITION_BY = "year"  # 'year' or 'month' (year=<yyyy>/month=<mm>)
+
+# CSV reading for process_to_parquet.py (see csv_ingest.py): files are read
+# in parallel by pyarrow's multithreaded CSV reader, with the column types
+# from weather_schema.py and one fixed timestamp format (pandas writes
+# tz-aware dates as "2024-01-01 00:00:00+00:00")
+INGEST_WORKERS = os.cpu_count() or 1
+CSV_TIMESTAMP_FORMAT = "%Y-%m-%d %H:%M:%S%z"
+
+# Memory budget for merging rows into existing partitions (see stream_merge.py):
+# the old files and the new rows are streamed through in sorted chunks sized
+# to fit, instead of concatenating and sorting everything in memory
+PROCESSING_MEMORY_MB = 512
+
+# Parquet layout of the processed datasets (see parquet_layout.py).
+# Rows are sorted by (location_code, date) and cut into one row group per
+# calendar month (hourly), so the min/max statistics (and page indexes) let
+# a query for one city or one season skip everything else.
+PARQUET_COMPRESSION = "zstd"          # 'zstd', 'snappy', 'gzip', 'lz4', 'brotli' or 'none'
+PARQUET_COMPRESSION_LEVEL = 3         # zstd: 1 (fastest) .. 22 (smallest); None = codec default
+# Row group span per dataset: 'month', 'year' or None (size limit only).
+# A month of daily rows is ~31 rows, so monthly row groups would make the
+# footer a third of a daily file; daily data gets one row group per year.
+PARQUET_ROW_GROUP_SPANS = {
+    "hourly": "month",
+    "daily": "year",
+}
+PARQUET_ROW_GROUP_MAX_ROWS = 128 * 1024
+PARQUET_PAGE_INDEX = True
+
+# Small-file compaction (scripts/compact_parquet.py): incremental runs add a
+# file per partition each time; a partition is merged once its data fits in
+# fewer files of this size
+COMPACTION_TARGET_MB = 128
+
 # Database
 DATABASE_DIR = PROJECT_ROOT / "data" / "database"
 DATABASE_PATH = DATABASE_DIR / "weather.db"
@@ -197,9 +515,19 @@ DATABASE_PATH = DATABASE_DIR / "weather.db"
 # Exports (for Power BI, etc.)
 EXPORTS_DIR = PROJECT_ROOT / "data" / "exports"
 
+# Embedded analytics (see analytics.py): DuckDB views with the bronze/silver/gold
+# tables of sql/*.sql, computed on the processed Parquet datasets in-process
+ANALYTICS_DATABASE_PATH = DATABASE_DIR / "weather.duckdb"  # query_weather.py --persist
+ANALYTICS_THREADS = None        # Threads per query; None = all cores
+ANALYTICS_MEMORY_LIMIT = None   # e.g. '2GB'; None = DuckDB default (80% of RAM)
+GOLD_EXPORT_DIR = EXPORTS_DIR / "gold"
+
 # Sample data
 SAMPLE_DATA_DIR = PROJECT_ROOT / "data" / "sample"
 
+# Shared API call ledger (every script/process records its calls here)
+RATE_LIMIT_LEDGER_PATH = PROJECT_ROOT / "data" / "rate_limit_ledger.json"
+
 
 # ==============================================================================
 # WMO WEATHER CODES (for interpretation)
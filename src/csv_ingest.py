@@ -0,0 +1,146 @@
+"""
+Parallel, typed CSV reading for the raw CSV -> Parquet step.
+
+pd.read_csv parses on one core and guesses every column's type; the dates
+then go through pd.to_datetime as strings. Here:
+- files are read concurrently (INGEST_WORKERS threads), and each file by
+  pyarrow's multithreaded CSV reader, which releases the GIL, so a rebuild
+  keeps every core busy
+- column types come from weather_schema.py, nothing is inferred, and
+  the frames come back in the compact registry dtypes (float32, int8
+  codes, categorical locations)
+- timestamps are parsed with one fixed format (CSV_TIMESTAMP_FORMAT)
+
+Files the fixed format does not fit (e.g. hand-made CSVs with plain dates)
+fall back to pandas with the same column types.
+
+Example:
+    >>> for csv_file, df, error in read_csv_files(csv_files):
+    ...     if error is None:
+    ...         frames.append(df)
+"""
+
+import csv
+import io
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import Iterable, Iterator, List, Optional, Tuple, Union
+
+import pandas as pd
+import pyarrow as pa
+import pyarrow.csv as pv
+
+try:
+    from .config import INGEST_WORKERS, CSV_TIMESTAMP_FORMAT
+    from .weather_schema import TIMESTAMP_COLUMNS, conform_frame, conform_table, csv_column_types, to_pandas
+except ImportError:
+    from config import INGEST_WORKERS, CSV_TIMESTAMP_FORMAT
+    from weather_schema import TIMESTAMP_COLUMNS, conform_frame, conform_table, csv_column_types, to_pandas
+
+
+# Bytes pyarrow parses per block (blocks are what its threads share out)
+BLOCK_SIZE = 4 * 1024 * 1024
+
+
+def _header(first_line: bytes) -> List[str]:
+    """Column names from a CSV header line."""
+    line = first_line.decode("utf-8-sig").rstrip("\r\n")
+    return next(csv.reader([line]))
+
+
+def read_csv_table(source: Union[Path, bytes]) -> pa.Table:
+    """
+    Read one CSV (a file, or its bytes) into an Arrow table with the registry types.
+
+    Raises:
+        pa.ArrowInvalid: If a value does not fit its column type / the timestamp format
+    """
+    if isinstance(source, (bytes, bytearray)):
+        header = _header(source.split(b"\n", 1)[0])
+        input_file = pa.BufferReader(source)
+    else:
+        with open(source, "rb") as f:
+            header = _header(f.readline())
+        input_file = str(source)
+
+    table = pv.read_csv(
+        input_file,
+        read_options=pv.ReadOptions(use_threads=True, block_size=BLOCK_SIZE),
+        convert_options=pv.ConvertOptions(
+            column_types=csv_column_types(header),
+            timestamp_parsers=[CSV_TIMESTAMP_FORMAT],
+        ),
+    )
+    return conform_table(table)
+
+
+def _read_with_pandas(source: Union[Path, bytes]) -> pd.DataFrame:
+    """Slow path: pandas, with the registry types and any ISO 8601 dates."""
+    if isinstance(source, (bytes, bytearray)):
+        header = _header(source.split(b"\n", 1)[0])
+        source = io.BytesIO(source)
+    else:
+        with open(source, "rb") as f:
+            header = _header(f.readline())
+
+    types = csv_column_types(header)
+    dtypes = {
+        name: type_.to_pandas_dtype()
+        for name, type_ in types.items()
+        if name not in TIMESTAMP_COLUMNS and not pa.types.is_string(type_)
+    }
+    df = pd.read_csv(source, dtype=dtypes)
+    for name in TIMESTAMP_COLUMNS:
+        if name in df.columns:
+            df[name] = pd.to_datetime(df[name], format="ISO8601", utc=True)
+    return conform_frame(df)
+
+
+def read_csv_frame(source: Union[Path, bytes]) -> pd.DataFrame:
+    """Read one CSV (a file, or its bytes) into a typed DataFrame."""
+    try:
+        table = read_csv_table(source)
+    except pa.ArrowInvalid:
+        return _read_with_pandas(source)
+    return to_pandas(table)
+
+
+def read_csv_files(
+    csv_files: Iterable[Path],
+    reader=read_csv_frame,
+    max_workers: Optional[int] = None
+) -> Iterator[Tuple[Path, Optional[pd.DataFrame], Optional[Exception]]]:
+    """
+    Read several CSVs concurrently, yielding results in input order.
+
+    Reads run at most max_workers files ahead of the caller.
+
+    Args:
+        csv_files: CSV files
+        reader: Called with each file; returns a DataFrame (or None for
+            nothing to read), e.g. a manifest's read_new_rows
+        max_workers: Files read at the same time (default: INGEST_WORKERS)
+
+    Yields:
+        (csv_file, df, error): error is the exception if the file failed
+    """
+    csv_files = list(csv_files)
+
+    def read_one(csv_file):
+        try:
+            return csv_file, reader(csv_file), None
+        except Exception as e:
+            return csv_file, None, e
+
+    # At most `workers` files are read ahead of the consumer, so a slow
+    # consumer never has every file in memory at once
+    workers = max(1, min(max_workers or INGEST_WORKERS, len(csv_files) or 1))
+    with ThreadPoolExecutor(max_workers=workers, thread_name_prefix="csv-ingest") as executor:
+        pending = deque()
+        for csv_file in csv_files:
+            pending.append(executor.submit(read_one, csv_file))
+            if len(pending) > workers:
+                yield pending.popleft().result()
+        while pending:
+            yield pending.popleft().result()
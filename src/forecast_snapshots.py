@@ -0,0 +1,321 @@
+"""
+Versioned forecast snapshots.
+
+The forecast CSVs only ever hold the latest model run. This store keeps
+every run, keyed by its issue time (model run initialisation, UTC), so
+old forecasts can be compared with what actually happened.
+
+Storage is delta-encoded Parquet, per location and frequency:
+
+    <base_dir>/<frequency>/<location_code>/<issue>.full.parquet   (keyframe)
+    <base_dir>/<frequency>/<location_code>/<issue>.delta.parquet
+
+- A keyframe is the whole forecast table (date + one column per variable).
+- A delta holds only the cells that changed since the previous run, in long
+  form (date, variable, value). Days dropped off the start of the horizon
+  are handled with the date range saved in the file metadata.
+- A new keyframe is written every `keyframe_interval` runs (or when the
+  variables change), so rebuilding a run never replays more than that many
+  deltas.
+"""
+
+import json
+import os
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+import pyarrow.parquet as pq
+
+try:
+    from .config import RAW_FORECAST_DIR
+except ImportError:
+    from config import RAW_FORECAST_DIR
+
+
+SNAPSHOT_DIR = RAW_FORECAST_DIR / "snapshots"
+
+# One keyframe per week of 6-hourly runs
+KEYFRAME_INTERVAL = 28
+
+# Columns that are the same on every row of a location's frame (not stored)
+CONSTANT_COLUMNS = ("location_code", "location_name")
+
+ISSUE_FORMAT = "%Y%m%dT%H%MZ"
+_METADATA_KEY = b"forecast_snapshot"
+
+
+def _issue_to_name(issue_time: datetime) -> str:
+    return issue_time.astimezone(timezone.utc).strftime(ISSUE_FORMAT)
+
+
+def _name_to_issue(name: str) -> datetime:
+    return datetime.strptime(name, ISSUE_FORMAT).replace(tzinfo=timezone.utc)
+
+
+def diff_frames(previous: pd.DataFrame, current: pd.DataFrame) -> pd.DataFrame:
+    """
+    Cells of `current` that differ from `previous` (both indexed by date).
+
+    NaN == NaN counts as unchanged. New dates and new columns are always
+    included (a changed value that became NaN is stored as null).
+
+    Returns:
+        Long DataFrame: date, variable, value (float64)
+    """
+    aligned = previous.reindex(index=current.index, columns=current.columns)
+    new_values = current.to_numpy(dtype=np.float64, na_value=np.nan)
+    old_values = aligned.to_numpy(dtype=np.float64, na_value=np.nan)
+
+    unchanged = (new_values == old_values) | (np.isnan(new_values) & np.isnan(old_values))
+    # Dates that were not in the previous run are stored even if all NaN
+    unchanged[~current.index.isin(previous.index)] = False
+
+    rows, cols = np.nonzero(~unchanged)
+    return pd.DataFrame({
+        "date": current.index[rows],
+        "variable": pd.Categorical(current.columns[cols], categories=current.columns),
+        "value": new_values[rows, cols],
+    })
+
+
+class ForecastSnapshotStore:
+    """
+    Every forecast run per location, delta-encoded in Parquet.
+
+    Example:
+        >>> store = ForecastSnapshotStore()
+        >>> store.save('cape_town', 'hourly', hourly_df, model_run)
+        >>> store.runs('cape_town', 'hourly')[-1] == model_run
+        True
+        >>> old_df = store.load('cape_town', 'hourly', issue_time=last_week)
+    """
+
+    def __init__(self, base_dir: Path = SNAPSHOT_DIR, keyframe_interval: int = KEYFRAME_INTERVAL):
+        self.base_dir = Path(base_dir)
+        self.keyframe_interval = keyframe_interval
+        # Last run rebuilt per (location, frequency): consecutive saves only
+        # diff against it instead of replaying deltas again
+        self._latest: Dict[Tuple[str, str], Tuple[datetime, pd.DataFrame]] = {}
+
+    # ------------------------------------------------------------------
+    # Listing
+    # ------------------------------------------------------------------
+
+    def _location_dir(self, location_code: str, frequency: str) -> Path:
+        return self.base_dir / frequency / location_code
+
+    def _files(self, location_code: str, frequency: str) -> List[Tuple[datetime, str, Path]]:
+        """(issue_time, 'full'|'delta', path) for every stored run, oldest first."""
+        location_dir = self._location_dir(location_code, frequency)
+        if not location_dir.exists():
+            return []
+
+        files = []
+        for path in location_dir.glob("*.parquet"):
+            name, kind, _ = path.name.split(".")
+            files.append((_name_to_issue(name), kind, path))
+        return sorted(files)
+
+    def runs(self, location_code: str, frequency: str) -> List[datetime]:
+        """Issue times of all stored runs, oldest first."""
+        return [issue for issue, _, _ in self._files(location_code, frequency)]
+
+    # ------------------------------------------------------------------
+    # Reading
+    # ------------------------------------------------------------------
+
+    @staticmethod
+    def _read(path: Path) -> Tuple[pd.DataFrame, Dict]:
+        table = pq.read_table(path)
+        metadata = json.loads(table.schema.metadata[_METADATA_KEY])
+        return table.to_pandas(), metadata
+
+    @staticmethod
+    def _finish(frame: pd.DataFrame, metadata: Dict) -> pd.DataFrame:
+        """Trim to the run's horizon and restore its columns and dtypes."""
+        start = pd.Timestamp(metadata["start"])
+        end = pd.Timestamp(metadata["end"])
+        frame = frame.loc[(frame.index >= start) & (frame.index <= end), metadata["columns"]]
+        frame.index.name = "date"
+
+        for column, dtype in metadata["dtypes"].items():
+            if frame[column].dtype == dtype:
+                continue
+            # Integer columns stay float64 if the run has missing values
+            if dtype.startswith("float") or not frame[column].isna().any():
+                frame[column] = frame[column].astype(dtype)
+        return frame
+
+    def _rebuild(self, files: List[Tuple[datetime, str, Path]], index: int) -> pd.DataFrame:
+        """Rebuild run files[index] from the nearest keyframe at or before it."""
+        keyframe = index
+        while files[keyframe][1] != "full":
+            keyframe -= 1
+
+        frame, metadata = self._read(files[keyframe][2])
+        frame = frame.set_index("date")
+        # float64 while applying deltas (int columns may gain NaNs mid-way)
+        frame = frame.astype(np.float64)
+
+        for _, _, path in files[keyframe + 1:index + 1]:
+            delta, metadata = self._read(path)
+            if not delta.empty:
+                variables = delta["variable"].astype(str)
+                frame = frame.reindex(
+                    index=frame.index.union(pd.DatetimeIndex(delta["date"].unique())),
+                    columns=list(dict.fromkeys([*frame.columns, *variables.unique()]))
+                )
+                rows = frame.index.get_indexer(delta["date"])
+                cols = frame.columns.get_indexer(variables)
+                values = frame.to_numpy(copy=True)
+                values[rows, cols] = delta["value"].to_numpy()
+                frame = pd.DataFrame(values, index=frame.index, columns=frame.columns)
+            frame = frame.loc[
+                (frame.index >= pd.Timestamp(metadata["start"]))
+                & (frame.index <= pd.Timestamp(metadata["end"]))
+            ]
+
+        return self._finish(frame.copy(), metadata)
+
+    def load(
+        self,
+        location_code: str,
+        frequency: str,
+        issue_time: Optional[datetime] = None
+    ) -> Optional[pd.DataFrame]:
+        """
+        Rebuild one forecast run.
+
+        Args:
+            location_code: e.g. 'cape_town'
+            frequency: 'hourly' or 'daily'
+            issue_time: Return the newest run issued at or before this time
+                (default: the latest run)
+
+        Returns:
+            DataFrame with date + variable columns (as passed to save()),
+            or None if no run is stored for that time
+        """
+        files = self._files(location_code, frequency)
+        if issue_time is not None:
+            files_before = [f for f in files if f[0] <= issue_time]
+        else:
+            files_before = files
+        if not files_before:
+            return None
+
+        issue = files_before[-1][0]
+        cached = self._latest.get((location_code, frequency))
+        if cached is not None and cached[0] == issue:
+            frame = cached[1]
+        else:
+            frame = self._rebuild(files, len(files_before) - 1)
+
+        frame = frame.reset_index()
+        frame.insert(1, "issue_time", pd.Timestamp(issue))
+        return frame
+
+    # ------------------------------------------------------------------
+    # Writing
+    # ------------------------------------------------------------------
+
+    def _write(self, path: Path, df: pd.DataFrame, metadata: Dict):
+        table = pa.Table.from_pandas(df, preserve_index=False)
+        table = table.replace_schema_metadata({
+            **(table.schema.metadata or {}),
+            _METADATA_KEY: json.dumps(metadata).encode("utf-8"),
+        })
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = path.parent / f".{path.name}.tmp"
+        pq.write_table(table, tmp_path, compression="zstd")
+        os.replace(tmp_path, path)
+
+    def save(
+        self,
+        location_code: str,
+        frequency: str,
+        df: pd.DataFrame,
+        issue_time: datetime
+    ) -> Path:
+        """
+        Store a forecast run.
+
+        Runs must be saved in issue order. Saving the latest run again
+        (e.g. after a retry) replaces it.
+
+        Args:
+            location_code: e.g. 'cape_town'
+            frequency: 'hourly' or 'daily'
+            df: Full forecast for the run (date column + variables;
+                location_code/location_name columns are dropped)
+            issue_time: Model run initialisation time (timezone-aware)
+
+        Returns:
+            Path of the written snapshot file
+        """
+        current = df.drop(columns=[c for c in CONSTANT_COLUMNS if c in df.columns])
+        current = current.assign(date=pd.to_datetime(current["date"], utc=True))
+        current = current.drop_duplicates("date", keep="last").set_index("date").sort_index()
+
+        files = self._files(location_code, frequency)
+        if files and issue_time < files[-1][0]:
+            raise ValueError(
+                f"Run {issue_time} is older than the latest stored run {files[-1][0]} "
+                f"for {location_code} ({frequency})"
+            )
+        if files and files[-1][0] == issue_time:
+            files[-1][2].unlink()
+            files = files[:-1]
+            self._latest.pop((location_code, frequency), None)
+
+        metadata = {
+            "issue_time": issue_time.isoformat(),
+            "start": current.index.min().isoformat(),
+            "end": current.index.max().isoformat(),
+            "columns": list(current.columns),
+            "dtypes": {column: str(dtype) for column, dtype in current.dtypes.items()},
+        }
+
+        # Previous run: from memory if we just saved it, else rebuild it
+        previous = None
+        since_keyframe = 0
+        if files:
+            cached = self._latest.get((location_code, frequency))
+            if cached is not None and cached[0] == files[-1][0]:
+                previous = cached[1]
+            else:
+                previous = self._rebuild(files, len(files) - 1)
+            for _, kind, _ in reversed(files):
+                if kind == "full":
+                    break
+                since_keyframe += 1
+
+        location_dir = self._location_dir(location_code, frequency)
+        write_keyframe = (
+            previous is None
+            or since_keyframe + 1 >= self.keyframe_interval
+            or list(previous.columns) != list(current.columns)
+        )
+
+        if write_keyframe:
+            path = location_dir / f"{_issue_to_name(issue_time)}.full.parquet"
+            self._write(path, current.reset_index(), metadata)
+        else:
+            path = location_dir / f"{_issue_to_name(issue_time)}.delta.parquet"
+            self._write(path, diff_frames(previous, current), metadata)
+
+        self._latest[(location_code, frequency)] = (issue_time, self._finish(current.copy(), metadata))
+        return path
+
+    def storage_summary(self, location_code: str, frequency: str) -> Dict:
+        """Number of runs, keyframes and bytes on disk for one location."""
+        files = self._files(location_code, frequency)
+        return {
+            "runs": len(files),
+            "keyframes": sum(1 for _, kind, _ in files if kind == "full"),
+            "bytes": sum(path.stat().st_size for _, _, path in files),
+        }
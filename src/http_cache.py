@@ -0,0 +1,224 @@
+"""
+Bounded HTTP response cache for API fetches.
+
+Wraps a requests session and keeps successful responses in a SQLite file:
+- responses are stored zlib-compressed
+- total size is kept under a budget by evicting least-recently-used entries
+- the file is VACUUMed after enough has been evicted (reclaims disk space)
+- hit/miss/byte counters are kept so runs can report how the cache did
+
+Drop-in for the `session=` argument of openmeteo_requests.Client.
+"""
+
+import hashlib
+import sqlite3
+import threading
+import time
+import zlib
+from pathlib import Path
+from typing import Dict, Optional
+
+import requests
+
+
+class BoundedCacheSession:
+    """
+    Session wrapper with a size-bounded, LRU, compressed response cache.
+
+    Only GET requests that return 200 are cached. Cached entries never
+    expire by age (historical data does not change); they only leave the
+    cache when the size budget forces it.
+    """
+
+    def __init__(
+        self,
+        session: requests.Session,
+        path: Path,
+        max_bytes: int,
+        compression_level: int = 6,
+        vacuum_fraction: float = 0.25
+    ):
+        """
+        Args:
+            session: Session that does the real requests (e.g. a retry session)
+            path: SQLite cache file
+            max_bytes: Budget for stored (compressed) response bytes
+            compression_level: zlib level, 1 (fast) to 9 (small)
+            vacuum_fraction: VACUUM once this fraction of the budget was evicted
+        """
+        self.session = session
+        self.path = Path(path)
+        self.max_bytes = max_bytes
+        self.compression_level = compression_level
+        self.vacuum_fraction = vacuum_fraction
+
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(str(self.path), check_same_thread=False)
+        self._conn.execute("""
+            CREATE TABLE IF NOT EXISTS responses (
+                key TEXT PRIMARY KEY,
+                url TEXT,
+                body BLOB,
+                size INTEGER,
+                raw_size INTEGER,
+                created REAL,
+                last_access REAL
+            )
+        """)
+        self._conn.execute(
+            "CREATE INDEX IF NOT EXISTS idx_responses_last_access ON responses (last_access)"
+        )
+        self._conn.commit()
+
+        self.total_bytes = self._conn.execute(
+            "SELECT COALESCE(SUM(size), 0) FROM responses"
+        ).fetchone()[0]
+        self._evicted_since_vacuum = 0
+
+        self.hits = 0
+        self.misses = 0
+        self.bytes_from_cache = 0
+        self.bytes_from_network = 0
+        self.evictions = 0
+        self.vacuums = 0
+
+    @staticmethod
+    def _cache_key(url: str, params) -> str:
+        """Hash of the fully encoded URL (same params -> same key)."""
+        prepared = requests.Request("GET", url, params=params).prepare()
+        return hashlib.sha256(prepared.url.encode("utf-8")).hexdigest()
+
+    def contains(self, url: str, params=None) -> bool:
+        """True if a GET with these params would be served from the cache."""
+        key = self._cache_key(url, params)
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT 1 FROM responses WHERE key = ?", (key,)
+            ).fetchone()
+        return row is not None
+
+    def _lookup(self, key: str) -> Optional[bytes]:
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT body FROM responses WHERE key = ?", (key,)
+            ).fetchone()
+            if row is None:
+                return None
+            self._conn.execute(
+                "UPDATE responses SET last_access = ? WHERE key = ?", (time.time(), key)
+            )
+            self._conn.commit()
+        return zlib.decompress(row[0])
+
+    def _store(self, key: str, url: str, content: bytes):
+        body = zlib.compress(content, self.compression_level)
+        now = time.time()
+        with self._lock:
+            old = self._conn.execute(
+                "SELECT size FROM responses WHERE key = ?", (key,)
+            ).fetchone()
+            if old:
+                self.total_bytes -= old[0]
+            self._conn.execute(
+                "INSERT OR REPLACE INTO responses VALUES (?, ?, ?, ?, ?, ?, ?)",
+                (key, url, body, len(body), len(content), now, now)
+            )
+            self.total_bytes += len(body)
+            self._evict()
+            self._conn.commit()
+
+        if self._evicted_since_vacuum > self.max_bytes * self.vacuum_fraction:
+            self.compact()
+
+    def _evict(self):
+        """Drop least-recently-used entries until we are under budget (lock held)."""
+        if self.total_bytes <= self.max_bytes:
+            return
+
+        # Evict down to 90% so we don't evict on every single insert
+        target = self.max_bytes * 0.9
+        rows = self._conn.execute(
+            "SELECT key, size FROM responses ORDER BY last_access"
+        )
+        doomed = []
+        for key, size in rows:
+            if self.total_bytes <= target:
+                break
+            doomed.append((key,))
+            self.total_bytes -= size
+            self._evicted_since_vacuum += size
+        self._conn.executemany("DELETE FROM responses WHERE key = ?", doomed)
+        self.evictions += len(doomed)
+
+    def compact(self):
+        """Reclaim the disk space left behind by evicted entries."""
+        with self._lock:
+            self._conn.execute("VACUUM")
+            self._evicted_since_vacuum = 0
+            self.vacuums += 1
+
+    def request(self, method: str, url: str, params=None, **kwargs) -> requests.Response:
+        """
+        Any request (same signature as requests.Session.request).
+
+        Only GETs go through the cache; other methods are passed on.
+        openmeteo_requests calls request() or get()/post() depending on
+        its version, so all three are supported.
+        """
+        if method.upper() != "GET":
+            return self.session.request(method, url, params=params, **kwargs)
+
+        key = self._cache_key(url, params)
+        content = self._lookup(key)
+
+        if content is not None:
+            with self._lock:
+                self.hits += 1
+                self.bytes_from_cache += len(content)
+            response = requests.Response()
+            response.status_code = 200
+            response._content = content
+            response.url = url
+            response.from_cache = True
+            return response
+
+        response = self.session.request("GET", url, params=params, **kwargs)
+        with self._lock:
+            self.misses += 1
+            self.bytes_from_network += len(response.content)
+        if response.status_code == 200:
+            self._store(key, url, response.content)
+        response.from_cache = False
+        return response
+
+    def get(self, url: str, params=None, **kwargs) -> requests.Response:
+        """GET through the cache (same signature as requests.Session.get)."""
+        return self.request("GET", url, params=params, **kwargs)
+
+    def post(self, url: str, **kwargs) -> requests.Response:
+        """POST requests are never cached."""
+        return self.request("POST", url, **kwargs)
+
+    def stats(self) -> Dict:
+        """Cache counters for this run plus the current size on disk."""
+        with self._lock:
+            entries = self._conn.execute("SELECT COUNT(*) FROM responses").fetchone()[0]
+            lookups = self.hits + self.misses
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": self.hits / lookups if lookups else 0.0,
+                "bytes_from_cache": self.bytes_from_cache,
+                "bytes_from_network": self.bytes_from_network,
+                "entries": entries,
+                "stored_bytes": self.total_bytes,
+                "max_bytes": self.max_bytes,
+                "file_bytes": self.path.stat().st_size if self.path.exists() else 0,
+                "evictions": self.evictions,
+                "vacuums": self.vacuums,
+            }
+
+    def close(self):
+        self._conn.close()
+        self.session.close()
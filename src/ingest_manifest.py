@@ -0,0 +1,222 @@
+"""
+Ingestion watermarks for the raw CSV -> Parquet step.
+
+The fetch scripts only ever APPEND to the raw CSVs, so after a file has been
+processed once, everything up to the last complete line is already in the
+Parquet store. The manifest remembers, per CSV:
+- size and mtime (unchanged file -> not even opened)
+- byte offset of the end of the last ingested line (the watermark)
+- a hash of the already-ingested head (detects files that were rewritten
+  rather than appended to, which are then read again in full)
+- max date and row count, for reporting
+
+Parquet/Arrow partitions written by fetch_historical_batches.py --format
+parquet|arrow are never appended to, only replaced when a range is fetched
+again, so for them only size and mtime are kept (partition_status()):
+a changed file is read again in full.
+
+Example:
+    >>> manifest = IngestManifest(PROCESSED_HOURLY_DIR / "_ingest_manifest.json")
+    >>> manifest.status(csv_file)
+    'appended'
+    >>> new_rows = manifest.read_new_rows(csv_file)   # only the appended tail
+    >>> ...                                           # write new_rows to Parquet
+    >>> manifest.commit()                             # then move the watermarks
+"""
+
+import hashlib
+import io
+import json
+import os
+from datetime import datetime
+from pathlib import Path
+from typing import Callable, Dict, Optional
+
+import pandas as pd
+
+
+MANIFEST_VERSION = 1
+
+# Bytes of the ingested head that are hashed to detect rewritten files
+HEAD_HASH_BYTES = 64 * 1024
+
+# File states returned by IngestManifest.status()
+NEW = "new"              # never ingested
+UNCHANGED = "unchanged"  # same size and mtime as last time
+APPENDED = "appended"    # grew, ingested part untouched -> read the tail only
+REWRITTEN = "rewritten"  # shrank or the ingested part changed -> read in full
+
+
+def _head_hash(csv_file: Path, n_bytes: int) -> str:
+    with open(csv_file, "rb") as f:
+        return hashlib.sha1(f.read(min(n_bytes, HEAD_HASH_BYTES))).hexdigest()
+
+
+class IngestManifest:
+    """
+    Per-file byte-offset watermarks, stored as JSON next to the Parquet output.
+
+    read_new_rows() only stages the new watermarks; commit() makes them
+    permanent once the rows are safely written, so a failed run re-reads
+    the same tail next time.
+    """
+
+    def __init__(self, path: Path):
+        self.path = Path(path)
+        self.files: Dict[str, Dict] = {}
+        self.partitions: Dict[str, Dict] = {}
+        self._pending: Dict[str, Dict] = {}
+        self._pending_partitions: Dict[str, Dict] = {}
+
+        if self.path.exists():
+            with open(self.path, "r", encoding="utf-8") as f:
+                data = json.load(f)
+            if data.get("version") == MANIFEST_VERSION:
+                self.files = data.get("files", {})
+                self.partitions = data.get("partitions", {})
+
+    # ------------------------------------------------------------------
+    # Checking
+    # ------------------------------------------------------------------
+
+    def status(self, csv_file: Path) -> str:
+        """NEW, UNCHANGED, APPENDED or REWRITTEN (see module docstring)."""
+        entry = self.files.get(csv_file.name)
+        if entry is None:
+            return NEW
+
+        stat = csv_file.stat()
+        if stat.st_size == entry["size"] and stat.st_mtime_ns == entry["mtime_ns"]:
+            return UNCHANGED
+        if stat.st_size < entry["offset"]:
+            return REWRITTEN
+        if _head_hash(csv_file, entry["offset"]) != entry["head_hash"]:
+            return REWRITTEN
+        # The watermark must still sit right after a line break
+        with open(csv_file, "rb") as f:
+            f.seek(entry["offset"] - 1)
+            if f.read(1) != b"\n":
+                return REWRITTEN
+        return APPENDED
+
+    def partition_status(self, path: Path, key: str) -> str:
+        """
+        NEW, UNCHANGED or REWRITTEN for a raw Parquet/Arrow partition file.
+
+        Args:
+            path: Partition file
+            key: Its name in the manifest (unique across locations, e.g. the
+                path relative to data/raw/historical)
+        """
+        entry = self.partitions.get(key)
+        if entry is None:
+            return NEW
+        stat = Path(path).stat()
+        if stat.st_size == entry["size"] and stat.st_mtime_ns == entry["mtime_ns"]:
+            return UNCHANGED
+        return REWRITTEN
+
+    # ------------------------------------------------------------------
+    # Reading
+    # ------------------------------------------------------------------
+
+    def read_new_rows(self, csv_file: Path, status: Optional[str] = None,
+                      reader: Optional[Callable[[bytes], pd.DataFrame]] = None,
+                      **read_csv_kwargs) -> Optional[pd.DataFrame]:
+        """
+        Read the rows added since the last commit (all rows if NEW/REWRITTEN).
+
+        Only complete lines are read: a line still being written is left
+        for the next run. The new watermark is staged until commit().
+
+        Args:
+            csv_file: Raw CSV file
+            status: Result of status() if already known
+            reader: Parses the header + new lines (bytes) into a DataFrame,
+                e.g. csv_ingest.read_csv_frame (default: pd.read_csv)
+            **read_csv_kwargs: Passed on to pd.read_csv (default reader only)
+
+        Returns:
+            DataFrame of the new rows (None if there are none)
+        """
+        if status is None:
+            status = self.status(csv_file)
+        if status == UNCHANGED:
+            return None
+
+        entry = self.files.get(csv_file.name) if status == APPENDED else None
+        stat = csv_file.stat()
+
+        with open(csv_file, "rb") as f:
+            header = f.readline()
+            start = entry["offset"] if entry is not None else len(header)
+            f.seek(start)
+            data = f.read()
+
+        # Stop after the last complete line
+        end = data.rfind(b"\n") + 1
+        data = data[:end]
+        offset = start + end
+
+        df = None
+        if data.strip():
+            if reader is not None:
+                df = reader(header + data)
+            else:
+                df = pd.read_csv(io.BytesIO(header + data), **read_csv_kwargs)
+
+        rows = len(df) if df is not None else 0
+        max_date = entry["max_date"] if entry is not None else None
+        if df is not None and "date" in df.columns and rows:
+            new_max = str(df["date"].max())
+            max_date = new_max if max_date is None else max(max_date, new_max)
+
+        self._pending[csv_file.name] = {
+            "size": stat.st_size,
+            "mtime_ns": stat.st_mtime_ns,
+            "offset": offset,
+            "head_hash": _head_hash(csv_file, offset),
+            "max_date": max_date,
+            "rows": (entry["rows"] if entry is not None else 0) + rows,
+            "ingested_at": datetime.now().isoformat(timespec="seconds"),
+        }
+        return df
+
+    def stage_partition(self, path: Path, key: str, rows: int, max_date: Optional[str] = None):
+        """Stage a partition file as read in full (permanent after commit())."""
+        stat = Path(path).stat()
+        self._pending_partitions[key] = {
+            "size": stat.st_size,
+            "mtime_ns": stat.st_mtime_ns,
+            "max_date": max_date,
+            "rows": rows,
+            "ingested_at": datetime.now().isoformat(timespec="seconds"),
+        }
+
+    # ------------------------------------------------------------------
+    # Saving
+    # ------------------------------------------------------------------
+
+    def commit(self):
+        """Make the staged watermarks permanent and save the manifest."""
+        self.files.update(self._pending)
+        self.partitions.update(self._pending_partitions)
+        self._pending = {}
+        self._pending_partitions = {}
+        self.save()
+
+    def reset(self):
+        """Forget every watermark (next read of each file starts from the top)."""
+        self.files = {}
+        self.partitions = {}
+        self._pending = {}
+        self._pending_partitions = {}
+
+    def save(self):
+        """Write the manifest atomically (temp file + rename)."""
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = self.path.parent / f".{self.path.name}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump({"version": MANIFEST_VERSION, "files": self.files,
+                       "partitions": self.partitions}, f, indent=2)
+        os.replace(tmp_path, self.path)
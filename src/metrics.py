@@ -0,0 +1,265 @@
+"""
+Fetch-path metrics.
+
+Collects what a fetch run spent its time on - network, API throttling or
+our own parsing - and writes it out at the end of the run:
+- <METRICS_DIR>/<run>.json  summary (counts, totals, p50/p95/p99)
+- <METRICS_DIR>/<run>.prom  Prometheus text format (node_exporter textfile
+  collector or a Pushgateway can pick it up)
+
+Example:
+    >>> metrics = FetchMetrics("fetch_historical")
+    >>> metrics.observe("request_latency_seconds", 0.42)
+    >>> metrics.inc("response_bytes_total", 183_000)
+    >>> metrics.export()
+"""
+
+import json
+import os
+import threading
+import time
+from bisect import bisect_left
+from datetime import datetime
+from pathlib import Path
+from typing import Dict, List, Optional, Sequence
+
+try:
+    from .config import METRICS_DIR
+except ImportError:
+    from config import METRICS_DIR
+
+
+# Bucket upper bounds (seconds): 5ms .. 2min covers cache hits to throttled backfills
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60, 120)
+
+# name -> (type, help); every metric a run can report
+METRICS = {
+    "requests_total": ("counter", "HTTP requests sent to the API (after cache)"),
+    "request_errors_total": ("counter", "Requests that failed after all retries"),
+    "retries_total": ("counter", "Request attempts that were retried"),
+    "cache_hits_total": ("counter", "Responses served from a cache"),
+    "cache_misses_total": ("counter", "Responses that needed a request"),
+    "response_bytes_total": ("counter", "Response body bytes received"),
+    "records_parsed_total": ("counter", "Rows (timestamps x locations) parsed from responses"),
+    "request_latency_seconds": ("histogram", "Time per API request, including retries"),
+    "rate_limit_wait_seconds": ("histogram", "Time spent waiting for rate-limit budget"),
+    "parse_seconds": ("histogram", "Time spent turning responses into frames/files"),
+}
+
+
+class Histogram:
+    """Fixed-bucket histogram (Prometheus style, cumulative on export)."""
+
+    def __init__(self, buckets: Sequence[float] = LATENCY_BUCKETS):
+        self.buckets = tuple(buckets)
+        self.counts = [0] * (len(self.buckets) + 1)  # last = +Inf
+        self.count = 0
+        self.sum = 0.0
+        self.max = 0.0
+
+    def observe(self, value: float):
+        self.counts[bisect_left(self.buckets, value)] += 1
+        self.count += 1
+        self.sum += value
+        self.max = max(self.max, value)
+
+    def quantile(self, q: float) -> float:
+        """Estimate a quantile by interpolating inside its bucket."""
+        if self.count == 0:
+            return 0.0
+        rank = q * self.count
+        seen = 0
+        for i, n in enumerate(self.counts):
+            if n and seen + n >= rank:
+                lower = self.buckets[i - 1] if i > 0 else 0.0
+                upper = self.buckets[i] if i < len(self.buckets) else self.max
+                return lower + (upper - lower) * (rank - seen) / n
+            seen += n
+        return self.max
+
+    def summary(self) -> Dict:
+        return {
+            "count": self.count,
+            "sum": round(self.sum, 6),
+            "mean": round(self.sum / self.count, 6) if self.count else 0.0,
+            "p50": round(self.quantile(0.5), 6),
+            "p95": round(self.quantile(0.95), 6),
+            "p99": round(self.quantile(0.99), 6),
+            "max": round(self.max, 6),
+        }
+
+
+class FetchMetrics:
+    """
+    Thread-safe counters and histograms for one fetch run.
+
+    Every metric can carry a `source` label (e.g. 'archive', 'forecast')
+    so one run can report several endpoints separately.
+    """
+
+    def __init__(self, run_name: str, out_dir: Path = METRICS_DIR):
+        self.run_name = run_name
+        self.out_dir = Path(out_dir)
+        self.started = time.time()
+        self._counters: Dict[tuple, float] = {}
+        self._histograms: Dict[tuple, Histogram] = {}
+        self._lock = threading.Lock()
+
+    def inc(self, name: str, value: float = 1, source: str = "api"):
+        """Add to a counter."""
+        with self._lock:
+            key = (name, source)
+            self._counters[key] = self._counters.get(key, 0) + value
+
+    def observe(self, name: str, value: float, source: str = "api"):
+        """Record one value in a histogram."""
+        with self._lock:
+            key = (name, source)
+            if key not in self._histograms:
+                self._histograms[key] = Histogram()
+            self._histograms[key].observe(value)
+
+    def summary(self) -> Dict:
+        """Everything recorded so far, as plain dicts."""
+        with self._lock:
+            metrics: Dict[str, Dict] = {}
+            for (name, source), value in sorted(self._counters.items()):
+                metrics.setdefault(name, {})[source] = value
+            for (name, source), histogram in sorted(self._histograms.items()):
+                metrics.setdefault(name, {})[source] = histogram.summary()
+
+        elapsed = time.time() - self.started
+        records = sum(metrics.get("records_parsed_total", {}).values())
+        return {
+            "run": self.run_name,
+            "started": datetime.fromtimestamp(self.started).isoformat(timespec="seconds"),
+            "elapsed_seconds": round(elapsed, 3),
+            "records_per_second": round(records / elapsed, 1) if elapsed > 0 else 0.0,
+            "metrics": metrics,
+        }
+
+    def to_prometheus(self) -> str:
+        """Prometheus text exposition format."""
+        lines: List[str] = []
+        with self._lock:
+            counters = sorted(self._counters.items())
+            histograms = sorted(self._histograms.items())
+
+        run = self.run_name
+        written = set()
+        for (name, source), value in counters:
+            metric = f"openmeteo_{name}"
+            if name not in written:
+                lines.append(f"# HELP {metric} {METRICS.get(name, ('', name))[1]}")
+                lines.append(f"# TYPE {metric} counter")
+                written.add(name)
+            lines.append(f'{metric}{{run="{run}",source="{source}"}} {value:g}')
+
+        for (name, source), histogram in histograms:
+            metric = f"openmeteo_{name}"
+            if name not in written:
+                lines.append(f"# HELP {metric} {METRICS.get(name, ('', name))[1]}")
+                lines.append(f"# TYPE {metric} histogram")
+                written.add(name)
+            labels = f'run="{run}",source="{source}"'
+            cumulative = 0
+            for bound, n in zip(histogram.buckets, histogram.counts):
+                cumulative += n
+                lines.append(f'{metric}_bucket{{{labels},le="{bound:g}"}} {cumulative}')
+            lines.append(f'{metric}_bucket{{{labels},le="+Inf"}} {histogram.count}')
+            lines.append(f"{metric}_sum{{{labels}}} {histogram.sum:.6f}")
+            lines.append(f"{metric}_count{{{labels}}} {histogram.count}")
+
+        lines.append("# HELP openmeteo_run_duration_seconds Wall time of the run")
+        lines.append("# TYPE openmeteo_run_duration_seconds gauge")
+        lines.append(f'openmeteo_run_duration_seconds{{run="{run}"}} {time.time() - self.started:.3f}')
+        return "\n".join(lines) + "\n"
+
+    def export(self, out_dir: Optional[Path] = None) -> Dict[str, Path]:
+        """
+        Write <run>.json and <run>.prom (each replaced atomically).
+
+        Returns:
+            Dict with the 'json' and 'prom' paths
+        """
+        out_dir = Path(out_dir or self.out_dir)
+        out_dir.mkdir(parents=True, exist_ok=True)
+        paths = {"json": out_dir / f"{self.run_name}.json", "prom": out_dir / f"{self.run_name}.prom"}
+
+        contents = {
+            "json": json.dumps(self.summary(), indent=2),
+            "prom": self.to_prometheus(),
+        }
+        for kind, path in paths.items():
+            tmp_path = path.parent / f".{path.name}.tmp"
+            with open(tmp_path, "w", encoding="utf-8") as f:
+                f.write(contents[kind])
+            os.replace(tmp_path, path)
+        return paths
+
+    def print_summary(self):
+        """Short human-readable version of summary()."""
+        summary = self.summary()
+        metrics = summary["metrics"]
+        print(f"   Metrics ({self.run_name}): {summary['elapsed_seconds']:.1f}s, "
+              f"{summary['records_per_second']:,.0f} records/s")
+        for name in ("request_latency_seconds", "rate_limit_wait_seconds", "parse_seconds"):
+            for source, h in metrics.get(name, {}).items():
+                print(f"   - {name} [{source}]: n={h['count']} total={h['sum']:.1f}s "
+                      f"p50={h['p50']:.3f}s p95={h['p95']:.3f}s")
+        for name in ("requests_total", "retries_total", "cache_hits_total",
+                     "response_bytes_total", "records_parsed_total"):
+            total = sum(metrics.get(name, {}).values())
+            if total:
+                print(f"   - {name}: {total:,.0f}")
+
+
+class InstrumentedSession:
+    """
+    Session wrapper that records latency, bytes, retries and cache hits.
+
+    Wrap the outermost session given to openmeteo_requests.Client, e.g.
+    Client(session=InstrumentedSession(cache_session, metrics, 'archive')).
+    Works with requests_cache (response.from_cache), BoundedCacheSession and
+    retry_requests (urllib3 retry history on response.raw).
+    """
+
+    def __init__(self, session, metrics: FetchMetrics, source: str = "api"):
+        self.session = session
+        self.metrics = metrics
+        self.source = source
+
+    def request(self, method, url, params=None, **kwargs):
+        """Any request (requests.Session.request signature), measured."""
+        started = time.perf_counter()
+        try:
+            response = self.session.request(method, url, params=params, **kwargs)
+        except Exception:
+            self.metrics.inc("request_errors_total", source=self.source)
+            raise
+        elapsed = time.perf_counter() - started
+
+        if getattr(response, "from_cache", False):
+            self.metrics.inc("cache_hits_total", source=self.source)
+            return response
+
+        self.metrics.inc("cache_misses_total", source=self.source)
+        self.metrics.inc("requests_total", source=self.source)
+        self.metrics.observe("request_latency_seconds", elapsed, source=self.source)
+        self.metrics.inc("response_bytes_total", len(response.content), source=self.source)
+
+        retries = getattr(getattr(response, "raw", None), "retries", None)
+        if retries is not None and getattr(retries, "history", None):
+            self.metrics.inc("retries_total", len(retries.history), source=self.source)
+        if response.status_code >= 400:
+            self.metrics.inc("request_errors_total", source=self.source)
+        return response
+
+    def get(self, url, params=None, **kwargs):
+        return self.request("GET", url, params=params, **kwargs)
+
+    def post(self, url, **kwargs):
+        return self.request("POST", url, **kwargs)
+
+    def close(self):
+        self.session.close()
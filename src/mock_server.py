@@ -0,0 +1,679 @@
+"""
+Offline stand-in for the Open-Meteo API.
+
+Serves the forecast (/v1/forecast) and archive (/v1/archive) endpoints
+and the model metadata (/data/{model}/static/meta.json) locally, so the
+fetch path can be load-tested without spending quota:
+- any coordinates (comma-separated lists -> one response per location)
+  and any date range, past_days/forecast_days or start_date/end_date
+- JSON (default) or FlatBuffers (format=flatbuffers, what
+  openmeteo_requests asks for), length-prefixed exactly like the real API
+- synthetic but plausible values for every requested variable
+  (diurnal temperature cycle, mostly-dry precipitation, 0-100 % humidity...)
+- configurable latency, 5xx errors and 429s (with Retry-After), and an
+  optional concurrency limit above which requests are throttled
+  (metadata is a static file upstream, so it is always answered at once)
+
+Example:
+    >>> with MockOpenMeteoServer(latency=0.05, throttle_rate=0.01) as server:
+    ...     openmeteo.weather_api(server.archive_url, params=params)
+
+Or standalone, with the fetch scripts pointed at it:
+    python src/mock_server.py --port 8765 --latency 0.2 --error-rate 0.01
+    OPEN_METEO_ARCHIVE_URL=http://127.0.0.1:8765/v1/archive \\
+        python scripts/fetch_historical_batches.py --backfill 2024-01-01
+    OPEN_METEO_FORECAST_URL=http://127.0.0.1:8765/v1/forecast \\
+    OPEN_METEO_META_URL='http://127.0.0.1:8765/data/{model}/static/meta.json' \\
+        python scripts/fetch_forecast.py
+"""
+
+import argparse
+import json
+import random
+import re
+import threading
+import time
+import zlib
+from datetime import date, datetime, timedelta, timezone
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Dict, List, Optional
+from urllib.parse import parse_qs, urlparse
+
+import flatbuffers
+import numpy as np
+from openmeteo_sdk.Aggregation import Aggregation
+from openmeteo_sdk.Unit import Unit
+from openmeteo_sdk.Variable import Variable
+
+
+DEFAULT_PORT = 8765
+
+# Model runs start every 6 hours and reach the API a few hours later
+RUN_CYCLE_SECONDS = 6 * 3600
+RUN_DELAY_SECONDS = 5 * 3600
+
+# Variable name keyword -> (JSON unit, FlatBuffers Unit); first match wins
+UNITS = [
+    ("weather_code", "wmo code", Unit.wmo_code),
+    ("is_day", "", Unit.dimensionless_integer),
+    ("temperature", "°C", Unit.celsius),
+    ("dew_point", "°C", Unit.celsius),
+    ("humidity", "%", Unit.percentage),
+    ("cloud_cover", "%", Unit.percentage),
+    ("direction", "°", Unit.degree_direction),
+    ("wind_speed", "km/h", Unit.kilometres_per_hour),
+    ("wind_gusts", "km/h", Unit.kilometres_per_hour),
+    ("pressure", "hPa", Unit.hectopascal),
+    ("radiation", "W/m²", Unit.watt_per_square_metre),
+    ("irradiance", "W/m²", Unit.watt_per_square_metre),
+    ("snowfall", "cm", Unit.centimetre),
+    ("precipitation_hours", "h", Unit.hours),
+    ("precipitation_probability", "%", Unit.percentage),
+    ("precipitation", "mm", Unit.millimetre),
+    ("rain", "mm", Unit.millimetre),
+    ("showers", "mm", Unit.millimetre),
+    ("duration", "s", Unit.seconds),
+    ("visibility", "m", Unit.metre),
+    ("height", "m", Unit.metre),
+    ("depth", "m", Unit.metre),
+    ("evapotranspiration", "mm", Unit.millimetre),
+    ("vapour_pressure_deficit", "kPa", Unit.kilopascal),
+    ("sunrise", "iso8601", Unit.unix_time),
+    ("sunset", "iso8601", Unit.unix_time),
+]
+
+INT64_VARIABLES = ("sunrise", "sunset")
+
+AGGREGATIONS = {
+    "max": Aggregation.maximum, "min": Aggregation.minimum,
+    "mean": Aggregation.mean, "sum": Aggregation.sum, "dominant": Aggregation.dominant,
+}
+
+WEATHER_CODES = np.array([0, 0, 0, 1, 1, 2, 2, 3, 3, 45, 51, 53, 61, 63, 80, 95], dtype=np.float32)
+
+
+class MockApiError(Exception):
+    """Bad request parameters (answered with a 400, like the real API)."""
+
+
+# ==============================================================================
+# SYNTHETIC DATA
+# ==============================================================================
+
+def _unit(name: str):
+    for keyword, json_unit, fb_unit in UNITS:
+        if keyword in name:
+            return json_unit, fb_unit
+    return "", Unit.undefined
+
+
+def _describe(name: str) -> Dict:
+    """FlatBuffers fields for a variable name, e.g. 'temperature_2m_max'."""
+    fields = {"variable": Variable.undefined, "altitude": 0, "pressure_level": 0,
+              "aggregation": Aggregation.none}
+    base = name
+    suffix = base.rsplit("_", 1)[-1]
+    if suffix in AGGREGATIONS:
+        fields["aggregation"] = AGGREGATIONS[suffix]
+        base = base[:-len(suffix) - 1]
+    match = re.match(r"^(.*)_(\d+)(m|hPa)$", base)
+    if match:
+        base = match.group(1)
+        key = "altitude" if match.group(3) == "m" else "pressure_level"
+        fields[key] = int(match.group(2))
+    fields["variable"] = getattr(Variable, base, Variable.undefined)
+    fields["unit"] = _unit(name)[1]
+    return fields
+
+
+def synthetic_values(name: str, times: np.ndarray, utc_offset: int,
+                     latitude: float, longitude: float, interval: int) -> np.ndarray:
+    """
+    Plausible values for one variable at the given UTC timestamps.
+
+    Deterministic for the same location and variable, so repeated requests
+    return the same data (like the real archive).
+    """
+    seed = zlib.crc32(f"{latitude:.4f},{longitude:.4f},{name}".encode())
+    rng = np.random.default_rng(seed)
+    n = len(times)
+    local_hour = ((times + utc_offset) % 86400) / 3600.0
+    day_of_year = ((times + utc_offset) // 86400) % 365
+    # Warmest around mid-January in the southern hemisphere, mid-July in the north
+    hemisphere = 1 if latitude < 0 else -1
+    seasonal = 6 * hemisphere * np.cos(2 * np.pi * (day_of_year - 15) / 365)
+    diurnal = np.sin(2 * np.pi * (local_hour - 9) / 24) if interval < 86400 else 0.0
+    noise = rng.normal(0, 1, n)
+
+    if name in INT64_VARIABLES:
+        midnight = times - (times + utc_offset) % 86400
+        hours = 6.0 if name == "sunrise" else 18.5
+        return (midnight + int(hours * 3600) + rng.integers(-1800, 1800, n)).astype(np.int64)
+    if "weather_code" in name:
+        return WEATHER_CODES[rng.integers(0, len(WEATHER_CODES), n)]
+    if name == "is_day":
+        return ((local_hour >= 6) & (local_hour < 18.5)).astype(np.float32)
+    if "temperature" in name or "dew_point" in name:
+        base = 17 + seasonal + 7 * diurnal + 2 * noise
+        if name.endswith("_max"):
+            base += 6
+        elif name.endswith("_min"):
+            base -= 6
+        if "dew_point" in name:
+            base -= 8
+        return base.astype(np.float32)
+    if "humidity" in name or "cloud_cover" in name or "probability" in name:
+        return np.clip(60 - 20 * diurnal + 15 * noise, 0, 100).round().astype(np.float32)
+    if "direction" in name:
+        return rng.uniform(0, 360, n).round().astype(np.float32)
+    if "precipitation_hours" in name:
+        return np.clip(rng.normal(1, 3, n), 0, 24).round().astype(np.float32)
+    if any(key in name for key in ("precipitation", "rain", "showers", "snowfall", "evapotranspiration")):
+        wet = rng.random(n) < 0.15
+        return np.where(wet, rng.gamma(1.2, 1.5, n), 0.0).round(1).astype(np.float32)
+    if "wind_speed" in name or "wind_gusts" in name:
+        scale = 1.6 if "gusts" in name else 1.0
+        return (np.abs(15 + 5 * diurnal + 6 * noise) * scale).round(1).astype(np.float32)
+    if "pressure" in name:
+        match = re.search(r"(\d+)hPa", name)
+        level = float(match.group(1)) if match else 1013.0
+        return (level + 4 * noise).round(1).astype(np.float32)
+    if "radiation" in name or "irradiance" in name:
+        return (np.maximum(diurnal, 0) * 850 * rng.uniform(0.5, 1, n)).round().astype(np.float32)
+    if "duration" in name:
+        cap = 3600 if interval < 86400 else 86400
+        return np.clip(cap * rng.uniform(0.3, 1, n), 0, cap).round().astype(np.float32)
+    if "height" in name:
+        match = re.search(r"(\d+)hPa", name)
+        level = float(match.group(1)) if match else 1000.0
+        return (44331 * (1 - (level / 1013.25) ** 0.19) + 20 * noise).round().astype(np.float32)
+    return (10 + 5 * noise).round(2).astype(np.float32)
+
+
+def _utc_offset(timezone_param: Optional[str], longitude: float) -> int:
+    """UTC offset in seconds: GMT/UTC = 0, anything else follows the longitude."""
+    if timezone_param in (None, "", "GMT", "UTC"):
+        return 0
+    return int(round(longitude / 15)) * 3600
+
+
+def _timezone_names(utc_offset: int):
+    if utc_offset == 0:
+        return "GMT", "GMT"
+    hours = utc_offset // 3600
+    return f"Etc/GMT{-hours:+d}", f"GMT{hours:+d}"
+
+
+def _date_range(query: Dict[str, str], endpoint: str, utc_offset: int):
+    """(first_day, last_day) requested, both inclusive."""
+    if "start_date" in query or "end_date" in query:
+        try:
+            start = date.fromisoformat(query["start_date"])
+            end = date.fromisoformat(query["end_date"])
+        except KeyError as e:
+            raise MockApiError(f"Parameter {e.args[0]!r} is required")
+        except ValueError as e:
+            raise MockApiError(f"Invalid date: {e}")
+        if end < start:
+            raise MockApiError("End-date must be larger or equals than start-date")
+        return start, end
+
+    if endpoint == "archive":
+        raise MockApiError("Parameter 'start_date' is required")
+    today = (datetime.now(timezone.utc) + timedelta(seconds=utc_offset)).date()
+    past_days = int(query.get("past_days", 0))
+    forecast_days = int(query.get("forecast_days", 7))
+    return today - timedelta(days=past_days), today + timedelta(days=forecast_days - 1)
+
+
+def _section_times(first_day: date, last_day: date, utc_offset: int, interval: int):
+    """(time, time_end, timestamps) for one section, in UTC seconds."""
+    start = int(datetime(first_day.year, first_day.month, first_day.day,
+                         tzinfo=timezone.utc).timestamp()) - utc_offset
+    end = int(datetime(last_day.year, last_day.month, last_day.day,
+                       tzinfo=timezone.utc).timestamp()) + 86400 - utc_offset
+    return start, end, np.arange(start, end, interval, dtype=np.int64)
+
+
+def build_location(query: Dict[str, str], endpoint: str, latitude: float,
+                   longitude: float, elevation: float) -> Dict:
+    """
+    Synthetic data for one location, shared by the JSON and FlatBuffers encoders.
+
+    Returns:
+        Dict with the location fields and a 'sections' dict
+        (current/hourly/daily -> time, time_end, interval, {name: values})
+    """
+    utc_offset = _utc_offset(query.get("timezone"), longitude)
+    tz_name, tz_abbreviation = _timezone_names(utc_offset)
+    first_day, last_day = _date_range(query, endpoint, utc_offset)
+
+    sections = {}
+    for section, interval in (("hourly", 3600), ("daily", 86400)):
+        names = [v for v in query.get(section, "").split(",") if v]
+        if not names:
+            continue
+        start, end, times = _section_times(first_day, last_day, utc_offset, interval)
+        sections[section] = {
+            "time": start, "time_end": end, "interval": interval, "times": times,
+            "values": {
+                name: synthetic_values(name, times, utc_offset, latitude, longitude, interval)
+                for name in names
+            },
+        }
+
+    current_names = [v for v in query.get("current", "").split(",") if v]
+    if endpoint == "forecast" and current_names:
+        now = int(time.time()) // 900 * 900
+        times = np.array([now], dtype=np.int64)
+        sections["current"] = {
+            "time": now, "time_end": now + 900, "interval": 900, "times": times,
+            "values": {
+                name: synthetic_values(name, times, utc_offset, latitude, longitude, 900)
+                for name in current_names
+            },
+        }
+
+    return {
+        "latitude": latitude,
+        "longitude": longitude,
+        "elevation": elevation,
+        "utc_offset_seconds": utc_offset,
+        "timezone": tz_name,
+        "timezone_abbreviation": tz_abbreviation,
+        "sections": sections,
+    }
+
+
+# ==============================================================================
+# ENCODERS
+# ==============================================================================
+
+def _iso_times(timestamps: np.ndarray, utc_offset: int, unit: str) -> List[str]:
+    """UTC seconds -> local ISO 8601 strings (the API's default timeformat)."""
+    local = (timestamps + utc_offset).astype("datetime64[s]")
+    return np.datetime_as_string(local, unit=unit).tolist()
+
+
+def to_json(location: Dict, generation_ms: float) -> Dict:
+    """One location in the API's JSON layout."""
+    utc_offset = location["utc_offset_seconds"]
+    item = {
+        "latitude": location["latitude"],
+        "longitude": location["longitude"],
+        "generationtime_ms": generation_ms,
+        "utc_offset_seconds": utc_offset,
+        "timezone": location["timezone"],
+        "timezone_abbreviation": location["timezone_abbreviation"],
+        "elevation": location["elevation"],
+    }
+    for section in ("current", "hourly", "daily"):
+        data = location["sections"].get(section)
+        if data is None:
+            continue
+        time_unit = "D" if section == "daily" else "m"
+        units = {"time": "iso8601"}
+        if section == "current":
+            units["interval"] = "seconds"
+            values = {"time": _iso_times(data["times"], utc_offset, "m")[0], "interval": 900}
+        else:
+            values = {"time": _iso_times(data["times"], utc_offset, time_unit)}
+        for name, array in data["values"].items():
+            units[name] = _unit(name)[0]
+            if name in INT64_VARIABLES:
+                column = _iso_times(array, utc_offset, "m")
+            else:
+                column = np.round(array.astype(np.float64), 2).tolist()
+            values[name] = column[0] if section == "current" else column
+        item[f"{section}_units"] = units
+        item[section] = values
+    return item
+
+
+def _fb_section(builder: flatbuffers.Builder, data: Dict, current: bool) -> int:
+    """Build a VariablesWithTime table, returns its offset."""
+    variables = []
+    for name, array in data["values"].items():
+        fields = _describe(name)
+        values_vector = None
+        if current:
+            pass  # single value, stored inline below
+        elif name in INT64_VARIABLES:
+            values_vector = builder.CreateNumpyVector(array.astype("<i8"))
+        else:
+            values_vector = builder.CreateNumpyVector(array.astype("<f4"))
+
+        # VariableWithValues: variable, unit, value, values, values_int64,
+        # altitude, aggregation, pressure_level, ... (vtable slots 0-12)
+        builder.StartObject(13)
+        builder.PrependUint8Slot(0, fields["variable"], 0)
+        builder.PrependUint8Slot(1, fields["unit"], 0)
+        if current:
+            builder.PrependFloat32Slot(2, float(array[0]), 0.0)
+        elif name in INT64_VARIABLES:
+            builder.PrependUOffsetTRelativeSlot(4, values_vector, 0)
+        else:
+            builder.PrependUOffsetTRelativeSlot(3, values_vector, 0)
+        builder.PrependInt16Slot(5, fields["altitude"], 0)
+        builder.PrependUint8Slot(6, fields["aggregation"], 0)
+        builder.PrependInt16Slot(7, fields["pressure_level"], 0)
+        variables.append(builder.EndObject())
+
+    builder.StartVector(4, len(variables), 4)
+    for offset in reversed(variables):
+        builder.PrependUOffsetTRelative(offset)
+    variables_vector = builder.EndVector()
+
+    # VariablesWithTime: time, time_end, interval, variables
+    builder.StartObject(4)
+    builder.PrependInt64Slot(0, data["time"], 0)
+    builder.PrependInt64Slot(1, data["time_end"], 0)
+    builder.PrependInt32Slot(2, data["interval"], 0)
+    builder.PrependUOffsetTRelativeSlot(3, variables_vector, 0)
+    return builder.EndObject()
+
+
+def to_flatbuffer(location: Dict, generation_ms: float, location_id: int) -> bytes:
+    """One location as a WeatherApiResponse message, with its 4-byte length prefix."""
+    builder = flatbuffers.Builder(4096)
+    sections = {
+        name: _fb_section(builder, data, current=(name == "current"))
+        for name, data in location["sections"].items()
+    }
+    tz_name = builder.CreateString(location["timezone"])
+    tz_abbreviation = builder.CreateString(location["timezone_abbreviation"])
+
+    # WeatherApiResponse vtable slots: 0 latitude .. 6 utc_offset_seconds,
+    # 7/8 timezone strings, 9 current, 10 daily, 11 hourly
+    builder.StartObject(15)
+    builder.PrependFloat32Slot(0, location["latitude"], 0.0)
+    builder.PrependFloat32Slot(1, location["longitude"], 0.0)
+    builder.PrependFloat32Slot(2, location["elevation"], 0.0)
+    builder.PrependFloat32Slot(3, generation_ms, 0.0)
+    builder.PrependInt64Slot(4, location_id, 0)
+    builder.PrependInt32Slot(6, location["utc_offset_seconds"], 0)
+    builder.PrependUOffsetTRelativeSlot(7, tz_name, 0)
+    builder.PrependUOffsetTRelativeSlot(8, tz_abbreviation, 0)
+    for name, slot in (("current", 9), ("daily", 10), ("hourly", 11)):
+        if name in sections:
+            builder.PrependUOffsetTRelativeSlot(slot, sections[name], 0)
+    builder.Finish(builder.EndObject())
+
+    message = builder.Output()
+    return len(message).to_bytes(4, "little") + bytes(message)
+
+
+# ==============================================================================
+# SERVER
+# ==============================================================================
+
+def model_meta(now: Optional[float] = None) -> Dict:
+    """Static meta.json of a model: its newest run that should be available by now."""
+    if now is None:
+        now = time.time()
+    run = int(now - RUN_DELAY_SECONDS) // RUN_CYCLE_SECONDS * RUN_CYCLE_SECONDS
+    return {
+        "last_run_initialisation_time": run,
+        "last_run_availability_time": run + RUN_DELAY_SECONDS,
+        "update_interval_seconds": RUN_CYCLE_SECONDS,
+    }
+
+
+def _parse_coordinates(query: Dict[str, str]):
+    try:
+        latitudes = [float(v) for v in query["latitude"].split(",")]
+        longitudes = [float(v) for v in query["longitude"].split(",")]
+    except KeyError as e:
+        raise MockApiError(f"Parameter {e.args[0]!r} is required")
+    except ValueError as e:
+        raise MockApiError(f"Invalid coordinate: {e}")
+    if len(latitudes) != len(longitudes):
+        raise MockApiError("Parameter 'latitude' and 'longitude' must have the same number of elements")
+    elevations = [float(v) for v in query["elevation"].split(",")] if "elevation" in query else []
+    if len(elevations) != len(latitudes):
+        elevations = [100.0] * len(latitudes)
+    return list(zip(latitudes, longitudes, elevations))
+
+
+class _Handler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"  # keep-alive, like the real API
+
+    def log_message(self, format, *args):
+        pass
+
+    def _send(self, status: int, body: bytes, content_type: str, headers: Optional[Dict] = None):
+        self.send_response(status)
+        self.send_header("Content-Type", content_type)
+        self.send_header("Content-Length", str(len(body)))
+        for key, value in (headers or {}).items():
+            self.send_header(key, value)
+        self.end_headers()
+        self.wfile.write(body)
+        self.server.mock._record(status, len(body))
+
+    def _send_error(self, status: int, reason: str, headers: Optional[Dict] = None):
+        body = json.dumps({"error": True, "reason": reason}).encode()
+        self._send(status, body, "application/json", headers)
+
+    def do_GET(self):
+        mock = self.server.mock
+        url = urlparse(self.path)
+        endpoint = url.path.rstrip("/").rsplit("/", 1)[-1]
+        if endpoint == "meta.json":
+            self._send(200, json.dumps(model_meta()).encode(), "application/json")
+            return
+        if endpoint not in ("forecast", "archive"):
+            self._send_error(404, f"Unknown endpoint {url.path}")
+            return
+
+        with mock._enter() as in_flight:
+            fault = mock._draw_fault(in_flight)
+            delay = mock.latency + random.uniform(0, mock.latency_jitter)
+            if delay > 0:
+                time.sleep(delay)
+
+            if fault == "throttle":
+                self._send_error(429, "Too many concurrent requests",
+                                 {"Retry-After": str(mock.retry_after)})
+                return
+            if fault == "error":
+                self._send_error(503, "Service temporarily unavailable")
+                return
+
+            # Lists may come comma-separated or as repeated keys (requests encodes them so)
+            query = {key: ",".join(values) for key, values in parse_qs(url.query).items()}
+            started = time.perf_counter()
+            try:
+                locations = [
+                    build_location(query, endpoint, latitude, longitude, elevation)
+                    for latitude, longitude, elevation in _parse_coordinates(query)
+                ]
+            except MockApiError as e:
+                self._send_error(400, str(e))
+                return
+            generation_ms = (time.perf_counter() - started) * 1000
+
+            if query.get("format") == "flatbuffers":
+                body = b"".join(
+                    to_flatbuffer(location, generation_ms, i)
+                    for i, location in enumerate(locations)
+                )
+                self._send(200, body, "application/octet-stream")
+            else:
+                items = [to_json(location, generation_ms) for location in locations]
+                body = json.dumps(items[0] if len(items) == 1 else items).encode()
+                self._send(200, body, "application/json")
+            mock._record_locations(len(locations))
+
+
+class _InFlightCounter:
+    def __init__(self, mock):
+        self.mock = mock
+
+    def __enter__(self):
+        with self.mock._lock:
+            self.mock._in_flight += 1
+            self.mock.peak_in_flight = max(self.mock.peak_in_flight, self.mock._in_flight)
+            return self.mock._in_flight
+
+    def __exit__(self, exc_type, exc, tb):
+        with self.mock._lock:
+            self.mock._in_flight -= 1
+
+
+class MockOpenMeteoServer:
+    """
+    Local Open-Meteo stand-in running in a background thread.
+
+    Example:
+        >>> server = MockOpenMeteoServer(latency=0.1, error_rate=0.01).start()
+        >>> server.forecast_url
+        'http://127.0.0.1:53817/v1/forecast'
+        >>> server.stop()
+    """
+
+    def __init__(
+        self,
+        host: str = "127.0.0.1",
+        port: int = 0,
+        latency: float = 0.0,
+        latency_jitter: float = 0.0,
+        error_rate: float = 0.0,
+        throttle_rate: float = 0.0,
+        retry_after: int = 1,
+        max_concurrent: Optional[int] = None,
+        seed: Optional[int] = None
+    ):
+        """
+        Args:
+            host: Interface to listen on
+            port: Port (0 = any free port, see .url)
+            latency: Seconds added to every request
+            latency_jitter: Up to this many random extra seconds per request
+            error_rate: Fraction of requests answered with a 503
+            throttle_rate: Fraction of requests answered with a 429
+            retry_after: Retry-After seconds sent with 429s
+            max_concurrent: Requests in flight above this get a 429 (None = no limit)
+            seed: Seed for the fault injection (data is always deterministic)
+        """
+        self.latency = latency
+        self.latency_jitter = latency_jitter
+        self.error_rate = error_rate
+        self.throttle_rate = throttle_rate
+        self.retry_after = retry_after
+        self.max_concurrent = max_concurrent
+
+        self._random = random.Random(seed)
+        self._lock = threading.Lock()
+        self._in_flight = 0
+        self.peak_in_flight = 0
+        self._status_counts: Dict[int, int] = {}
+        self.bytes_sent = 0
+        self.locations_served = 0
+
+        self._httpd = ThreadingHTTPServer((host, port), _Handler)
+        self._httpd.daemon_threads = True
+        self._httpd.mock = self
+        self._thread = None
+
+    @property
+    def url(self) -> str:
+        host, port = self._httpd.server_address[:2]
+        return f"http://{host}:{port}"
+
+    @property
+    def forecast_url(self) -> str:
+        return f"{self.url}/v1/forecast"
+
+    @property
+    def archive_url(self) -> str:
+        return f"{self.url}/v1/archive"
+
+    @property
+    def meta_url(self) -> str:
+        """Model metadata URL with a {model} placeholder, like config.MODEL_META_URL."""
+        return f"{self.url}/data/{{model}}/static/meta.json"
+
+    def _enter(self) -> _InFlightCounter:
+        return _InFlightCounter(self)
+
+    def _draw_fault(self, in_flight: int) -> Optional[str]:
+        if self.max_concurrent is not None and in_flight > self.max_concurrent:
+            return "throttle"
+        with self._lock:
+            roll = self._random.random()
+        if roll < self.throttle_rate:
+            return "throttle"
+        if roll < self.throttle_rate + self.error_rate:
+            return "error"
+        return None
+
+    def _record(self, status: int, n_bytes: int):
+        with self._lock:
+            self._status_counts[status] = self._status_counts.get(status, 0) + 1
+            self.bytes_sent += n_bytes
+
+    def _record_locations(self, n: int):
+        with self._lock:
+            self.locations_served += n
+
+    def start(self) -> "MockOpenMeteoServer":
+        """Serve in a daemon thread; returns self."""
+        self._thread = threading.Thread(target=self._httpd.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self._httpd.shutdown()
+        self._httpd.server_close()
+        if self._thread is not None:
+            self._thread.join()
+
+    def stats(self) -> Dict:
+        """Requests by status code, bytes and locations served, peak concurrency."""
+        with self._lock:
+            statuses = dict(sorted(self._status_counts.items()))
+            return {
+                "requests": sum(statuses.values()),
+                "status_counts": statuses,
+                "bytes_sent": self.bytes_sent,
+                "locations_served": self.locations_served,
+                "peak_in_flight": self.peak_in_flight,
+            }
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, exc_type, exc, tb):
+        self.stop()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Offline Open-Meteo mock server")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=DEFAULT_PORT)
+    parser.add_argument("--latency", type=float, default=0.0, help="Seconds per request")
+    parser.add_argument("--latency-jitter", type=float, default=0.0, help="Random extra seconds")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="Fraction of 503s")
+    parser.add_argument("--throttle-rate", type=float, default=0.0, help="Fraction of 429s")
+    parser.add_argument("--retry-after", type=int, default=1, help="Retry-After seconds on 429")
+    parser.add_argument("--max-concurrent", type=int, default=None,
+                        help="429 when more requests than this are in flight")
+    args = parser.parse_args()
+
+    server = MockOpenMeteoServer(
+        args.host, args.port, args.latency, args.latency_jitter,
+        args.error_rate, args.throttle_rate, args.retry_after, args.max_concurrent
+    )
+    print(f"🧪 Mock Open-Meteo API on {server.url} (forecast: {server.forecast_url}, "
+          f"archive: {server.archive_url}, model metadata: {server.meta_url})")
+    try:
+        server._httpd.serve_forever()
+    except KeyboardInterrupt:
+        print(f"\nStopped. {server.stats()}")
+    finally:
+        server._httpd.server_close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,144 @@
+"""
+Forecast model run tracking.
+
+Forecast models are re-run on a fixed cycle (every 6 hours for ECMWF IFS
+and GFS). Between runs the API returns the same forecast, so we remember
+which run each location was last fetched from and only call the API when
+a newer run is available.
+"""
+
+import json
+import os
+import threading
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+from typing import Dict, List, Optional
+
+import requests
+
+try:
+    from .config import (
+        FORECAST_MODELS,
+        MODEL_META_URL,
+        FORECAST_RUN_CYCLE_HOURS,
+        FORECAST_RUN_DELAY_HOURS,
+        RAW_FORECAST_DIR,
+    )
+except ImportError:
+    from config import (
+        FORECAST_MODELS,
+        MODEL_META_URL,
+        FORECAST_RUN_CYCLE_HOURS,
+        FORECAST_RUN_DELAY_HOURS,
+        RAW_FORECAST_DIR,
+    )
+
+
+FORECAST_STATE_PATH = RAW_FORECAST_DIR / "forecast_state.json"
+
+
+def expected_latest_run(now: Optional[datetime] = None) -> datetime:
+    """
+    Estimate the newest model run that should be available by now.
+
+    Runs start every FORECAST_RUN_CYCLE_HOURS (00/06/12/18 UTC) and take
+    about FORECAST_RUN_DELAY_HOURS to show up in the API.
+    """
+    if now is None:
+        now = datetime.now(timezone.utc)
+    available = now - timedelta(hours=FORECAST_RUN_DELAY_HOURS)
+    cycle_hour = available.hour - available.hour % FORECAST_RUN_CYCLE_HOURS
+    return available.replace(hour=cycle_hour, minute=0, second=0, microsecond=0)
+
+
+def next_expected_run(now: Optional[datetime] = None) -> datetime:
+    """When the run after expected_latest_run() should become available."""
+    if now is None:
+        now = datetime.now(timezone.utc)
+    return (
+        expected_latest_run(now)
+        + timedelta(hours=FORECAST_RUN_CYCLE_HOURS + FORECAST_RUN_DELAY_HOURS)
+    )
+
+
+def fetch_latest_run(
+    models: Optional[List[str]] = None,
+    session: Optional[requests.Session] = None
+) -> datetime:
+    """
+    Ask Open-Meteo for the newest model run available for our models.
+
+    Falls back to expected_latest_run() if the metadata can't be fetched.
+    Metadata requests don't count towards the weather API quota.
+
+    Returns:
+        Initialisation time (UTC) of the newest run across the models
+    """
+    if models is None:
+        models = FORECAST_MODELS
+    if session is None:
+        session = requests.Session()
+
+    runs = []
+    for model in models:
+        try:
+            response = session.get(MODEL_META_URL.format(model=model), timeout=10)
+            response.raise_for_status()
+            runs.append(datetime.fromtimestamp(
+                response.json()["last_run_initialisation_time"], tz=timezone.utc
+            ))
+        except (requests.RequestException, KeyError, ValueError) as e:
+            print(f"   ⚠️  Could not read model run for {model}: {e}")
+
+    if not runs:
+        return expected_latest_run()
+    return max(runs)
+
+
+class ForecastState:
+    """
+    Last model run fetched per location, persisted as JSON.
+
+    Example:
+        >>> state = ForecastState()
+        >>> state.is_current('cape_town', latest_run)
+        False
+        >>> state.record('cape_town', latest_run)
+    """
+
+    def __init__(self, path: Path = FORECAST_STATE_PATH):
+        self.path = Path(path)
+        self.locations: Dict[str, Dict] = {}
+        self._lock = threading.Lock()
+
+        if self.path.exists():
+            with open(self.path, "r", encoding="utf-8") as f:
+                self.locations = json.load(f)
+
+    def last_run(self, location_code: str) -> Optional[datetime]:
+        """Model run the location was last fetched from (None if never)."""
+        entry = self.locations.get(location_code)
+        if entry is None:
+            return None
+        return datetime.fromisoformat(entry["model_run"])
+
+    def is_current(self, location_code: str, latest_run: datetime) -> bool:
+        """True if we already have the latest run for this location."""
+        last_run = self.last_run(location_code)
+        return last_run is not None and last_run >= latest_run
+
+    def record(self, location_code: str, model_run: datetime):
+        """Remember that the location now holds data from model_run."""
+        with self._lock:
+            self.locations[location_code] = {
+                "model_run": model_run.isoformat(),
+                "fetched_at": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+            }
+            self._save()
+
+    def _save(self):
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = self.path.with_suffix(".tmp")
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(self.locations, f, indent=2)
+        os.replace(tmp_path, self.path)
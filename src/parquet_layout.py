@@ -0,0 +1,205 @@
+"""
+Query-friendly Parquet layout for the processed datasets.
+
+A reader can only skip the parts of a file whose statistics rule them
+out. With one big row group, or rows in date-then-location order, every
+row group holds every city and every month, so nothing can be skipped.
+The layout here:
+
+- rows sorted by (location_code, date), recorded as the file's sorting columns
+- hourly data: one row group per calendar month (PARQUET_ROW_GROUP_SPANS),
+  capped at PARQUET_ROW_GROUP_MAX_ROWS: min/max of date per row group then
+  prune a season query to 3 of 12 row groups per year; daily data has too
+  few rows per month for that (the footer would outweigh the data) and
+  gets one row group per year
+- page indexes (column/offset indexes) for page-level pruning inside a
+  row group (DuckDB, Arrow C++ page filtering)
+- dictionary encoding (locations and codes, but also the measurements:
+  the API rounds them to 1-2 decimals, so most columns have few distinct
+  values; a column whose dictionary grows too large falls back to plain)
+- selectable compression and level (zstd by default)
+
+Example:
+    >>> layout = ParquetLayout.for_frequency("hourly", compression="zstd", compression_level=9)
+    >>> with LayoutWriter(path, table.schema, layout) as writer:
+    ...     writer.write_table(sort_table(table))
+"""
+
+from pathlib import Path
+from typing import Dict, Iterator, List, Optional, Tuple
+
+import numpy as np
+import pyarrow as pa
+import pyarrow.compute as pc
+import pyarrow.parquet as pq
+
+try:
+    from .config import (
+        PARQUET_COMPRESSION, PARQUET_COMPRESSION_LEVEL, PARQUET_ROW_GROUP_SPANS,
+        PARQUET_ROW_GROUP_MAX_ROWS, PARQUET_PAGE_INDEX
+    )
+except ImportError:
+    from config import (
+        PARQUET_COMPRESSION, PARQUET_COMPRESSION_LEVEL, PARQUET_ROW_GROUP_SPANS,
+        PARQUET_ROW_GROUP_MAX_ROWS, PARQUET_PAGE_INDEX
+    )
+
+
+COMPRESSIONS = ("zstd", "snappy", "gzip", "lz4", "brotli", "none")
+ROW_GROUP_SPANS = ("month", "year", None)
+
+# Sort order of the rows (columns missing from a file, e.g. location_code
+# kept in the partition path, are left out)
+SORT_COLUMNS = ("location_code", "date")
+
+
+class ParquetLayout:
+    """
+    How processed Parquet files are written (defaults from config.py).
+    """
+
+    def __init__(
+        self,
+        compression: str = PARQUET_COMPRESSION,
+        compression_level: Optional[int] = PARQUET_COMPRESSION_LEVEL,
+        row_group_span: Optional[str] = PARQUET_ROW_GROUP_SPANS["hourly"],
+        max_row_group_rows: int = PARQUET_ROW_GROUP_MAX_ROWS,
+        page_index: bool = PARQUET_PAGE_INDEX
+    ):
+        """
+        Args:
+            compression: One of COMPRESSIONS
+            compression_level: Codec level (zstd 1-22), None = codec default
+            row_group_span: Start a new row group every 'month' / 'year'
+                of dates (None = only the size limit)
+            max_row_group_rows: Upper limit on rows per row group
+            page_index: Write column and offset indexes
+        """
+        if compression not in COMPRESSIONS:
+            raise ValueError(f"Unknown compression: {compression} (use one of {COMPRESSIONS})")
+        if row_group_span not in ROW_GROUP_SPANS:
+            raise ValueError(f"Unknown row group span: {row_group_span} (use one of {ROW_GROUP_SPANS})")
+        self.compression = compression
+        # Levels only mean something to these codecs
+        self.compression_level = compression_level if compression in ("zstd", "gzip", "brotli") else None
+        self.row_group_span = row_group_span
+        self.max_row_group_rows = max_row_group_rows
+        self.page_index = page_index
+
+    @classmethod
+    def for_frequency(cls, frequency: str, **options) -> "ParquetLayout":
+        """Layout for the 'hourly' or 'daily' dataset (its row group span from config.py)."""
+        if frequency not in PARQUET_ROW_GROUP_SPANS:
+            raise ValueError(f"Unknown frequency: {frequency} (use one of {list(PARQUET_ROW_GROUP_SPANS)})")
+        options.setdefault("row_group_span", PARQUET_ROW_GROUP_SPANS[frequency])
+        return cls(**options)
+
+    def __repr__(self):
+        level = f"-{self.compression_level}" if self.compression_level is not None else ""
+        return (f"ParquetLayout({self.compression}{level}, row groups per {self.row_group_span or 'size'}"
+                f" <= {self.max_row_group_rows:,} rows, page index {'on' if self.page_index else 'off'})")
+
+    def writer_options(self, schema: pa.Schema) -> Dict:
+        """Keyword arguments for pq.ParquetWriter / pq.write_table."""
+        sort_columns = [name for name in SORT_COLUMNS if name in schema.names]
+        return {
+            "compression": self.compression,
+            "compression_level": self.compression_level,
+            "use_dictionary": True,
+            "write_statistics": True,
+            "write_page_index": self.page_index,
+            "sorting_columns": [pq.SortingColumn(schema.get_field_index(name)) for name in sort_columns],
+        }
+
+    def spans(self, table: pa.Table) -> Optional[np.ndarray]:
+        """Row group span id of every row (e.g. year * 12 + month), None if not split by date."""
+        if self.row_group_span is None or "date" not in table.column_names or len(table) == 0:
+            return None
+        dates = table.column("date")
+        years = pc.year(dates).to_numpy().astype(np.int64)
+        if self.row_group_span == "year":
+            return years
+        return years * 12 + pc.month(dates).to_numpy().astype(np.int64)
+
+
+def sort_table(table: pa.Table) -> pa.Table:
+    """Sort rows by (location_code, date), whichever of the two the table has."""
+    keys = [(name, "ascending") for name in SORT_COLUMNS if name in table.column_names]
+    if not keys:
+        return table
+    return table.take(pc.sort_indices(table, sort_keys=keys))
+
+
+def _split(table: pa.Table, spans: Optional[np.ndarray]) -> Iterator[Tuple[pa.Table, Optional[int]]]:
+    """Slice a table where the span id changes (rows are already sorted)."""
+    if spans is None:
+        yield table, None
+        return
+    starts = np.flatnonzero(np.diff(spans)) + 1
+    bounds = [0] + starts.tolist() + [len(table)]
+    for start, end in zip(bounds[:-1], bounds[1:]):
+        yield table.slice(start, end - start), int(spans[start])
+
+
+class LayoutWriter:
+    """
+    ParquetWriter that cuts row groups at span boundaries and the size limit.
+
+    Tables can be written in any chunking (e.g. the chunks of a streaming
+    merge): rows are buffered until their month (or year) is complete, so
+    a month never ends up split over two row groups unless it exceeds
+    max_row_group_rows. Rows must arrive sorted.
+    """
+
+    def __init__(self, path: Path, schema: pa.Schema, layout: Optional[ParquetLayout] = None):
+        self.layout = layout or ParquetLayout()
+        self.schema = schema
+        self.writer = pq.ParquetWriter(str(path), schema, **self.layout.writer_options(schema))
+        self._pending: List[pa.Table] = []
+        self._pending_rows = 0
+        self._span = None
+        self.rows = 0
+        self.row_groups = 0
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+
+    def _flush(self):
+        if not self._pending:
+            return
+        table = pa.concat_tables(self._pending)
+        self.writer.write_table(table, row_group_size=self.layout.max_row_group_rows)
+        self.rows += len(table)
+        self.row_groups += -(-len(table) // self.layout.max_row_group_rows)
+        self._pending = []
+        self._pending_rows = 0
+
+    def write_table(self, table: pa.Table):
+        """Add sorted rows (a new row group starts whenever the span changes)."""
+        for piece, span in _split(table, self.layout.spans(table)):
+            if span != self._span:
+                self._flush()
+                self._span = span
+            self._pending.append(piece)
+            self._pending_rows += len(piece)
+            if self._pending_rows >= self.layout.max_row_group_rows:
+                self._flush()
+
+    def close(self):
+        self._flush()
+        self.writer.close()
+
+
+def write_table(table: pa.Table, path: Path, layout: Optional[ParquetLayout] = None) -> Dict:
+    """
+    Sort a table by (location_code, date) and write it with the layout.
+
+    Returns:
+        Dict with rows and row_groups written
+    """
+    with LayoutWriter(path, table.schema, layout) as writer:
+        writer.write_table(sort_table(table))
+    return {"rows": writer.rows, "row_groups": writer.row_groups}
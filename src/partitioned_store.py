@@ -0,0 +1,473 @@
+"""
+Partitioned, append-only Parquet store for the processed weather data.
+
+    <root>/location_code=<code>/year=<yyyy>/part-<timestamp>-<pid>.parquet
+    (partition_by='month': <root>/location_code=<code>/year=<yyyy>/month=<mm>/...)
+
+- New rows land in NEW files; existing files are left alone as long as the
+  new rows start after the last date already in their partition
+- Only partitions whose dates overlap the new rows are rewritten (existing +
+  new rows, deduplicated on date, last write wins), never the whole store;
+  the rewrite streams the old files and new rows through a sort-merge
+  (stream_merge.py) within PROCESSING_MEMORY_MB
+- location_code and year (and month) are stored in the directory names
+  (Hive style), so pd.read_parquet(root) and pyarrow.dataset return them
+  as columns and can skip whole directories when filtering on them
+- Files are written under a dot-prefixed temp name and renamed into place;
+  readers skip dot- and underscore-prefixed files (e.g. _ingest_manifest.json)
+- Files are sorted by date, with one row group per month (hourly) or year
+  (daily), statistics and page indexes (parquet_layout.py): with
+  location_code in the path, a query for one city opens only its directory
+  and one for a season only the matching row groups
+- Columns are written and read in the compact weather_schema.py types
+  (float32 measurements, int8 codes, categorical locations); files written
+  before that are cast on read
+- Incremental runs leave many small files per partition; compact_partition()
+  merges them into target-sized files in a hidden sibling directory and
+  swaps the whole directory in at once, so a reader lists either all old
+  or all new files
+
+Example:
+    >>> store = PartitionedStore(PROCESSED_HOURLY_DATASET)
+    >>> store.append(new_rows_df)
+    {'rows': 720, 'files_written': 1, 'partitions_rewritten': 0}
+    >>> store.read(columns=['date', 'temperature_2m'],
+    ...            filter=pc.field('location_code') == 'cape_town')
+"""
+
+import ctypes
+import errno
+import math
+import os
+import shutil
+from datetime import datetime
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional
+
+import pandas as pd
+import pyarrow as pa
+import pyarrow.dataset as ds
+import pyarrow.fs as fs
+import pyarrow.parquet as pq
+
+try:
+    from .config import PROCESSED_HOURLY_DATASET, PROCESSED_PARTITION_BY, PROCESSING_MEMORY_MB
+    from .parquet_layout import LayoutWriter, ParquetLayout
+    from .stream_merge import chunk_rows, iter_parquet, iter_table, merge_sorted
+    from .weather_schema import arrow_schema, column_type, conform_table, to_pandas
+except ImportError:
+    from config import PROCESSED_HOURLY_DATASET, PROCESSED_PARTITION_BY, PROCESSING_MEMORY_MB
+    from parquet_layout import LayoutWriter, ParquetLayout
+    from stream_merge import chunk_rows, iter_parquet, iter_table, merge_sorted
+    from weather_schema import arrow_schema, column_type, conform_table, to_pandas
+
+
+# partition_by -> directory levels below location_code=<code>
+PARTITION_KEYS = {
+    "year": ("year",),
+    "month": ("year", "month"),
+}
+
+# renameat2() arguments (Linux)
+_AT_FDCWD = -100
+_RENAME_EXCHANGE = 2
+
+
+def _is_hidden(path: Path, root: Path) -> bool:
+    """Dot- or underscore-prefixed file or directory anywhere below root."""
+    return any(part.startswith((".", "_")) for part in path.relative_to(root).parts)
+
+
+def _union_schema(schemas: Iterable[pa.Schema]) -> pa.Schema:
+    """Registry schema with every column of several files, in first-seen order."""
+    names = []
+    for schema in schemas:
+        names += [name for name in schema.names if name not in names]
+    return arrow_schema(names)
+
+
+def _exchange_dirs(a: Path, b: Path) -> bool:
+    """
+    Swap two directories in one atomic step (Linux renameat2 RENAME_EXCHANGE).
+
+    Returns:
+        False if the platform or filesystem cannot do it (nothing changed)
+    """
+    try:
+        renameat2 = ctypes.CDLL(None, use_errno=True).renameat2
+    except (AttributeError, OSError, TypeError):
+        return False
+    if renameat2(_AT_FDCWD, os.fsencode(a), _AT_FDCWD, os.fsencode(b), _RENAME_EXCHANGE) == 0:
+        return True
+    error = ctypes.get_errno()
+    if error in (errno.EINVAL, errno.ENOSYS, errno.EOPNOTSUPP):
+        return False
+    raise OSError(error, os.strerror(error), str(a))
+
+
+def _file_stats(path: Path) -> Dict:
+    """Rows and date range of one file, from the footer only (no data read)."""
+    metadata = pq.ParquetFile(path).metadata
+    stats = {"rows": metadata.num_rows, "bytes": path.stat().st_size, "start": None, "end": None}
+    names = metadata.schema.names
+    if "date" not in names:
+        return stats
+
+    column = names.index("date")
+    for i in range(metadata.num_row_groups):
+        statistics = metadata.row_group(i).column(column).statistics
+        if statistics is None or not statistics.has_min_max:
+            continue
+        low = pd.Timestamp(statistics.min)
+        high = pd.Timestamp(statistics.max)
+        if low.tzinfo is None:
+            low, high = low.tz_localize("UTC"), high.tz_localize("UTC")
+        stats["start"] = low if stats["start"] is None else min(stats["start"], low)
+        stats["end"] = high if stats["end"] is None else max(stats["end"], high)
+    return stats
+
+
+class PartitionedStore:
+    """
+    Hive-partitioned Parquet dataset, one directory per location and period.
+    """
+
+    def __init__(
+        self,
+        root: Path = PROCESSED_HOURLY_DATASET,
+        partition_by: str = PROCESSED_PARTITION_BY,
+        layout: Optional[ParquetLayout] = None,
+        memory_mb: int = PROCESSING_MEMORY_MB
+    ):
+        """
+        Args:
+            root: Dataset directory
+            partition_by: 'year' or 'month' (below location_code)
+            layout: How new files are written (compression, row groups,
+                page indexes; default: ParquetLayout.for_frequency('hourly'),
+                pass the 'daily' one for daily data)
+            memory_mb: Memory budget for rewriting a partition
+        """
+        if partition_by not in PARTITION_KEYS:
+            raise ValueError(f"Unknown partition_by: {partition_by} (use 'year' or 'month')")
+        self.root = Path(root)
+        self.partition_by = partition_by
+        self.keys = PARTITION_KEYS[partition_by]
+        self.layout = layout or ParquetLayout()
+        self.memory_mb = memory_mb
+        self._file_count = 0
+
+    # ------------------------------------------------------------------
+    # Layout
+    # ------------------------------------------------------------------
+
+    def partition_dir(self, location_code: str, values: tuple) -> Path:
+        """Directory of one partition, e.g. <root>/location_code=durban/year=2024."""
+        path = self.root / f"location_code={location_code}"
+        for key, value in zip(self.keys, values):
+            path = path / (f"{key}={int(value):02d}" if key == "month" else f"{key}={int(value)}")
+        return path
+
+    def files(self, location_code: Optional[str] = None) -> List[Path]:
+        """Data files (optionally of one location), in write order within each partition."""
+        if not self.root.exists():
+            return []
+        base = self.root / f"location_code={location_code}" if location_code else self.root
+        pattern = "*/" * (len(self.keys) + (0 if location_code else 1)) + "*.parquet"
+        # Hidden names are temp files and compaction directories
+        return sorted(
+            path for path in base.glob(pattern)
+            if not _is_hidden(path, self.root)
+        )
+
+    def partitions(self, location_code: Optional[str] = None) -> List[Path]:
+        """Partition directories that hold data files."""
+        return sorted({path.parent for path in self.files(location_code)})
+
+    def location_codes(self) -> List[str]:
+        if not self.root.exists():
+            return []
+        return sorted(
+            path.name.split("=", 1)[1]
+            for path in self.root.glob("location_code=*") if path.is_dir()
+        )
+
+    def is_empty(self) -> bool:
+        return not self.files()
+
+    # ------------------------------------------------------------------
+    # Metadata
+    # ------------------------------------------------------------------
+
+    def summary(self) -> Dict:
+        """Files, rows, bytes, locations and date range (footers only)."""
+        summary = {"files": 0, "rows": 0, "bytes": 0, "locations": 0, "start": None, "end": None}
+        for path in self.files():
+            stats = _file_stats(path)
+            summary["files"] += 1
+            summary["rows"] += stats["rows"]
+            summary["bytes"] += stats["bytes"]
+            if stats["start"] is not None:
+                summary["start"] = stats["start"] if summary["start"] is None else min(summary["start"], stats["start"])
+                summary["end"] = stats["end"] if summary["end"] is None else max(summary["end"], stats["end"])
+        summary["locations"] = len(self.location_codes())
+        return summary
+
+    # ------------------------------------------------------------------
+    # Writing
+    # ------------------------------------------------------------------
+
+    def _partition_values(self, dates: pd.Series) -> pd.DataFrame:
+        dates = pd.to_datetime(dates, utc=True)
+        values = pd.DataFrame({"year": dates.dt.year}, index=dates.index)
+        if "month" in self.keys:
+            values["month"] = dates.dt.month
+        return values
+
+    def _write_tables(self, partition_dir: Path, schema: pa.Schema, tables: Iterable[pa.Table]) -> Path:
+        """Write one new file into a partition, chunk by chunk (temp name + rename)."""
+        partition_dir.mkdir(parents=True, exist_ok=True)
+        self._file_count += 1
+        name = f"part-{datetime.now().strftime('%Y%m%dT%H%M%S%f')}-{os.getpid()}-{self._file_count:04d}.parquet"
+        file_path = partition_dir / name
+        tmp_path = partition_dir / f".{name}.tmp"
+
+        try:
+            with LayoutWriter(tmp_path, schema, self.layout) as writer:
+                for table in tables:
+                    writer.write_table(table)
+        except BaseException:
+            tmp_path.unlink(missing_ok=True)
+            raise
+        os.replace(tmp_path, file_path)
+        return file_path
+
+    def _write_file(self, partition_dir: Path, df: pd.DataFrame) -> Path:
+        """Write one new file into a partition."""
+        table = conform_table(pa.Table.from_pandas(df, preserve_index=False))
+        return self._write_tables(partition_dir, table.schema, [table])
+
+    def _rewrite_partition(self, partition_dir: Path, old_files: List[Path], new_df: pd.DataFrame):
+        """Replace a partition's files with existing + new rows (new rows win), streamed."""
+        new_table = conform_table(pa.Table.from_pandas(new_df, preserve_index=False))
+        schema = _union_schema([pq.read_schema(path) for path in old_files] + [new_table.schema])
+
+        # Old files oldest first, new rows last: on equal dates the new row wins
+        rows = chunk_rows(schema, n_sources=len(old_files) + 1, memory_mb=self.memory_mb)
+        sources = [iter_parquet(path, rows) for path in old_files] + [iter_table(new_table, rows)]
+
+        # New file is in place before the old ones go: never a moment without the data
+        self._write_tables(partition_dir, schema, merge_sorted(sources, schema, key="date"))
+        for path in old_files:
+            path.unlink()
+
+    def append(self, df: pd.DataFrame) -> Dict:
+        """
+        Add rows (any mix of locations and periods) to the store.
+
+        Args:
+            df: Rows with at least 'date' and 'location_code' columns
+
+        Returns:
+            Dict with rows, files_written and partitions_rewritten
+        """
+        result = {"rows": 0, "files_written": 0, "partitions_rewritten": 0}
+        if df is None or len(df) == 0:
+            return result
+
+        values = self._partition_values(df["date"])
+        group_keys = [df["location_code"]] + [values[key] for key in self.keys]
+
+        for group, part_df in df.groupby(group_keys, sort=True):
+            location_code, partition_values = group[0], group[1:]
+            partition_dir = self.partition_dir(location_code, partition_values)
+
+            # Partition values live in the path, not in the file
+            part_df = part_df.drop(columns=["location_code"])
+            part_df = part_df.drop_duplicates(subset=["date"], keep="last").sort_values("date")
+
+            old_files = sorted(
+                path for path in partition_dir.glob("*.parquet")
+                if not path.name.startswith((".", "_"))
+            )
+            last_date = None
+            for path in old_files:
+                end = _file_stats(path)["end"]
+                if end is not None:
+                    last_date = end if last_date is None else max(last_date, end)
+
+            if last_date is None or part_df["date"].min() > last_date:
+                self._write_file(partition_dir, part_df)
+            else:
+                self._rewrite_partition(partition_dir, old_files, part_df)
+                result["partitions_rewritten"] += 1
+
+            result["rows"] += len(part_df)
+            result["files_written"] += 1
+
+        return result
+
+    # ------------------------------------------------------------------
+    # Compaction
+    # ------------------------------------------------------------------
+
+    def _partition_files(self, partition_dir: Path) -> List[Path]:
+        return sorted(
+            path for path in partition_dir.glob("*.parquet")
+            if not path.name.startswith((".", "_"))
+        )
+
+    def compaction_plan(self, partition_dir: Path, target_bytes: int) -> Optional[Dict]:
+        """
+        What compacting one partition would do (None if it is compact already).
+
+        A partition is compacted when its data fits in fewer files of
+        target_bytes than it has now.
+
+        Returns:
+            Dict with partition, files, bytes, rows and files_after
+        """
+        files = self._partition_files(partition_dir)
+        stats = [_file_stats(path) for path in files]
+        total_bytes = sum(stat["bytes"] for stat in stats)
+        files_after = max(1, math.ceil(total_bytes / target_bytes))
+        if len(files) <= files_after:
+            return None
+        return {
+            "partition": partition_dir,
+            "files": files,
+            "bytes": total_bytes,
+            "rows": sum(stat["rows"] for stat in stats),
+            "files_after": files_after,
+        }
+
+    def compact_partition(self, partition_dir: Path, target_bytes: int) -> Optional[Dict]:
+        """
+        Merge a partition's files into as few files of about target_bytes as fit.
+
+        The files are streamed through the same sort-merge as a rewrite (in
+        write order, so on a duplicate date the newer row wins), and written
+        with the store's layout (sorted, row group statistics, page indexes)
+        into a hidden sibling directory. That directory is then swapped
+        with the partition in one rename, and the old files are removed.
+
+        Do not run it while process_to_parquet.py is writing: a partition
+        whose files change in the meantime is left as it was.
+
+        Returns:
+            The compaction_plan() plus files_written, bytes_after and
+            atomic (False if the swap took two renames), or None if the
+            partition was compact already or changed while compacting
+        """
+        plan = self.compaction_plan(partition_dir, target_bytes)
+        if plan is None:
+            return None
+        old_files = plan["files"]
+        schema = _union_schema(pq.read_schema(path) for path in old_files)
+
+        rows_per_file = math.ceil(plan["rows"] / plan["files_after"])
+        rows = min(chunk_rows(schema, n_sources=len(old_files), memory_mb=self.memory_mb), rows_per_file)
+        chunks = merge_sorted([iter_parquet(path, rows) for path in old_files], schema, key="date")
+
+        # Every date is in exactly one merged chunk, so files can be cut
+        # between any two chunks and stay non-overlapping
+        pending = [next(chunks, None)]
+
+        def file_chunks():
+            written = 0
+            while pending[0] is not None and written < rows_per_file:
+                chunk = pending[0]
+                yield chunk
+                written += len(chunk)
+                pending[0] = next(chunks, None)
+
+        work_dir = partition_dir.parent / f".{partition_dir.name}.compact-{os.getpid()}"
+        shutil.rmtree(work_dir, ignore_errors=True)
+        try:
+            new_files = []
+            while pending[0] is not None:
+                new_files.append(self._write_tables(work_dir, schema, file_chunks()))
+
+            if self._partition_files(partition_dir) != old_files:
+                shutil.rmtree(work_dir)
+                return None
+
+            atomic = _exchange_dirs(work_dir, partition_dir)
+            if not atomic:
+                # Two renames: for a moment the partition directory is missing
+                old_dir = partition_dir.parent / f".{partition_dir.name}.old-{os.getpid()}"
+                os.rename(partition_dir, old_dir)
+                try:
+                    os.rename(work_dir, partition_dir)
+                except BaseException:
+                    os.rename(old_dir, partition_dir)
+                    raise
+                work_dir = old_dir
+        except BaseException:
+            shutil.rmtree(work_dir, ignore_errors=True)
+            raise
+        # The old files, now in the hidden directory
+        shutil.rmtree(work_dir)
+
+        return {
+            **plan,
+            "files_written": len(new_files),
+            "bytes_after": sum(path.stat().st_size for path in self._partition_files(partition_dir)),
+            "atomic": atomic,
+        }
+
+    def drop_location(self, location_code: str):
+        """Remove every partition of a location."""
+        shutil.rmtree(self.root / f"location_code={location_code}", ignore_errors=True)
+
+    def clear(self):
+        """Remove every partition (files outside location_code=* dirs are kept)."""
+        for location_code in self.location_codes():
+            self.drop_location(location_code)
+
+    # ------------------------------------------------------------------
+    # Reading
+    # ------------------------------------------------------------------
+
+    def partitioning(self) -> ds.Partitioning:
+        fields = [("location_code", pa.string())] + [(key, column_type(key)) for key in self.keys]
+        return ds.partitioning(pa.schema(fields), flavor="hive")
+
+    def dataset(self, location_codes: Optional[List[str]] = None,
+                memory_map: bool = False) -> Optional[ds.Dataset]:
+        """
+        pyarrow dataset over all files (None if the store is empty).
+
+        Every column gets its weather_schema.py type, so columns added
+        later (e.g. a new variable profile) are read as nulls for older
+        files, and files written as float64 are read as float32.
+
+        Args:
+            location_codes: Only include these locations' directories (the
+                other files are not even listed)
+            memory_map: Read the files through memory maps instead of reads
+                into buffers
+        """
+        if location_codes is None:
+            files = self.files()
+        else:
+            files = [path for code in location_codes for path in self.files(code)]
+        if not files:
+            return None
+        partitioning = self.partitioning()
+        names = []
+        for path in files:
+            names += [name for name in pq.read_schema(path, memory_map=memory_map).names if name not in names]
+        schema = pa.unify_schemas([arrow_schema(names), partitioning.schema])
+        return ds.dataset(
+            [str(path) for path in files], schema=schema, format="parquet",
+            filesystem=fs.LocalFileSystem(use_mmap=memory_map),
+            partitioning=partitioning, partition_base_dir=str(self.root),
+        )
+
+    def read(self, columns: Optional[List[str]] = None, filter=None) -> pd.DataFrame:
+        """Read (part of) the store into pandas, e.g. filter=pc.field('year') == 2024."""
+        dataset = self.dataset()
+        if dataset is None:
+            return pd.DataFrame(columns=columns or [])
+        return to_pandas(conform_table(dataset.to_table(columns=columns, filter=filter)))
@@ -0,0 +1,332 @@
+"""
+Rate limiting for the Open-Meteo API.
+Keeps concurrent fetchers inside the per-minute, per-hour and per-day limits.
+
+- RateLimiter: in-process token buckets (one process, many threads)
+- RateLimitLedger: persisted sliding-window ledger shared by all processes
+"""
+
+import json
+import math
+import os
+import threading
+import time
+from pathlib import Path
+from typing import Dict, List, Optional
+
+try:
+    from .config import API_RATE_LIMITS, RATE_LIMIT_LEDGER_PATH
+except ImportError:
+    from config import API_RATE_LIMITS, RATE_LIMIT_LEDGER_PATH
+
+
+# Length of each rate limit window in seconds
+WINDOW_SECONDS = {
+    "minute": 60,
+    "hour": 3600,
+    "day": 86400,
+}
+
+
+def estimate_call_weight(
+    n_variables: int,
+    n_days: int,
+    n_locations: int = 1
+) -> float:
+    """
+    Estimate how many API calls a request counts as.
+
+    Open-Meteo counts a request with more than 10 variables or more than
+    2 weeks of data as multiple calls (fractional, per location).
+
+    Args:
+        n_variables: Total hourly + daily variables requested
+        n_days: Number of days in the date range
+        n_locations: Number of coordinates in the request
+
+    Returns:
+        Weight of the request in API calls
+
+    Example:
+        >>> estimate_call_weight(20, 28)
+        4.0
+    """
+    variable_factor = max(1.0, n_variables / 10)
+    day_factor = max(1.0, n_days / 14)
+    return variable_factor * day_factor * max(1, n_locations)
+
+
+class TokenBucket:
+    """
+    Thread-safe token bucket.
+
+    The bucket holds up to `capacity` tokens and refills continuously at
+    `capacity / period` tokens per second.
+    """
+
+    def __init__(self, capacity: float, period: float):
+        self.capacity = float(capacity)
+        self.rate = self.capacity / period
+        self.tokens = self.capacity
+        self.updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def _refill(self, now: float):
+        elapsed = now - self.updated
+        self.tokens = min(self.capacity, self.tokens + elapsed * self.rate)
+        self.updated = now
+
+    def wait_time(self, tokens: float) -> float:
+        """
+        Seconds until `tokens` can be taken from the bucket.
+
+        Requests larger than the whole bucket only wait for a full bucket
+        (they then leave it in debt, which later requests pay back).
+        """
+        with self._lock:
+            self._refill(time.monotonic())
+            needed = min(tokens, self.capacity)
+            if self.tokens >= needed:
+                return 0.0
+            return (needed - self.tokens) / self.rate
+
+    def consume(self, tokens: float):
+        """Take tokens from the bucket without waiting."""
+        with self._lock:
+            self._refill(time.monotonic())
+            self.tokens -= tokens
+
+
+class RateLimiter:
+    """
+    Combines one token bucket per rate limit window.
+
+    Safe to share between worker threads: acquire() blocks only as long as
+    the tightest window needs.
+    """
+
+    def __init__(self, limits: Optional[Dict[str, int]] = None, headroom: float = 0.9):
+        """
+        Args:
+            limits: Calls allowed per window, e.g. {'minute': 600} (default: API_RATE_LIMITS)
+            headroom: Fraction of each limit we allow ourselves to use
+        """
+        if limits is None:
+            limits = API_RATE_LIMITS
+
+        self.buckets = {
+            window: TokenBucket(calls * headroom, WINDOW_SECONDS[window])
+            for window, calls in limits.items()
+        }
+        self._lock = threading.Lock()
+        self.total_calls = 0.0
+        self.total_wait = 0.0
+
+    def acquire(self, weight: float = 1.0) -> float:
+        """
+        Block until a request of the given weight is allowed, then consume it.
+
+        Args:
+            weight: Number of API calls the request counts as
+
+        Returns:
+            Seconds spent waiting
+        """
+        waited = 0.0
+
+        # One thread at a time reserves tokens, so waiters are served in turn
+        with self._lock:
+            while True:
+                delay = max(bucket.wait_time(weight) for bucket in self.buckets.values())
+                if delay <= 0:
+                    break
+                # Wake up a little late rather than spin on float rounding
+                delay = math.ceil(delay * 100) / 100
+                time.sleep(delay)
+                waited += delay
+
+            for bucket in self.buckets.values():
+                bucket.consume(weight)
+
+            self.total_calls += weight
+            self.total_wait += waited
+
+        return waited
+
+    def usage(self) -> Dict[str, float]:
+        """Calls currently drawn from each window's bucket."""
+        return {
+            window: max(bucket.capacity - bucket.tokens, 0.0)
+            for window, bucket in self.buckets.items()
+        }
+
+
+class _FileLock:
+    """
+    Exclusive lock on a file, shared by every process on the machine.
+
+    Uses fcntl on Linux/macOS and msvcrt on Windows.
+    """
+
+    def __init__(self, path: Path):
+        self.path = path
+        self._file = None
+
+    def __enter__(self):
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._file = open(self.path, "a+")
+        if os.name == "nt":
+            import msvcrt
+            self._file.seek(0)
+            # LK_LOCK retries for ~10 s, so loop until we get it
+            while True:
+                try:
+                    msvcrt.locking(self._file.fileno(), msvcrt.LK_LOCK, 1)
+                    break
+                except OSError:
+                    continue
+        else:
+            import fcntl
+            fcntl.flock(self._file.fileno(), fcntl.LOCK_EX)
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        if os.name == "nt":
+            import msvcrt
+            self._file.seek(0)
+            msvcrt.locking(self._file.fileno(), msvcrt.LK_UNLCK, 1)
+        else:
+            import fcntl
+            fcntl.flock(self._file.fileno(), fcntl.LOCK_UN)
+        self._file.close()
+        self._file = None
+
+
+class RateLimitLedger:
+    """
+    Persistent sliding-window record of API calls, shared across processes.
+
+    Every call (with its weight) is written to a JSON ledger under data/,
+    guarded by a file lock. Before a request we look at what ALL scripts
+    have spent in the last minute/hour/day and either record the call or
+    return exactly how long to wait until the oldest blocking call expires.
+
+    Has the same acquire() interface as RateLimiter, so either can be
+    passed to the fetch code.
+    """
+
+    def __init__(
+        self,
+        path: Optional[Path] = None,
+        limits: Optional[Dict[str, int]] = None,
+        headroom: float = 0.9
+    ):
+        """
+        Args:
+            path: Ledger file (default: RATE_LIMIT_LEDGER_PATH)
+            limits: Calls allowed per window (default: API_RATE_LIMITS)
+            headroom: Fraction of each limit we allow ourselves to use
+        """
+        self.path = Path(path) if path else RATE_LIMIT_LEDGER_PATH
+        if limits is None:
+            limits = API_RATE_LIMITS
+        self.limits = {window: calls * headroom for window, calls in limits.items()}
+
+        self._file_lock = _FileLock(self.path.with_suffix(".lock"))
+        self._thread_lock = threading.Lock()
+        self.total_calls = 0.0
+        self.total_wait = 0.0
+
+    def _load(self, now: float) -> List[List[float]]:
+        """Read ledger entries ([timestamp, weight]) still inside the longest window."""
+        if not self.path.exists():
+            return []
+        try:
+            with open(self.path, "r", encoding="utf-8") as f:
+                entries = json.load(f)["entries"]
+        except (ValueError, KeyError):
+            print(f"⚠️  Rate limit ledger unreadable, starting fresh: {self.path}")
+            return []
+
+        horizon = now - max(WINDOW_SECONDS[window] for window in self.limits)
+        return [entry for entry in entries if entry[0] > horizon]
+
+    def _save(self, entries: List[List[float]]):
+        """Write entries atomically (temp file + rename)."""
+        tmp_path = self.path.with_suffix(".tmp")
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump({"entries": entries}, f)
+        os.replace(tmp_path, self.path)
+
+    def _wait_time(self, entries: List[List[float]], weight: float, now: float) -> float:
+        """Exact seconds until `weight` fits in every window (0 if it fits now)."""
+        wait = 0.0
+        for window, limit in self.limits.items():
+            length = WINDOW_SECONDS[window]
+            in_window = [entry for entry in entries if entry[0] > now - length]
+            used = sum(entry[1] for entry in in_window)
+
+            # Oversized requests go through once the window is empty
+            allowed = max(limit - min(weight, limit), 0.0)
+            if used <= allowed:
+                continue
+
+            # Walk the oldest calls until enough of them have expired
+            for timestamp, entry_weight in sorted(in_window):
+                used -= entry_weight
+                if used <= allowed:
+                    wait = max(wait, timestamp + length - now)
+                    break
+        return wait
+
+    def reserve(self, weight: float = 1.0) -> float:
+        """
+        Record a call if the budget allows it.
+
+        Args:
+            weight: Number of API calls the request counts as
+
+        Returns:
+            0 if the call was recorded, otherwise seconds to wait before retrying
+        """
+        with self._thread_lock, self._file_lock:
+            now = time.time()
+            entries = self._load(now)
+            wait = self._wait_time(entries, weight, now)
+            if wait <= 0:
+                entries.append([now, weight])
+                self._save(entries)
+                self.total_calls += weight
+            return wait
+
+    def acquire(self, weight: float = 1.0) -> float:
+        """
+        Block until the call fits in the shared budget, then record it.
+
+        Returns:
+            Seconds spent waiting
+        """
+        waited = 0.0
+        while True:
+            wait = self.reserve(weight)
+            if wait <= 0:
+                break
+            # Other processes may take the slot first, so re-check after sleeping
+            wait = math.ceil(wait * 100) / 100
+            time.sleep(wait)
+            waited += wait
+
+        with self._thread_lock:
+            self.total_wait += waited
+        return waited
+
+    def usage(self) -> Dict[str, float]:
+        """Calls spent by all processes in each window right now."""
+        with self._thread_lock, self._file_lock:
+            now = time.time()
+            entries = self._load(now)
+        return {
+            window: sum(weight for timestamp, weight in entries
+                        if timestamp > now - WINDOW_SECONDS[window])
+            for window in self.limits
+        }
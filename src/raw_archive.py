@@ -0,0 +1,306 @@
+"""
+Compressed raw response archive.
+
+Instead of one pretty-printed JSON file per API call, responses are
+streamed into append-only NDJSON segment files:
+
+    <archive_dir>/<data_type>/<segment>.ndjson.zst   (or .ndjson.gz)
+    <archive_dir>/index.sqlite
+
+- Each response is one compact JSON line, compressed as its own zstd frame
+  (or gzip member). Concatenated frames are still a valid .zst/.gz file, so
+  segments can be read with zstdcat/zcat as well.
+- The index stores segment, byte offset and length for every response, so a
+  single location/date response is read with one seek, without scanning.
+- Every process writes to its own segment (pid in the name), so several
+  fetch scripts can archive at the same time.
+"""
+
+import gzip
+import json
+import os
+import sqlite3
+import threading
+from datetime import datetime
+from pathlib import Path
+from typing import Dict, Iterator, List, Optional
+
+try:
+    import zstandard
+except ImportError:
+    zstandard = None
+
+try:
+    from .config import RAW_ARCHIVE_DIR, RAW_ARCHIVE_CODEC, RAW_ARCHIVE_SEGMENT_MB
+except ImportError:
+    from config import RAW_ARCHIVE_DIR, RAW_ARCHIVE_CODEC, RAW_ARCHIVE_SEGMENT_MB
+
+
+CODEC_EXTENSIONS = {"zstd": ".ndjson.zst", "gzip": ".ndjson.gz"}
+
+
+def _compress(data: bytes, codec: str, level: int) -> bytes:
+    if codec == "zstd":
+        return zstandard.ZstdCompressor(level=level).compress(data)
+    return gzip.compress(data, compresslevel=level)
+
+
+def _decompress(data: bytes, codec: str) -> bytes:
+    if codec == "zstd":
+        return zstandard.ZstdDecompressor().decompress(data)
+    return gzip.decompress(data)
+
+
+class RawArchive:
+    """
+    Append-only, indexed archive of raw API responses.
+
+    Example:
+        >>> archive = RawArchive()
+        >>> archive.append(data, location_code='cape_town', data_type='historical',
+        ...                start_date='2024-01-01', end_date='2024-01-31')
+        >>> archive.find('cape_town', 'historical', date='2024-01-15')
+        [{'key': ..., 'segment': ..., 'offset': ..., ...}]
+        >>> data = archive.read(archive.find('cape_town', date='2024-01-15')[-1]['key'])
+    """
+
+    def __init__(
+        self,
+        archive_dir: Path = RAW_ARCHIVE_DIR,
+        codec: str = RAW_ARCHIVE_CODEC,
+        segment_bytes: int = RAW_ARCHIVE_SEGMENT_MB * 1024 * 1024,
+        level: Optional[int] = None
+    ):
+        """
+        Args:
+            archive_dir: Root directory for segments and the index
+            codec: 'zstd' or 'gzip' (zstd falls back to gzip if zstandard
+                is not installed)
+            segment_bytes: Start a new segment once the current one is this big
+            level: Compression level (default: 3 for zstd, 6 for gzip)
+        """
+        if codec not in CODEC_EXTENSIONS:
+            raise ValueError(f"Unknown codec: {codec} (use 'zstd' or 'gzip')")
+        if codec == "zstd" and zstandard is None:
+            print("⚠️  zstandard not installed, archiving with gzip instead")
+            codec = "gzip"
+
+        self.archive_dir = Path(archive_dir)
+        self.codec = codec
+        self.segment_bytes = segment_bytes
+        self.level = level if level is not None else (3 if codec == "zstd" else 6)
+
+        self.archive_dir.mkdir(parents=True, exist_ok=True)
+        self._lock = threading.Lock()
+        self._segments: Dict[str, tuple] = {}  # data_type -> (relative path, file)
+        self._segment_count = 0
+
+        self._conn = sqlite3.connect(
+            str(self.archive_dir / "index.sqlite"), check_same_thread=False, timeout=30
+        )
+        self._conn.execute("""
+            CREATE TABLE IF NOT EXISTS responses (
+                key TEXT,
+                location_code TEXT,
+                data_type TEXT,
+                start_date TEXT,
+                end_date TEXT,
+                fetched_at TEXT,
+                segment TEXT,
+                codec TEXT,
+                offset INTEGER,
+                length INTEGER,
+                raw_size INTEGER
+            )
+        """)
+        self._conn.execute(
+            "CREATE INDEX IF NOT EXISTS idx_responses_key ON responses (key)"
+        )
+        self._conn.execute(
+            "CREATE INDEX IF NOT EXISTS idx_responses_location "
+            "ON responses (location_code, data_type, start_date, end_date)"
+        )
+        self._conn.commit()
+
+    # ------------------------------------------------------------------
+    # Writing
+    # ------------------------------------------------------------------
+
+    def _segment_for(self, data_type: str):
+        """Open segment for data_type, rotating when it is full (lock held)."""
+        current = self._segments.get(data_type)
+        if current is not None and current[1].tell() < self.segment_bytes:
+            return current
+
+        if current is not None:
+            current[1].close()
+
+        self._segment_count += 1
+        name = (
+            f"{datetime.now().strftime('%Y%m%dT%H%M%S')}_{os.getpid()}_{self._segment_count:04d}"
+            f"{CODEC_EXTENSIONS[self.codec]}"
+        )
+        relative_path = f"{data_type}/{name}"
+        segment_path = self.archive_dir / relative_path
+        segment_path.parent.mkdir(parents=True, exist_ok=True)
+        self._segments[data_type] = (relative_path, open(segment_path, "ab"))
+        return self._segments[data_type]
+
+    def append(
+        self,
+        response_json: Dict,
+        location_code: Optional[str] = None,
+        data_type: str = "historical",
+        start_date: Optional[str] = None,
+        end_date: Optional[str] = None,
+        key: Optional[str] = None
+    ) -> str:
+        """
+        Add one response to the archive.
+
+        Args:
+            response_json: Parsed API response
+            location_code: Location the response is for
+            data_type: 'historical', 'forecast', 'current', ...
+            start_date: First day covered, 'YYYY-MM-DD'
+            end_date: Last day covered, 'YYYY-MM-DD'
+            key: Name to read it back with (default: fetch time, location,
+                data type and date range)
+
+        Returns:
+            The record's key
+        """
+        fetched_at = datetime.now()
+        if key is None:
+            key = f"{fetched_at.strftime('%Y-%m-%d_%H-%M-%S')}_{location_code}_{data_type}"
+            if start_date and end_date:
+                key += f"_{start_date}_to_{end_date}"
+
+        line = json.dumps(response_json, separators=(",", ":"), ensure_ascii=False) + "\n"
+        raw = line.encode("utf-8")
+        frame = _compress(raw, self.codec, self.level)
+
+        with self._lock:
+            relative_path, segment = self._segment_for(data_type)
+            offset = segment.tell()
+            segment.write(frame)
+            segment.flush()
+            self._conn.execute(
+                "INSERT INTO responses VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                (key, location_code, data_type, start_date, end_date,
+                 fetched_at.isoformat(timespec="seconds"), relative_path, self.codec,
+                 offset, len(frame), len(raw))
+            )
+            self._conn.commit()
+        return key
+
+    # ------------------------------------------------------------------
+    # Reading
+    # ------------------------------------------------------------------
+
+    _COLUMNS = ("key", "location_code", "data_type", "start_date", "end_date",
+                "fetched_at", "segment", "codec", "offset", "length", "raw_size")
+
+    def _query(self, sql: str, args: tuple) -> List[Dict]:
+        with self._lock:
+            rows = self._conn.execute(sql, args).fetchall()
+        return [dict(zip(self._COLUMNS, row)) for row in rows]
+
+    def find(
+        self,
+        location_code: str,
+        data_type: Optional[str] = None,
+        date: Optional[str] = None
+    ) -> List[Dict]:
+        """
+        Index entries for a location, oldest first.
+
+        Args:
+            location_code: e.g. 'cape_town'
+            data_type: Only this data type (default: all)
+            date: Only responses whose start_date..end_date covers this day
+        """
+        sql = f"SELECT {', '.join(self._COLUMNS)} FROM responses WHERE location_code = ?"
+        args = [location_code]
+        if data_type is not None:
+            sql += " AND data_type = ?"
+            args.append(data_type)
+        if date is not None:
+            sql += " AND start_date <= ? AND end_date >= ?"
+            args.extend([date, date])
+        sql += " ORDER BY fetched_at, rowid"
+        return self._query(sql, tuple(args))
+
+    def read_entry(self, entry: Dict) -> Dict:
+        """Read one response using its index entry (one seek + one read)."""
+        with open(self.archive_dir / entry["segment"], "rb") as f:
+            f.seek(entry["offset"])
+            frame = f.read(entry["length"])
+        return json.loads(_decompress(frame, entry["codec"]))
+
+    def read(self, key: str) -> Optional[Dict]:
+        """Read the latest response stored under key (None if missing)."""
+        entries = self._query(
+            f"SELECT {', '.join(self._COLUMNS)} FROM responses WHERE key = ? "
+            "ORDER BY rowid DESC LIMIT 1",
+            (key,)
+        )
+        if not entries:
+            return None
+        return self.read_entry(entries[0])
+
+    def iter_responses(self, data_type: Optional[str] = None) -> Iterator[tuple]:
+        """
+        Stream (index entry, response) pairs in archive order, e.g. for replay.
+
+        Reads each segment sequentially, one frame at a time.
+        """
+        sql = f"SELECT {', '.join(self._COLUMNS)} FROM responses"
+        args = ()
+        if data_type is not None:
+            sql += " WHERE data_type = ?"
+            args = (data_type,)
+        sql += " ORDER BY segment, offset"
+
+        current_path = None
+        f = None
+        try:
+            for entry in self._query(sql, args):
+                if entry["segment"] != current_path:
+                    if f is not None:
+                        f.close()
+                    current_path = entry["segment"]
+                    f = open(self.archive_dir / current_path, "rb")
+                f.seek(entry["offset"])
+                frame = f.read(entry["length"])
+                yield entry, json.loads(_decompress(frame, entry["codec"]))
+        finally:
+            if f is not None:
+                f.close()
+
+    def stats(self) -> Dict:
+        """Responses stored, compressed vs raw bytes and compression ratio."""
+        with self._lock:
+            count, stored, raw = self._conn.execute(
+                "SELECT COUNT(*), COALESCE(SUM(length), 0), COALESCE(SUM(raw_size), 0) "
+                "FROM responses"
+            ).fetchone()
+        return {
+            "responses": count,
+            "stored_bytes": stored,
+            "raw_bytes": raw,
+            "ratio": raw / stored if stored else 0.0,
+        }
+
+    def close(self):
+        with self._lock:
+            for _, segment in self._segments.values():
+                segment.close()
+            self._segments = {}
+            self._conn.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
@@ -0,0 +1,170 @@
+"""
+In-memory response cache for OpenMeteoClient.
+
+Repeated calls with the same parameters (common in notebooks) are answered
+from memory without a request or rate-limit quota:
+- entries are keyed by the normalized request parameters
+- each data type has its own time-to-live (RESPONSE_CACHE_TTL_SECONDS)
+- least-recently-used entries are dropped past RESPONSE_CACHE_MAX_ENTRIES
+- concurrent identical requests share ONE in-flight request (single flight)
+"""
+
+import json
+import threading
+import time
+from collections import OrderedDict
+from typing import Callable, Dict, Optional
+
+try:
+    from .config import RESPONSE_CACHE_MAX_ENTRIES, RESPONSE_CACHE_TTL_SECONDS
+except ImportError:
+    from config import RESPONSE_CACHE_MAX_ENTRIES, RESPONSE_CACHE_TTL_SECONDS
+
+
+def normalize_params(params: Dict) -> str:
+    """
+    Cache key for request parameters.
+
+    Parameter order and the order of comma-separated variable lists don't
+    change the (JSON, name-keyed) response, so both are sorted.
+    """
+    normalized = {}
+    for key, value in params.items():
+        if isinstance(value, (list, tuple)):
+            value = ",".join(str(v) for v in value)
+        value = str(value)
+        if key in ("hourly", "daily", "current"):
+            value = ",".join(sorted(value.split(",")))
+        normalized[key] = value
+    return json.dumps(normalized, sort_keys=True)
+
+
+class _InFlight:
+    """A request being made by one thread that others are waiting for."""
+
+    def __init__(self):
+        self.done = threading.Event()
+        self.result = None
+
+
+class ResponseCache:
+    """
+    Thread-safe LRU cache with per-data-type TTL and single-flight fetches.
+
+    Cached responses are shared between callers: treat them as read-only
+    (copy before modifying).
+
+    Example:
+        >>> cache = ResponseCache()
+        >>> data = cache.get_or_fetch(params, "forecast", lambda: fetch(params))
+    """
+
+    def __init__(
+        self,
+        max_entries: int = RESPONSE_CACHE_MAX_ENTRIES,
+        ttl_seconds: Optional[Dict[str, Optional[float]]] = None
+    ):
+        """
+        Args:
+            max_entries: Responses kept before the least recently used is dropped
+            ttl_seconds: data type -> seconds an entry stays fresh
+                (None = no expiry; default: RESPONSE_CACHE_TTL_SECONDS)
+        """
+        self.max_entries = max_entries
+        self.ttl_seconds = dict(RESPONSE_CACHE_TTL_SECONDS if ttl_seconds is None else ttl_seconds)
+
+        self._entries: "OrderedDict[str, tuple]" = OrderedDict()  # key -> (expires, data)
+        self._in_flight: Dict[str, _InFlight] = {}
+        self._lock = threading.Lock()
+
+        self.hits = 0
+        self.misses = 0
+        self.coalesced = 0
+        self.evictions = 0
+
+    def _lookup(self, key: str):
+        """Fresh cached response or None (lock held)."""
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+        expires, data = entry
+        if expires is not None and time.monotonic() >= expires:
+            del self._entries[key]
+            return None
+        self._entries.move_to_end(key)
+        return data
+
+    def _store(self, key: str, data_type: str, data):
+        """Add a response, evicting the least recently used (lock held)."""
+        ttl = self.ttl_seconds.get(data_type)
+        expires = time.monotonic() + ttl if ttl is not None else None
+        self._entries[key] = (expires, data)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+            self.evictions += 1
+
+    def get_or_fetch(self, params: Dict, data_type: str, fetch: Callable[[], Optional[Dict]]):
+        """
+        Return the cached response for params, or call fetch() once for it.
+
+        If another thread is already fetching the same params, wait for its
+        result instead of making a second request. Failed fetches (None) are
+        not cached.
+
+        Args:
+            params: Request parameters (normalized into the cache key)
+            data_type: 'historical', 'forecast' or 'current' (selects the TTL)
+            fetch: Makes the real request
+        """
+        key = normalize_params(params)
+
+        with self._lock:
+            data = self._lookup(key)
+            if data is not None:
+                self.hits += 1
+                return data
+
+            flight = self._in_flight.get(key)
+            if flight is None:
+                flight = _InFlight()
+                self._in_flight[key] = flight
+                leader = True
+                self.misses += 1
+            else:
+                leader = False
+                self.coalesced += 1
+
+        if not leader:
+            flight.done.wait()
+            return flight.result
+
+        try:
+            flight.result = fetch()
+            if flight.result is not None:
+                with self._lock:
+                    self._store(key, data_type, flight.result)
+        finally:
+            with self._lock:
+                del self._in_flight[key]
+            flight.done.set()
+        return flight.result
+
+    def clear(self):
+        """Drop every cached response."""
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self) -> Dict:
+        """Hit/miss counters and current size."""
+        with self._lock:
+            lookups = self.hits + self.misses + self.coalesced
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "coalesced": self.coalesced,
+                "hit_rate": (self.hits + self.coalesced) / lookups if lookups else 0.0,
+                "entries": len(self._entries),
+                "max_entries": self.max_entries,
+                "evictions": self.evictions,
+            }
@@ -0,0 +1,220 @@
+"""
+Out-of-core sort-merge with last-write-wins deduplication.
+
+Merging new rows into a partition used to mean: read every old file,
+concat with the new rows, drop_duplicates, sort_values - several copies of
+the whole partition in memory at once. Here each input (an old file, the
+new rows) is a stream of chunks already sorted by date, and the streams
+are merged chunk by chunk:
+
+    old file 1  ─┐
+    old file 2  ─┼─> merge_sorted() ─> sorted, deduplicated chunks ─> ParquetWriter
+    new rows    ─┘
+
+- Only one chunk per input (plus the chunk being written) is in memory;
+  chunk sizes come from a memory budget (PROCESSING_MEMORY_MB)
+- On equal dates the LATER input wins (inputs are passed oldest first),
+  and within an input the later row wins
+- Every chunk is cast to one schema, so inputs with different columns
+  (e.g. a new variable profile) merge with nulls for the missing ones
+
+Within a location partition location_code is constant, so the date alone
+is the (location_code, date) key.
+
+Example:
+    >>> rows = chunk_rows(schema, n_sources=3)
+    >>> sources = [iter_parquet(path, rows) for path in old_files] + [iter_table(new_table, rows)]
+    >>> for chunk in merge_sorted(sources, schema):
+    ...     writer.write_table(chunk)
+"""
+
+from pathlib import Path
+from typing import Iterator, List
+
+import numpy as np
+import pyarrow as pa
+import pyarrow.compute as pc
+import pyarrow.parquet as pq
+
+try:
+    from .config import PROCESSING_MEMORY_MB
+    from .weather_schema import cast_column
+except ImportError:
+    from config import PROCESSING_MEMORY_MB
+    from weather_schema import cast_column
+
+
+# Copies of a chunk alive at once per input: the buffer, its slice in the
+# merge, the sorted copy and the Parquet encoder's working set
+SCRATCH_FACTOR = 4
+
+MIN_CHUNK_ROWS = 1024
+
+# Column used internally to order equal keys (input index, row number)
+_SOURCE = "__source"
+_SEQ = "__seq"
+
+
+def row_bytes(schema: pa.Schema) -> int:
+    """Rough in-memory bytes per row for a schema (fixed widths, 32 per string)."""
+    total = 0
+    for field in schema:
+        type_ = field.type
+        if pa.types.is_dictionary(type_):
+            type_ = type_.index_type
+        try:
+            total += type_.bit_width // 8 or 1
+        except ValueError:
+            total += 32
+    return max(total, 1)
+
+
+def chunk_rows(schema: pa.Schema, n_sources: int, memory_mb: int = PROCESSING_MEMORY_MB) -> int:
+    """Rows per chunk so that n_sources inputs + the output fit the memory budget."""
+    budget = memory_mb * 1024 * 1024
+    rows = budget // (row_bytes(schema) * (n_sources + 1) * SCRATCH_FACTOR)
+    return int(max(rows, MIN_CHUNK_ROWS))
+
+
+def align(table: pa.Table, schema: pa.Schema) -> pa.Table:
+    """Cast a table to a schema: reorder, cast, and add missing columns as nulls."""
+    columns = []
+    for field in schema:
+        if field.name in table.column_names:
+            columns.append(cast_column(table.column(field.name), field.type))
+        else:
+            columns.append(pa.nulls(len(table), type=field.type))
+    return pa.Table.from_arrays(columns, schema=schema)
+
+
+def iter_parquet(path: Path, batch_rows: int) -> Iterator[pa.Table]:
+    """Stream a Parquet file in chunks of at most batch_rows rows."""
+    parquet_file = pq.ParquetFile(path)
+    for batch in parquet_file.iter_batches(batch_size=batch_rows):
+        yield pa.Table.from_batches([batch])
+
+
+def iter_table(table: pa.Table, batch_rows: int) -> Iterator[pa.Table]:
+    """Stream an in-memory table in chunks of at most batch_rows rows (zero-copy slices)."""
+    for offset in range(0, len(table), batch_rows):
+        yield table.slice(offset, batch_rows)
+
+
+def _keys(table: pa.Table, key: str) -> np.ndarray:
+    column = table.column(key)
+    if pa.types.is_timestamp(column.type):
+        column = column.cast(pa.int64())
+    return column.to_numpy()
+
+
+class _Source:
+    """One sorted input: its iterator and the chunk currently buffered."""
+
+    def __init__(self, chunks: Iterator[pa.Table], index: int, schema: pa.Schema, key: str):
+        self.chunks = iter(chunks)
+        self.index = index
+        self.schema = schema
+        self.key = key
+        self.buffer = None
+        self.keys = None
+        self.last_key = None
+        self._peeked = None
+        self.refill()
+
+    def _next_chunk(self):
+        if self._peeked is not None:
+            chunk, self._peeked = self._peeked, None
+            return chunk
+        for chunk in self.chunks:
+            if len(chunk):
+                return chunk
+        return None
+
+    def refill(self):
+        """
+        Load the next chunk (buffer is None once the input is exhausted).
+
+        Following chunks that start with the same key are pulled in too, so
+        all rows of one key are always in the buffer together.
+        """
+        self.buffer = None
+        chunk = self._next_chunk()
+        if chunk is None:
+            return
+        chunks = [chunk]
+        keys = _keys(chunk, self.key)
+        while True:
+            following = self._next_chunk()
+            if following is None:
+                break
+            following_keys = _keys(following, self.key)
+            if following_keys[0] != keys[-1]:
+                self._peeked = following
+                break
+            chunks.append(following)
+            keys = np.concatenate([keys, following_keys])
+
+        if np.any(keys[1:] < keys[:-1]) or (self.last_key is not None and keys[0] < self.last_key):
+            raise ValueError(f"Merge input {self.index} is not sorted by {self.key}")
+        self.buffer = pa.concat_tables([align(chunk, self.schema) for chunk in chunks])
+        self.keys = keys
+        self.last_key = keys[-1]
+
+    def take_until(self, bound) -> pa.Table:
+        """Remove and return the buffered rows with key <= bound."""
+        n = int(np.searchsorted(self.keys, bound, side="right"))
+        taken = self.buffer.slice(0, n)
+        if n == len(self.keys):
+            self.refill()
+        else:
+            self.buffer = self.buffer.slice(n)
+            self.keys = self.keys[n:]
+        return taken
+
+
+def merge_sorted(sources: List[Iterator[pa.Table]], schema: pa.Schema, key: str = "date") -> Iterator[pa.Table]:
+    """
+    Merge inputs sorted by key into one sorted stream without duplicate keys.
+
+    Args:
+        sources: Chunk iterators, each sorted by key, OLDEST FIRST (on equal
+            keys the row from the later input is kept)
+        schema: Schema of the output (inputs are aligned to it)
+        key: Column to sort and deduplicate on
+
+    Yields:
+        Sorted, deduplicated chunks; every key appears in exactly one chunk
+
+    Raises:
+        ValueError: If an input is not sorted
+    """
+    inputs = [_Source(chunks, i, schema, key) for i, chunks in enumerate(sources)]
+
+    while True:
+        active = [source for source in inputs if source.buffer is not None]
+        if not active:
+            return
+
+        # Everything up to the smallest buffered maximum can be emitted now:
+        # no input can still produce a key at or below it
+        bound = min(source.last_key for source in active)
+
+        pieces = []
+        for source in active:
+            piece = source.take_until(bound)
+            if len(piece):
+                pieces.append(piece.append_column(
+                    _SOURCE, pa.array(np.full(len(piece), source.index, dtype=np.int32))
+                ))
+        chunk = pa.concat_tables(pieces)
+        chunk = chunk.append_column(_SEQ, pa.array(np.arange(len(chunk), dtype=np.int64)))
+
+        order = pc.sort_indices(chunk, sort_keys=[
+            (key, "ascending"), (_SOURCE, "ascending"), (_SEQ, "ascending"),
+        ])
+        chunk = chunk.take(order).drop_columns([_SOURCE, _SEQ])
+
+        # Last row of each run of equal keys wins
+        keys = _keys(chunk, key)
+        keep = np.append(keys[1:] != keys[:-1], True)
+        yield chunk.filter(pa.array(keep))
@@ -0,0 +1,172 @@
+"""
+Loading the processed weather data (for notebooks, dashboards and scripts).
+
+load_weather() reads only what a question needs from the partitioned
+datasets written by scripts/process_to_parquet.py:
+- locations: only those location_code=<code> directories are opened
+- start / end: whole year=<yyyy> directories outside the range are
+  skipped, and inside an hourly file the per-month row group statistics
+  skip the other months (see parquet_layout.py)
+- columns: only those column chunks are read and decoded
+- files are memory-mapped, and the result comes back in the compact
+  weather_schema.py dtypes (float32, Int8 codes, categorical locations)
+
+weather_columns() lists the stored columns from the file footers, to pick
+columns= without loading the data first.
+
+Example:
+    >>> from weather_data import load_weather
+    >>> summer = load_weather("daily", locations=["cape_town", "durban"],
+    ...                       start="2023-12-01", end="2024-02-29",
+    ...                       columns=["temperature_2m_max", "precipitation_sum"])
+"""
+
+from datetime import date, datetime
+from pathlib import Path
+from typing import List, Optional, Union
+
+import pandas as pd
+import pyarrow.compute as pc
+
+try:
+    from .config import PROCESSED_HOURLY_DATASET, PROCESSED_DAILY_DATASET, PROCESSED_PARTITION_BY, TIMEZONE
+    from .parquet_layout import sort_table
+    from .partitioned_store import PartitionedStore
+    from .weather_schema import conform_table, to_pandas
+except ImportError:
+    from config import PROCESSED_HOURLY_DATASET, PROCESSED_DAILY_DATASET, PROCESSED_PARTITION_BY, TIMEZONE
+    from parquet_layout import sort_table
+    from partitioned_store import PartitionedStore
+    from weather_schema import conform_table, to_pandas
+
+
+DATASETS = {
+    "hourly": PROCESSED_HOURLY_DATASET,
+    "daily": PROCESSED_DAILY_DATASET,
+}
+
+# Always returned, whatever columns are asked for
+KEY_COLUMNS = ["date", "location_code"]
+
+DateLike = Union[str, date, datetime, pd.Timestamp]
+
+
+def _to_utc(value: DateLike) -> pd.Timestamp:
+    """Timestamp in UTC; dates/times without a timezone are local (config.TIMEZONE)."""
+    timestamp = pd.Timestamp(value)
+    if timestamp.tzinfo is None:
+        timestamp = timestamp.tz_localize(TIMEZONE)
+    return timestamp.tz_convert("UTC")
+
+
+def _is_whole_day(value: DateLike) -> bool:
+    if isinstance(value, datetime):
+        return False
+    if isinstance(value, date):
+        return True
+    return isinstance(value, str) and len(value.strip()) == 10
+
+
+def load_weather(
+    frequency: str = "hourly",
+    locations: Optional[Union[str, List[str]]] = None,
+    start: Optional[DateLike] = None,
+    end: Optional[DateLike] = None,
+    columns: Optional[List[str]] = None,
+    memory_map: bool = True,
+    dataset_dir: Optional[Path] = None
+) -> pd.DataFrame:
+    """
+    Load processed weather data, reading only the matching files, row groups and columns.
+
+    Args:
+        frequency: 'hourly' or 'daily'
+        locations: Location code(s), e.g. 'cape_town' (None = all)
+        start: First date/time to include, e.g. '2024-01-01'
+        end: Last date/time to include; a plain date ('2024-02-29')
+            includes that whole day
+        columns: Variables to read, e.g. ['temperature_2m'] (None = all);
+            date and location_code are always included
+        memory_map: Memory-map the files instead of reading them into buffers
+        dataset_dir: Read another dataset with the same layout
+
+    Dates without a timezone are taken as local time (config.TIMEZONE);
+    stored dates are UTC.
+
+    Returns:
+        DataFrame sorted by location and date, compact dtypes
+
+    Raises:
+        ValueError: Unknown frequency, location or column
+    """
+    if frequency not in DATASETS and dataset_dir is None:
+        raise ValueError(f"Unknown frequency: {frequency} (use one of {list(DATASETS)})")
+    store = PartitionedStore(dataset_dir or DATASETS[frequency], partition_by=PROCESSED_PARTITION_BY)
+
+    if isinstance(locations, str):
+        locations = [locations]
+    if locations is not None:
+        unknown = sorted(set(locations) - set(store.location_codes()))
+        if unknown:
+            raise ValueError(f"No {frequency} data for: {unknown} (have {store.location_codes()})")
+
+    if columns is not None:
+        columns = KEY_COLUMNS + [name for name in columns if name not in KEY_COLUMNS]
+
+    dataset = store.dataset(location_codes=locations, memory_map=memory_map)
+    if dataset is None:
+        return pd.DataFrame(columns=columns or KEY_COLUMNS)
+
+    # Filters on the partition columns prune directories, the date filter row groups
+    filters = []
+    if start is not None:
+        start = _to_utc(start)
+        filters += [pc.field("year") >= start.year, pc.field("date") >= start]
+    if end is not None:
+        whole_day = _is_whole_day(end)
+        end = _to_utc(end)
+        if whole_day:
+            end = end + pd.Timedelta(days=1) - pd.Timedelta(microseconds=1)
+        filters += [pc.field("year") <= end.year, pc.field("date") <= end]
+    if locations is not None:
+        filters.append(pc.field("location_code").isin(locations))
+
+    expression = None
+    for condition in filters:
+        expression = condition if expression is None else expression & condition
+
+    if columns is None:
+        # Everything except the partition-only columns (year, month)
+        columns = [name for name in dataset.schema.names if name not in store.keys]
+        columns = KEY_COLUMNS + [name for name in columns if name not in KEY_COLUMNS]
+    else:
+        missing = [name for name in columns if name not in dataset.schema.names]
+        if missing:
+            raise ValueError(f"Unknown {frequency} columns: {missing}")
+
+    table = dataset.to_table(columns=columns, filter=expression)
+    return to_pandas(conform_table(sort_table(table)))
+
+
+def weather_columns(frequency: str = "hourly", dataset_dir: Optional[Path] = None) -> List[str]:
+    """
+    Columns of a processed dataset, from the file footers only (no data read).
+
+    Useful to pick the columns= of load_weather() without loading everything.
+
+    Args:
+        frequency: 'hourly' or 'daily'
+        dataset_dir: Read another dataset with the same layout
+
+    Returns:
+        date, location_code, then the other stored columns
+    """
+    if frequency not in DATASETS and dataset_dir is None:
+        raise ValueError(f"Unknown frequency: {frequency} (use one of {list(DATASETS)})")
+    store = PartitionedStore(dataset_dir or DATASETS[frequency], partition_by=PROCESSED_PARTITION_BY)
+
+    dataset = store.dataset()
+    if dataset is None:
+        return list(KEY_COLUMNS)
+    names = [name for name in dataset.schema.names if name not in store.keys]
+    return KEY_COLUMNS + [name for name in names if name not in KEY_COLUMNS]
@@ -0,0 +1,142 @@
+"""
+Column-type registry for the weather tables.
+
+One place that says what type every column has, so the CSV reader, the
+Parquet writer, the fetch scripts and the notebooks all agree (no per-file
+type inference: an all-empty column would otherwise come back as text, a
+column of whole numbers as int64 in one file and float64 in the next).
+
+Every column gets the smallest type that holds its values safely:
+- date / timestamp: UTC timestamps (microseconds, as pandas writes them)
+- location_code / location_name: dictionary-encoded (one copy of each
+  string + an int32 index per row, so the location list can grow well
+  past 128; pandas 'category', Parquet stores the indices bit-packed)
+- weather_code, is_day: int8 (WMO codes are 0-99; pandas 'Int8', so
+  missing values stay missing)
+- sunrise / sunset: unix seconds (int64, as the API returns them)
+- year / month partition keys: int16 / int8
+- everything else is a measurement: float32 (the API sends float32, so
+  float64 only doubles the memory)
+
+Example:
+    >>> arrow_schema(["date", "location_code", "temperature_2m"])
+    date: timestamp[us, tz=UTC]
+    location_code: dictionary<values=string, indices=int32, ordered=0>
+    temperature_2m: float
+    >>> df = conform_frame(df)   # any frame with these columns -> compact dtypes
+"""
+
+from typing import Dict, Iterable
+
+import pandas as pd
+import pyarrow as pa
+import pyarrow.compute as pc
+
+
+TIMESTAMP_TYPE = pa.timestamp("us", tz="UTC")
+LOCATION_TYPE = pa.dictionary(pa.int32(), pa.string())
+
+# Whole-number codes and flags
+CODE_TYPES = {
+    "weather_code": pa.int8(),
+    "is_day": pa.int8(),
+}
+
+# Columns with a fixed type
+COLUMN_TYPES = {
+    "date": TIMESTAMP_TYPE,
+    "timestamp": TIMESTAMP_TYPE,   # current conditions
+    "location_code": LOCATION_TYPE,
+    "location_name": LOCATION_TYPE,
+    "sunrise": pa.int64(),
+    "sunset": pa.int64(),
+    # Partition keys (see partitioned_store.py)
+    "year": pa.int16(),
+    "month": pa.int8(),
+    **CODE_TYPES,
+}
+
+# Any other column is a weather variable
+MEASUREMENT_TYPE = pa.float32()
+
+TIMESTAMP_COLUMNS = tuple(name for name, type_ in COLUMN_TYPES.items() if type_ == TIMESTAMP_TYPE)
+
+# Small ints -> pandas nullable ints (plain numpy ints cannot hold NaN and
+# would silently become float64)
+_PANDAS_TYPES = {
+    pa.int8(): pd.Int8Dtype(),
+    pa.int16(): pd.Int16Dtype(),
+}
+
+
+def column_type(name: str) -> pa.DataType:
+    """Arrow type of one column."""
+    return COLUMN_TYPES.get(name, MEASUREMENT_TYPE)
+
+
+def column_types(columns: Iterable[str]) -> Dict[str, pa.DataType]:
+    """Arrow type per column."""
+    return {name: column_type(name) for name in columns}
+
+
+def csv_column_types(columns: Iterable[str]) -> Dict[str, pa.DataType]:
+    """
+    Types to parse CSV text with (for pyarrow.csv.ConvertOptions(column_types=...)).
+
+    Codes are read as float32 ("3.0" in older CSVs) and strings as plain
+    strings; conform_table() then narrows them to the registry types.
+    """
+    types = {}
+    for name in columns:
+        type_ = column_type(name)
+        if pa.types.is_dictionary(type_):
+            type_ = type_.value_type
+        elif pa.types.is_integer(type_) and name in CODE_TYPES:
+            type_ = pa.float32()
+        types[name] = type_
+    return types
+
+
+def arrow_schema(columns: Iterable[str]) -> pa.Schema:
+    """Arrow schema for a table with these columns (in this order)."""
+    return pa.schema([(name, column_type(name)) for name in columns])
+
+
+def cast_column(column, type_: pa.DataType):
+    """Cast an Arrow (chunked) array to a registry type (NaN -> null for ints)."""
+    if column.type == type_:
+        return column
+    if pa.types.is_dictionary(type_):
+        if not pa.types.is_dictionary(column.type):
+            column = pc.dictionary_encode(column.cast(type_.value_type))
+        return column.cast(type_)
+    if pa.types.is_integer(type_) and pa.types.is_floating(column.type):
+        # NaN is a value in Arrow, not a null: make it one before the (safe) cast
+        column = pc.if_else(pc.is_nan(column), pa.scalar(None, column.type), column)
+    return column.cast(type_)
+
+
+def conform_table(table: pa.Table) -> pa.Table:
+    """
+    Cast every column of an Arrow table to its registry type.
+
+    Raises:
+        pa.ArrowInvalid: If a value does not fit (e.g. weather_code 3.5),
+            instead of silently truncating it
+    """
+    columns = [
+        cast_column(table.column(i), column_type(name))
+        for i, name in enumerate(table.column_names)
+    ]
+    return pa.Table.from_arrays(columns, names=table.column_names)
+
+
+def to_pandas(table: pa.Table) -> pd.DataFrame:
+    """Arrow table -> DataFrame, keeping the compact types."""
+    return table.to_pandas(types_mapper=_PANDAS_TYPES.get)
+
+
+def conform_frame(df: pd.DataFrame) -> pd.DataFrame:
+    """Return a copy of a DataFrame with every column in its registry dtype."""
+    table = pa.Table.from_pandas(df, preserve_index=False)
+    return to_pandas(conform_table(table))